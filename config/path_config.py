@@ -40,6 +40,8 @@ ERRORS_DIR = WORKING_OUTPUT_DIR / "errors"
 PREDICTIONS_DIR = WORKING_OUTPUT_DIR / "predictions"
 LORA_ADAPTERS_DIR = WORKING_OUTPUT_DIR / "lora_adapters"
 CORRECTIONS_LOG_PATH = PREDICTIONS_DIR / "corrections.jsonl"
+COMPILE_CACHE_DIR = WORKING_OUTPUT_DIR / "compile_cache"
+RUNTIME_PROFILE_PATH = WORKING_OUTPUT_DIR / "runtime_profile.json"
 
 __all__ = [
     "IS_KAGGLE",
@@ -54,4 +56,6 @@ __all__ = [
     "PREDICTIONS_DIR",
     "LORA_ADAPTERS_DIR",
     "CORRECTIONS_LOG_PATH",
+    "COMPILE_CACHE_DIR",
+    "RUNTIME_PROFILE_PATH",
 ]
@@ -0,0 +1,94 @@
+"""Memory and throughput benchmark for hot-path context records.
+
+Builds ``--n`` synthetic contexts as pydantic :class:`ContextUnit` objects
+and as slotted :class:`ContextRecord` objects, and compares result
+validation through ``asdict`` with validating the result object directly.
+Memory is what each list adds while traced; records share their strings
+with the units they were converted from, as they do in ``load_records``::
+
+    python scripts/bench_records.py --n 1000000
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+
+import argparse
+import gc
+import time
+import tracemalloc
+from dataclasses import asdict
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from utils.context_builder.records import ContextRecord  # noqa: E402
+from utils.context_builder.schema import ContextUnit, SourceInfo  # noqa: E402
+from utils.llm_inference.base_inference import LLMResult  # noqa: E402
+from utils.llm_inference.validator import InferenceValidator  # noqa: E402
+
+TEXT = "Raw reads were deposited in GEO under accession GSE12345."
+
+
+def _unit(i: int) -> ContextUnit:
+    return ContextUnit(
+        context_id=f"ctx_{i:024x}",
+        doc_id=f"DOC{i // 20}",
+        text=TEXT,
+        source=SourceInfo(
+            section="body",
+            start_sentence_idx=i % 20,
+            end_sentence_idx=i % 20 + 4,
+            original_paragraph_id=0,
+            source_type="body",
+        ),
+        token_count=128,
+        importance_score=0.5,
+    )
+
+
+def _measure(label: str, build):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    items = build()
+    elapsed = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(
+        f"{label:<28} {elapsed:7.2f} s  {len(items) / elapsed:>11,.0f}/s  "
+        f"{current / 2**20:8.1f} MB"
+    )
+    return items
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Context record benchmark")
+    parser.add_argument("--n", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    units = _measure("ContextUnit (pydantic)", lambda: [_unit(i) for i in range(args.n)])
+    _measure(
+        "ContextRecord (slots)",
+        lambda: [ContextRecord.from_unit(u) for u in units],
+    )
+    del units
+
+    results = [
+        LLMResult(f"ctx_{i}", "primary", 0.9, "primary", "", {}, {})
+        for i in range(args.n)
+    ]
+    validator = InferenceValidator()
+    for label, check in (
+        ("validate(asdict(result))", lambda r: validator.validate(asdict(r))),
+        ("validate(result)", validator.validate),
+    ):
+        start = time.perf_counter()
+        for r in results:
+            check(r)
+        elapsed = time.perf_counter() - start
+        print(f"{label:<28} {elapsed:7.2f} s  {args.n / elapsed:>11,.0f}/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Microbenchmark for the sliding-window planner.
+
+Plans windows over a synthetic 5,000-sentence document with the previous
+backwards-walking loop and with :func:`plan_windows`, checks that both give
+the same boundaries and prints the timings::
+
+    python scripts/bench_sliding_window.py --stride 32
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+
+import argparse
+import random
+import timeit
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from utils.context_builder.sliding_window import plan_windows  # noqa: E402
+
+
+def legacy_windows(counts, max_tokens, stride):
+    """The planner used before prefix sums, with a progress guard added."""
+    windows = []
+    start = 0
+    n = len(counts)
+    while start < n:
+        end = start
+        total = 0
+        while end < n and total + counts[end] <= max_tokens:
+            total += counts[end]
+            end += 1
+        if start == end:
+            end += 1
+            total = counts[start]
+        windows.append((start, end, total))
+        if end >= n:
+            break
+        back = end
+        kept = 0
+        while back > start and kept < stride:
+            back -= 1
+            kept += counts[back]
+        start = max(back, start + 1)
+    return windows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Sliding-window planner benchmark")
+    parser.add_argument("--sentences", type=int, default=5000)
+    parser.add_argument("--max-tokens", type=int, default=512)
+    parser.add_argument("--stride", type=int, default=128)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    counts = [rng.randint(5, 45) for _ in range(args.sentences)]
+    cum = [0]
+    for c in counts:
+        cum.append(cum[-1] + c)
+
+    legacy = legacy_windows(counts, args.max_tokens, args.stride)
+    planned = plan_windows(cum, args.max_tokens, args.stride)
+    assert legacy == planned, "window boundaries differ"
+
+    t_legacy = timeit.timeit(
+        lambda: legacy_windows(counts, args.max_tokens, args.stride),
+        number=args.repeat,
+    )
+    t_planned = timeit.timeit(
+        lambda: plan_windows(cum, args.max_tokens, args.stride),
+        number=args.repeat,
+    )
+    print(f"sentences={args.sentences} windows={len(planned)}")
+    print(f"legacy loop : {t_legacy / args.repeat * 1000:8.3f} ms/doc")
+    print(f"prefix sums : {t_planned / args.repeat * 1000:8.3f} ms/doc")
+    print(f"speed-up    : {t_legacy / t_planned:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Build context units from parsed documents.
+
+Example::
+
+    python scripts/build_contexts.py --input data/parsed/docs.jsonl \
+      --output data/context/context.jsonl --workers 8
+
+``--output`` may end in ``.parquet`` for columnar output. With
+``--incremental`` it names a directory holding a build manifest, and only
+new or changed documents are rebuilt.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+
+import argparse
+import json
+import logging
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from utils.context_builder import build_from_jsonl, build_incremental  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build context units")
+    parser.add_argument("--input", required=True, help="ParsedDoc JSONL file")
+    parser.add_argument(
+        "--output",
+        default="data/context/context.jsonl",
+        help="Output JSONL/Parquet file, or directory with --incremental",
+    )
+    parser.add_argument("--max-tokens", type=int, default=512)
+    parser.add_argument("--stride", type=int, default=128)
+    parser.add_argument(
+        "--counter",
+        choices=["hf", "approx"],
+        default="hf",
+        help="Token counter: HuggingFace tokenizer or approximation",
+    )
+    parser.add_argument(
+        "--recheck-counts",
+        action="store_true",
+        help="With --counter approx, re-count windows with the HuggingFace "
+        "tokenizer and drop those over --max-tokens",
+    )
+    parser.add_argument(
+        "--mode",
+        choices=["windows", "mentions"],
+        default="windows",
+        help="Tile whole documents or centre windows on identifier mentions",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=1, help="Worker processes for building"
+    )
+    parser.add_argument(
+        "--chunk-size", type=int, default=16, help="Documents per worker task"
+    )
+    parser.add_argument(
+        "--omit-text",
+        action="store_true",
+        help="Write window text once to a document store instead of per unit",
+    )
+    parser.add_argument("--token-cache", default=None, help="Token count cache file")
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only rebuild new or changed documents into --output directory",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(levelname)s - %(message)s",
+    )
+
+    if args.incremental:
+        stats = build_incremental(
+            args.input,
+            args.output,
+            max_tokens=args.max_tokens,
+            stride=args.stride,
+            counter=args.counter,
+            mode=args.mode,
+        )
+    else:
+        stats = build_from_jsonl(
+            args.input,
+            args.output,
+            max_tokens=args.max_tokens,
+            stride=args.stride,
+            token_cache_path=args.token_cache,
+            counter=args.counter,
+            omit_text=args.omit_text,
+            mode=args.mode,
+            workers=args.workers,
+            chunk_size=args.chunk_size,
+            recheck_counts=args.recheck_counts,
+        )
+        logging.info(
+            "Built %d contexts from %d documents in %.1fs "
+            "(%.1f docs/s, %.1f contexts/s, %d workers)",
+            stats["contexts"],
+            stats["documents"],
+            stats["seconds"],
+            stats["docs_per_sec"],
+            stats["contexts_per_sec"],
+            args.workers,
+        )
+    print(json.dumps(stats, indent=2))
+
+
+if __name__ == "__main__":
+    main()
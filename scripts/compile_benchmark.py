@@ -0,0 +1,127 @@
+"""Compare eager, cold-compiled and warm-compiled start-up of the engine.
+
+Each mode runs in a fresh interpreter so that in-process compile caches do
+not leak between measurements::
+
+    python scripts/compile_benchmark.py --model-path models/llama-3-8b-instruct
+
+``cold`` starts from an empty cache directory, ``warm`` reuses the cache the
+cold run left behind. ``--cache-dir`` must be new or empty; by default a
+temporary directory is created. The summary is printed as JSON.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+
+import argparse
+import json
+import statistics
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+PROMPT = (
+    "You are a citation classifier. Classify the following text as primary, "
+    "secondary, or none.\nText: Raw reads were deposited in GEO under "
+    "accession GSE123456.\nLabel:"
+)
+
+
+def _child(args: argparse.Namespace) -> None:
+    from utils.llm_inference.inference_engine import EngineConfig, InferenceEngine
+    from utils.llm_inference.tokenizer_wrapper import TokenizerConfig, TokenizerWrapper
+
+    t0 = time.perf_counter()
+    tokenizer = TokenizerWrapper(TokenizerConfig(model_path=args.model_path))
+    engine = InferenceEngine(
+        EngineConfig(
+            model_path=args.model_path,
+            compile=args.mode != "eager",
+            compile_cache_dir=args.cache_dir,
+        )
+    )
+    load_s = time.perf_counter() - t0
+
+    inputs = tokenizer.encode(PROMPT)
+    t0 = time.perf_counter()
+    engine.generate(inputs, max_new_tokens=args.max_new_tokens)
+    first_s = time.perf_counter() - t0
+
+    steady = []
+    for _ in range(args.repeats):
+        t0 = time.perf_counter()
+        engine.generate(inputs, max_new_tokens=args.max_new_tokens)
+        steady.append(time.perf_counter() - t0)
+
+    print(
+        json.dumps(
+            {
+                "mode": args.mode,
+                "load_s": round(load_s, 3),
+                "first_call_s": round(first_s, 3),
+                "steady_call_s": round(statistics.median(steady), 4),
+            }
+        )
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="torch.compile warm vs cold start")
+    parser.add_argument("--model-path", required=True)
+    parser.add_argument("--max-new-tokens", type=int, default=8)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument(
+        "--cache-dir", default=None, help="New or empty directory for compile caches"
+    )
+    parser.add_argument("--mode", choices=["eager", "cold", "warm"], default=None)
+    args = parser.parse_args()
+
+    if args.mode:
+        _child(args)
+        return
+
+    if args.cache_dir is None:
+        cache_dir = Path(tempfile.mkdtemp(prefix="compile_cache_"))
+    else:
+        cache_dir = Path(args.cache_dir)
+        # the cold run needs an empty cache; never wipe a user's directory
+        if cache_dir.exists() and (not cache_dir.is_dir() or any(cache_dir.iterdir())):
+            parser.error(f"--cache-dir {cache_dir} must be a new or empty directory")
+    env = dict(os.environ)
+    # the cache location must not be inherited from the parent shell
+    env.pop("TORCHINDUCTOR_CACHE_DIR", None)
+    env.pop("TRITON_CACHE_DIR", None)
+
+    results = []
+    for mode in ("eager", "cold", "warm"):
+        out = subprocess.run(
+            [
+                sys.executable,
+                __file__,
+                "--model-path",
+                args.model_path,
+                "--max-new-tokens",
+                str(args.max_new_tokens),
+                "--repeats",
+                str(args.repeats),
+                "--cache-dir",
+                str(cache_dir),
+                "--mode",
+                mode,
+            ],
+            check=True,
+            capture_output=True,
+            text=True,
+            env=env,
+        )
+        results.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    print(json.dumps({"cache_dir": str(cache_dir), "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
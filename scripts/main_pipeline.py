@@ -22,18 +22,54 @@ import logging
 from dataclasses import asdict
 from datetime import datetime
 from pathlib import Path
-from typing import Iterable, List
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
+from utils.context_builder.document_store import (  # noqa: E402
+    DocumentStore,
+    default_store_path,
+)
+from utils.context_builder.manifest import (  # noqa: E402
+    BuildManifest,
+    is_manifest_dir,
+)
+from utils.context_builder.mention_gate import MentionGate  # noqa: E402
+from utils.context_builder.near_duplicates import MinHashLSH  # noqa: E402
+from utils.context_builder.records import ContextRecord  # noqa: E402
 from utils.context_builder.schema import ContextUnit  # noqa: E402
 from utils.llm_inference.base_inference import (  # noqa: E402
     BaseInferenceModel,
     LLMResult,
     get_inference_model,
 )
+from utils.llm_inference.decoding_strategy import DecodingStrategy  # noqa: E402
+from utils.llm_inference.pipelined_executor import (  # noqa: E402
+    BatchJob,
+    PipelinedExecutor,
+    run_job,
+)
+from utils.llm_inference.replay_logger import PromptReplayLogger  # noqa: E402
+from utils.llm_inference.runtime_profile import load_cpu_runtime_profile  # noqa: E402
+from utils.llm_inference.scheduler import (  # noqa: E402
+    REASK_SHARE,
+    DeadlineScheduler,
+    ScheduleMode,
+    order_by_priority,
+)
 from utils.output_writer import generate_submission  # noqa: E402
-from utils.refinement import RefinementEngine  # noqa: E402
+from utils.parsed_doc import ParsedDoc  # noqa: E402
+from utils.refinement import (  # noqa: E402
+    RefinementEngine,
+    SelfCorrector,
+    SelfQuestioner,
+)
+from utils.refinement.budget_allocator import (  # noqa: E402
+    GainCriterion,
+    ReaskBudgetAllocator,
+)
+from utils.refinement.correction_engine import CorrectionEngine  # noqa: E402
+from utils.refinement.question_ranker import QuestionRanker  # noqa: E402
 
 
 # ---------------------------------------------------------------------------
@@ -45,45 +81,269 @@ CONFIDENCE_THRESHOLD = 0.7
 # ---------------------------------------------------------------------------
 # Data loading utilities
 
-def _load_jsonl(path: Path) -> List[ContextUnit]:
+def _iter_jsonl(path: Path) -> Iterator[ContextUnit]:
     with path.open("r", encoding="utf-8") as fh:
-        return [
-            ContextUnit.model_validate_json(line)
-            for line in fh
-            if line.strip()
-        ]
+        for line in fh:
+            if line.strip():
+                yield ContextUnit.model_validate_json(line)
+
 
+def _iter_parquet(path: Path) -> Iterator[ContextUnit]:
+    # imported lazily to keep dependencies minimal
+    from utils.context_builder.columnar_store import (
+        is_context_parquet,
+        iter_parquet_contexts,
+    )
+
+    if is_context_parquet(path):
+        yield from iter_parquet_contexts(path)
+        return
 
-def _load_parquet(path: Path) -> List[ContextUnit]:
-    import pandas as pd  # imported lazily to keep dependencies minimal
+    import pandas as pd
 
+    # files with a nested ``source`` column are validated row by row
     df = pd.read_parquet(path)
-    return [ContextUnit(**row) for row in df.to_dict(orient="records")]
+    for row in df.to_dict(orient="records"):
+        yield ContextUnit(**row)
 
 
-def load_contexts(input_path: str) -> List[ContextUnit]:
-    """Load context units from ``input_path`` (JSONL or Parquet)."""
+def iter_contexts(input_path: str) -> Iterator[ContextUnit]:
+    """Yield context units from ``input_path``.
+
+    ``input_path`` is a JSONL or Parquet file, or a segmented output
+    directory written by ``build_incremental``.
+    """
 
     path = Path(input_path)
+    if is_manifest_dir(path):
+        return BuildManifest.load(path).iter_contexts()
     if path.suffix.lower() == ".jsonl":
-        return _load_jsonl(path)
+        return _iter_jsonl(path)
     if path.suffix.lower() in {".parquet", ".pq"}:
-        return _load_parquet(path)
+        return _iter_parquet(path)
     raise ValueError("Unsupported input format: expected JSONL or Parquet")
 
 
+def load_contexts(input_path: str) -> List[ContextUnit]:
+    """Load context units from ``input_path`` (see :func:`iter_contexts`)."""
+
+    return list(iter_contexts(input_path))
+
+
+def iter_parsed_docs(path: str | Path) -> Iterator[ParsedDoc]:
+    """Yield :class:`ParsedDoc` objects from a JSONL file."""
+
+    with Path(path).open("r", encoding="utf-8") as fh:
+        for line in fh:
+            if line.strip():
+                yield ParsedDoc.model_validate_json(line)
+
+
+def load_records(input_path: str, validate: bool = False) -> List[ContextRecord]:
+    """Load context units as compact :class:`ContextRecord` objects.
+
+    Units are validated as they are read and only the records are kept.
+    Context Parquet files written by the builder are trusted: unless
+    ``validate`` is set, their records are built straight from the Arrow
+    columns without pydantic.
+    """
+
+    path = Path(input_path)
+    if not validate and path.suffix.lower() in {".parquet", ".pq"}:
+        # imported lazily to keep dependencies minimal
+        from utils.context_builder.columnar_store import (
+            is_context_parquet,
+            iter_parquet_records,
+        )
+
+        if is_context_parquet(path):
+            return list(iter_parquet_records(path))
+    return [ContextRecord.from_unit(unit) for unit in iter_contexts(input_path)]
+
+
 # ---------------------------------------------------------------------------
 # Core pipeline
 
+def _batch_jobs(
+    contexts: Sequence[ContextRecord],
+    model: BaseInferenceModel,
+    batch_size: int,
+    doc_store: DocumentStore | None = None,
+    scheduler: DeadlineScheduler | None = None,
+    fallback_model: BaseInferenceModel | None = None,
+) -> Iterator[BatchJob]:
+    """Split ``contexts`` into jobs of ``batch_size`` with ``(batch, mode)`` payloads.
+
+    Without a ``scheduler`` every batch runs in :attr:`ScheduleMode.FULL`;
+    otherwise each batch takes the scheduler's current mode when it is
+    generated (see :func:`_predict`, which updates it).
+    Logit-only modes decode a single token, :attr:`ScheduleMode.FALLBACK`
+    batches go to ``fallback_model`` and skipped batches get no model.
+    Units written without text are resolved against ``doc_store``.
+    """
+
+    for offset in range(0, len(contexts), batch_size):
+        batch = contexts[offset : offset + batch_size]
+        mode = scheduler.current_mode if scheduler is not None else ScheduleMode.FULL
+        if mode == ScheduleMode.SKIP:
+            yield BatchJob((batch, mode), [], None)
+            continue
+        items = [(c.context_id, c.resolve_text(doc_store)) for c in batch]
+        if mode in (ScheduleMode.FULL, ScheduleMode.NO_REASK):
+            yield BatchJob((batch, mode), items, model)
+        else:
+            backend = fallback_model if mode == ScheduleMode.FALLBACK else model
+            yield BatchJob(
+                (batch, mode),
+                items,
+                backend,
+                max_new_tokens=1,
+                decoding=DecodingStrategy.LOGIT_MAPPED,
+            )
+
+
+def _predict(
+    jobs: Iterable[BatchJob],
+    pipeline_depth: int = 0,
+    scheduler: DeadlineScheduler | None = None,
+    total: int = 0,
+) -> Iterator[Tuple[ContextRecord, Optional[LLMResult], ScheduleMode]]:
+    """Run ``jobs`` and yield ``(context, result, mode)`` for every context.
+
+    Skipped contexts yield ``None``. With ``pipeline_depth``, jobs run on a
+    :class:`PipelinedExecutor` with queues of that size. Each finished job
+    is recorded with ``scheduler`` on this thread, which then picks the mode
+    for the ``total`` contexts minus those finished so far.
+    """
+
+    if scheduler is not None:
+        scheduler.begin()
+        scheduler.next_mode(total)
+    done = (
+        PipelinedExecutor(pipeline_depth).run(jobs)
+        if pipeline_depth
+        else ((job, run_job(job)) for job in jobs)
+    )
+    finished = 0
+    for job, results in done:
+        batch, mode = job.payload
+        if scheduler is not None:
+            finished += len(batch)
+            scheduler.record(mode, len(batch))
+            scheduler.next_mode(total - finished)
+        if job.model is None:
+            for ctx in batch:
+                yield ctx, None, mode
+        else:
+            for ctx, result in zip(batch, results):
+                yield ctx, result, mode
+
+
+def _default_prediction(record: ContextRecord, label_source: str) -> dict:
+    """``none`` prediction for a context that is not sent to the model."""
+
+    return {
+        "context_id": record.context_id,
+        "final_label": "none",
+        "confidence": 1.0 if label_source == "no_mention_shortcut" else 0.0,
+        "raw_output": "",
+        "used_strategy": "",
+        "label_source": label_source,
+        "logits": {},
+    }
+
+
 def run_pipeline(
-    contexts: Iterable[ContextUnit],
+    contexts: Iterable[ContextRecord | ContextUnit],
     *,
     model: BaseInferenceModel,
     enable_reask: bool,
     output_csv: Path,
     save_errors: bool,
-) -> None:
-    """Run inference, optional refinement and submission generation."""
+    batch_size: int | None = None,
+    doc_store: DocumentStore | None = None,
+    dedup_threshold: float | None = None,
+    no_mention_shortcut: bool = False,
+    parsed_docs: Iterable[ParsedDoc] | None = None,
+    time_budget_s: float | None = None,
+    fallback_model: BaseInferenceModel | None = None,
+    pipeline_depth: int = 0,
+    max_reasks: int | None = None,
+    reask_token_budget: int | None = None,
+    reask_time_budget_s: float | None = None,
+    reask_priority: GainCriterion = "margin",
+    question_ranker: QuestionRanker | None = None,
+    question_top_n: int | None = None,
+) -> Dict[str, Any]:
+    """Run inference, optional refinement and submission generation.
+
+    ``batch_size`` defaults to the runtime profile tuned for this machine
+    (see ``scripts/tune.py``) when running on CPU; its thread settings are
+    applied by :func:`get_inference_model`.
+    ``doc_store`` supplies the text of offset-only context units.
+    ``ContextUnit`` inputs are converted to :class:`ContextRecord` on the fly.
+
+    With ``dedup_threshold``, contexts whose estimated Jaccard similarity
+    reaches it are clustered (see :class:`MinHashLSH`); only the first
+    context of each cluster is inferred and its prediction is copied to the
+    other members, with the representative's id as ``cluster_id``.
+
+    With ``enable_reask``, low-confidence contexts are refined after
+    inference in one batched pass (see :meth:`RefinementEngine.run_batch`)
+    that re-asks ``model``; the first accepted proposal sets the label and
+    ends the context's questions. ``max_reasks`` caps the questions asked
+    per context; skipped questions are counted in the run summary.
+    Contexts are re-asked in order of expected gain (``reask_priority``, see
+    :class:`ReaskBudgetAllocator`) until ``reask_token_budget`` or
+    ``reask_time_budget_s`` (or the ``time_budget_s`` left) is spent;
+    contexts that were not re-asked are saved to ``reask_skipped_*.jsonl``.
+    ``question_ranker`` orders each context's questions by expected gain, so
+    ``max_reasks`` keeps the most useful ones; ``question_top_n`` drops the
+    rest before they are counted as questions (ranking without history when
+    no ``question_ranker`` is given).
+
+    With ``no_mention_shortcut``, documents that mention no DOI or accession
+    (see :class:`MentionGate`) are labelled ``none`` without a model call.
+    They are detected from ``parsed_docs`` when given, otherwise from the
+    context texts.
+
+    With ``time_budget_s``, contexts are inferred in :func:`context_priority`
+    order and a :class:`DeadlineScheduler` degrades the run as the budget
+    runs out. While re-asking, inference leaves ``reask_time_budget_s`` (by
+    default :data:`REASK_SHARE` of the budget) for the re-ask pass; when the
+    remaining contexts no longer fit before that reserve, re-asking stops
+    for them and the reserve goes to inference. Then labels come from the
+    logits of a single generated token, then ``fallback_model`` takes over. Contexts
+    left when the budget is spent are labelled ``none`` with
+    ``label_source="deadline_skip"``. Every prediction records its
+    ``schedule_mode``.
+
+    With ``pipeline_depth``, prompt preparation, the model's forward passes
+    and result decoding overlap on separate threads (see
+    :class:`PipelinedExecutor`); results are identical.
+
+    Returns the run summary, which is also logged and saved next to the
+    predictions.
+    """
+
+    scheduler: DeadlineScheduler | None = None
+    if time_budget_s is not None:
+        reask_reserve_s = 0.0
+        if enable_reask:
+            reask_reserve_s = (
+                reask_time_budget_s
+                if reask_time_budget_s is not None
+                else time_budget_s * REASK_SHARE
+            )
+        scheduler = DeadlineScheduler(
+            time_budget_s,
+            has_fallback=fallback_model is not None,
+            reask_reserve_s=reask_reserve_s,
+        )
+
+    if batch_size is None:
+        profile = load_cpu_runtime_profile()
+        batch_size = profile.batch_size if profile is not None else 1
 
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
 
@@ -91,6 +351,8 @@ def run_pipeline(
     predictions_dir.mkdir(parents=True, exist_ok=True)
     predictions_path = predictions_dir / f"predictions_{timestamp}.jsonl"
     corrections_path = predictions_dir / f"corrections_{timestamp}.jsonl"
+    summary_path = predictions_dir / f"summary_{timestamp}.json"
+    skipped_path = predictions_dir / f"reask_skipped_{timestamp}.jsonl"
 
     errors_path: Path | None = None
     if save_errors:
@@ -98,16 +360,65 @@ def run_pipeline(
         errors_dir.mkdir(parents=True, exist_ok=True)
         errors_path = errors_dir / f"errors_{timestamp}.jsonl"
 
-    refinement = RefinementEngine() if enable_reask else None
+    if question_top_n is not None and question_ranker is None:
+        question_ranker = QuestionRanker()
+    refinement = (
+        RefinementEngine(
+            questioner=SelfQuestioner(ranker=question_ranker, top_n=question_top_n),
+            corrector=SelfCorrector(engine=CorrectionEngine(model)),
+            stop_on_accept=True,
+            max_reasks=max_reasks,
+        )
+        if enable_reask
+        else None
+    )
 
     predictions: List[dict] = []
     corrections: List[dict] = []
     errors: List[dict] = []
 
-    for ctx in contexts:
-        result: LLMResult = model.predict(
-            context_id=ctx.context_id, context=ctx.text
+    records: List[ContextRecord] = [
+        c if isinstance(c, ContextRecord) else ContextRecord.from_unit(c)
+        for c in contexts
+    ]
+
+    skip_docs: Set[str] = set()
+    if no_mention_shortcut:
+        gate = MentionGate()
+        skip_docs = (
+            gate.docs_without_mentions(parsed_docs)
+            if parsed_docs is not None
+            else gate.records_without_mentions(records, doc_store)
+        )
+    to_infer = [r for r in records if r.doc_id not in skip_docs]
+    shortcut_count = len(records) - len(to_infer)
+
+    representative: Dict[str, str] = {}
+    if dedup_threshold is not None:
+        roots = MinHashLSH(dedup_threshold).cluster(
+            [r.resolve_text(doc_store) for r in to_infer]
         )
+        representative = {
+            r.context_id: to_infer[root].context_id for r, root in zip(to_infer, roots)
+        }
+        to_infer = [r for i, r in enumerate(to_infer) if roots[i] == i]
+    deduplicated_count = len(records) - shortcut_count - len(to_infer)
+
+    if scheduler is not None:
+        to_infer = order_by_priority(to_infer)
+    jobs = _batch_jobs(
+        to_infer, model, batch_size, doc_store, scheduler, fallback_model
+    )
+
+    inferred: Dict[str, dict] = {}
+    low_conf_count = 0
+    mode_counts: Dict[str, int] = {}
+    to_refine: List[Tuple[ContextRecord, LLMResult]] = []
+    for ctx, result, mode in _predict(jobs, pipeline_depth, scheduler, len(to_infer)):
+        mode_counts[mode.value] = mode_counts.get(mode.value, 0) + 1
+        if result is None:
+            inferred[ctx.context_id] = _default_prediction(ctx, "deadline_skip")
+            continue
         pred = {
             "context_id": result.context_id,
             "final_label": result.predicted_label,
@@ -117,17 +428,14 @@ def run_pipeline(
             "label_source": result.meta.get("label_source", ""),
             "logits": result.logits,
         }
+        if scheduler is not None:
+            pred["schedule_mode"] = mode.value
 
         low_conf = result.confidence < CONFIDENCE_THRESHOLD
+        low_conf_count += low_conf
 
-        if enable_reask and low_conf and refinement is not None:
-            proposals = refinement.run(ctx.model_dump(), result)
-            for proposal in proposals:
-                corrections.append(asdict(proposal))
-                if proposal.accepted:
-                    pred["final_label"] = proposal.corrected_label
-                    pred["confidence"] = proposal.corrected_confidence
-                    break
+        if refinement is not None and low_conf and mode == ScheduleMode.FULL:
+            to_refine.append((ctx, result))
 
         if save_errors and low_conf:
             errors.append(
@@ -138,7 +446,91 @@ def run_pipeline(
                 }
             )
 
-        predictions.append(pred)
+        inferred[ctx.context_id] = pred
+
+    # re-ask low-confidence contexts in batched passes, by expected gain
+    accepted_count = 0
+    allocator: ReaskBudgetAllocator | None = None
+    if refinement is not None:
+        time_left = scheduler.time_left if scheduler is not None else None
+        if reask_time_budget_s is not None:
+            time_left = (
+                reask_time_budget_s
+                if time_left is None
+                else min(reask_time_budget_s, time_left)
+            )
+        allocator = ReaskBudgetAllocator(
+            token_budget=reask_token_budget,
+            time_budget_s=time_left,
+            criterion=reask_priority,
+        )
+        if max_reasks is not None:
+            allocator.questions_per_context = max_reasks
+        pending: Dict[str, Tuple[ContextRecord, LLMResult]] = {}
+        for ctx, result in to_refine:
+            allocator.push(result, ctx.token_count)
+            pending[ctx.context_id] = (ctx, result)
+        # budgets are re-checked between batches; without one, ask everything at once
+        budgeted = reask_token_budget is not None or time_left is not None
+        step = batch_size if budgeted else max(len(to_refine), 1)
+        while True:
+            chunk = [pending[cid] for cid in allocator.next_batch(step)]
+            if not chunk:
+                break
+            proposal_lists = refinement.run_batch(
+                [(ctx.as_context(doc_store), result) for ctx, result in chunk],
+                batch_size,
+                limits=[allocator.reask_cap(ctx.context_id) for ctx, _ in chunk],
+            )
+            for (ctx, _), proposals in zip(chunk, proposal_lists):
+                allocator.record(ctx.context_id, len(proposals))
+                corrections.extend(asdict(proposal) for proposal in proposals)
+                accepted = next((p for p in proposals if p.accepted), None)
+                if accepted is not None:
+                    pred = inferred[ctx.context_id]
+                    pred["final_label"] = accepted.corrected_label
+                    pred["confidence"] = accepted.corrected_confidence
+                    accepted_count += 1
+
+    for record in records:
+        if record.doc_id in skip_docs:
+            predictions.append(_default_prediction(record, "no_mention_shortcut"))
+        elif representative:
+            # copy the representative's prediction to the cluster member
+            root = representative[record.context_id]
+            predictions.append(
+                {**inferred[root], "context_id": record.context_id, "cluster_id": root}
+            )
+        else:
+            predictions.append(inferred[record.context_id])
+
+    summary = {
+        "contexts": len(records),
+        "no_mention_shortcut": shortcut_count,
+        "deduplicated": deduplicated_count,
+        "inferred": len(inferred) - mode_counts.get(ScheduleMode.SKIP.value, 0),
+        "low_confidence": low_conf_count,
+        "reask_candidates": len(to_refine),
+        "corrections": len(corrections),
+        "accepted_corrections": accepted_count,
+    }
+    if refinement is not None:
+        summary["skipped_questions"] = {
+            "after_accept": refinement.stats.skipped_early,
+            "over_limit": refinement.stats.skipped_over_limit,
+        }
+    if allocator is not None:
+        summary["reask_tokens"] = allocator.spent_tokens
+        summary["reask_skipped"] = {}
+        for skipped in allocator.skipped:
+            reasons = summary["reask_skipped"]
+            reasons[skipped.reason] = reasons.get(skipped.reason, 0) + 1
+    if scheduler is not None:
+        summary["schedule_modes"] = mode_counts
+        summary["elapsed_s"] = round(scheduler.elapsed, 3)
+    logging.info("Run summary: %s", json.dumps(summary))
+    with summary_path.open("w", encoding="utf-8") as fh:
+        json.dump(summary, fh, indent=2)
 
     with predictions_path.open("w", encoding="utf-8") as fh:
         for p in predictions:
@@ -149,6 +541,11 @@ def run_pipeline(
             for c in corrections:
                 fh.write(json.dumps(c) + "\n")
 
+    if allocator is not None and allocator.skipped:
+        with skipped_path.open("w", encoding="utf-8") as fh:
+            for skipped in allocator.skipped:
+                fh.write(json.dumps(asdict(skipped)) + "\n")
+
     if errors_path and errors:
         with errors_path.open("w", encoding="utf-8") as fh:
             for e in errors:
@@ -157,6 +554,7 @@ def run_pipeline(
     output_csv.parent.mkdir(parents=True, exist_ok=True)
     generate_submission(predictions_path, output_csv)
     logging.info("Submission written to %s", output_csv)
+    return summary
 
 
 # ---------------------------------------------------------------------------
@@ -169,7 +567,12 @@ def main() -> None:
     parser.add_argument(
         "--input",
         default="data/context/context.jsonl",
-        help="Path to context units file (JSONL or Parquet)",
+        help="Path to context units file (JSONL or Parquet) or build directory",
+    )
+    parser.add_argument(
+        "--validate-input",
+        action="store_true",
+        help="Validate every unit of a context Parquet file instead of trusting it",
     )
     parser.add_argument("--model", default="llama3", help="Model backend name")
     parser.add_argument(
@@ -182,6 +585,45 @@ def main() -> None:
         action="store_true",
         help="Enable self-questioning refinement for low-confidence samples",
     )
+    parser.add_argument(
+        "--max-reasks",
+        type=int,
+        default=None,
+        help="Ask at most this many self-questions per low-confidence context",
+    )
+    parser.add_argument(
+        "--reask-token-budget",
+        type=int,
+        default=None,
+        help="Total estimated prompt tokens to spend on re-asks",
+    )
+    parser.add_argument(
+        "--reask-time-budget",
+        type=float,
+        default=None,
+        help="Seconds to spend on the re-ask pass; with --time-budget, "
+        "inference leaves this much of the budget for it",
+    )
+    parser.add_argument(
+        "--reask-priority",
+        choices=["margin", "confidence"],
+        default="margin",
+        help="Re-ask contexts with the smallest top-two label margin or "
+        "the lowest confidence first",
+    )
+    parser.add_argument(
+        "--question-history",
+        nargs="+",
+        default=None,
+        help="corrections*.jsonl logs of earlier runs; questions are asked "
+        "in order of their expected gain learned from them",
+    )
+    parser.add_argument(
+        "--question-top-n",
+        type=int,
+        default=None,
+        help="Generate at most this many self-questions per context, best first",
+    )
     parser.add_argument(
         "--output",
         default="data/submission/submission.csv",
@@ -192,18 +634,127 @@ def main() -> None:
         action="store_true",
         help="Save low-confidence samples to data/errors/",
     )
+    parser.add_argument(
+        "--replay-log",
+        default=None,
+        help="Record prompts and outputs to this JSONL replay log",
+    )
+    parser.add_argument(
+        "--replay-sample-rate",
+        type=float,
+        default=1.0,
+        help="Fraction of inferences written to the replay log",
+    )
+    parser.add_argument(
+        "--replay-compression",
+        choices=["gzip", "zstd"],
+        default=None,
+        help="Compress rotated replay log segments",
+    )
+    parser.add_argument(
+        "--stub-latency-ms",
+        type=float,
+        default=0.0,
+        help="Simulated per-call latency for the 'stub' backend",
+    )
+    parser.add_argument(
+        "--doc-store",
+        default=None,
+        help="Document store for offset-only contexts "
+        "(default: the .docs file next to --input, if present)",
+    )
+    parser.add_argument(
+        "--dedup-threshold",
+        type=float,
+        default=None,
+        help="Infer one context per cluster of near-duplicates at this "
+        "MinHash Jaccard similarity (e.g. 0.8); disabled by default",
+    )
+    parser.add_argument(
+        "--no-mention-shortcut",
+        action="store_true",
+        help="Label contexts of documents without any DOI or accession "
+        "mention as 'none' without calling the model",
+    )
+    parser.add_argument(
+        "--docs",
+        default=None,
+        help="Parsed documents (JSONL) used by --no-mention-shortcut "
+        "(default: scan the context texts)",
+    )
+    parser.add_argument(
+        "--time-budget",
+        type=float,
+        default=None,
+        help="Wall-clock budget in seconds; contexts are processed by "
+        "priority and the run degrades to cheaper modes to finish in time",
+    )
+    parser.add_argument(
+        "--fallback-model",
+        default=None,
+        help="Cheap model backend used for the tail of a --time-budget run",
+    )
+    parser.add_argument(
+        "--fallback-model-path",
+        default=None,
+        help="Filesystem path to the fallback model weights",
+    )
+    parser.add_argument(
+        "--pipeline-depth",
+        type=int,
+        default=0,
+        help="Overlap tokenization and decoding with the model using queues "
+        "of this many batches (0 runs every stage inline)",
+    )
+    parser.add_argument(
+        "--compile",
+        action="store_true",
+        help="Run the llama3 backend through torch.compile with a persistent cache",
+    )
     args = parser.parse_args()
+    if args.compile and args.model.lower() != "llama3":
+        parser.error("--compile is only supported with --model llama3")
 
     logging.basicConfig(
         level=logging.INFO,
         format="%(asctime)s - %(levelname)s - %(message)s",
     )
 
-    contexts = load_contexts(args.input)
+    contexts = load_records(args.input, validate=args.validate_input)
     logging.info("Loaded %d context units", len(contexts))
+    store_path = (
+        Path(args.doc_store) if args.doc_store else default_store_path(args.input)
+    )
+    doc_store = DocumentStore.open(store_path) if store_path.exists() else None
 
+    replay_logger = (
+        PromptReplayLogger(
+            args.replay_log,
+            sample_rate=args.replay_sample_rate,
+            compression=args.replay_compression,
+        )
+        if args.replay_log
+        else None
+    )
+    model_kwargs = {}
+    if args.model.lower() == "stub":
+        model_kwargs["latency_ms"] = args.stub_latency_ms
+    if args.compile:
+        model_kwargs["compile"] = True
     model = get_inference_model(
-        model_name=args.model, model_path=args.model_path
+        model_name=args.model,
+        model_path=args.model_path,
+        replay_log=replay_logger,
+        **model_kwargs,
+    )
+
+    fallback_model = (
+        get_inference_model(
+            model_name=args.fallback_model,
+            model_path=args.fallback_model_path,
+        )
+        if args.fallback_model or args.fallback_model_path
+        else None
     )
 
     run_pipeline(
@@ -212,7 +763,28 @@ def main() -> None:
         enable_reask=args.reask,
         output_csv=Path(args.output),
         save_errors=args.save_errors,
+        doc_store=doc_store,
+        dedup_threshold=args.dedup_threshold,
+        no_mention_shortcut=args.no_mention_shortcut,
+        parsed_docs=iter_parsed_docs(args.docs) if args.docs else None,
+        time_budget_s=args.time_budget,
+        fallback_model=fallback_model,
+        pipeline_depth=args.pipeline_depth,
+        max_reasks=args.max_reasks,
+        reask_token_budget=args.reask_token_budget,
+        reask_time_budget_s=args.reask_time_budget,
+        reask_priority=args.reask_priority,
+        question_ranker=(
+            QuestionRanker.from_corrections(args.question_history)
+            if args.question_history
+            else None
+        ),
+        question_top_n=args.question_top_n,
     )
+    if doc_store is not None:
+        doc_store.close()
+    if replay_logger is not None:
+        replay_logger.close()
 
 
 if __name__ == "__main__":
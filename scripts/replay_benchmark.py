@@ -0,0 +1,136 @@
+"""Replay a recorded prompt log against an inference backend.
+
+Example::
+
+    python scripts/replay_benchmark.py \
+      --replay-log data/predictions/replay.jsonl \
+      --model qwen --model-path /kaggle/input/qwen \
+      --batch-sizes 1,4,8 \
+      --report output/bench/replay_report.json
+
+Each batch size runs in a fresh interpreter, so ``peak_rss_mb`` is the peak
+of that batch size alone rather than of every size benchmarked before it.
+The JSON report is written with sorted keys so that reports from different
+commits can be compared with ``diff``.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+
+import argparse
+import json
+import logging
+import subprocess
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from utils.llm_inference.replay_benchmark import (  # noqa: E402
+    BatchBenchmarkResult,
+    write_report,
+)
+
+
+def _child(args: argparse.Namespace) -> None:
+    from dataclasses import asdict
+
+    from utils.llm_inference.base_inference import get_inference_model
+    from utils.llm_inference.replay_benchmark import ReplayBenchmark
+
+    model = get_inference_model(model_name=args.model, model_path=args.model_path)
+    bench = ReplayBenchmark.from_log(
+        model, args.replay_log, limit=args.limit, warmup=args.warmup
+    )
+    (result,) = bench.run([int(args.batch_sizes)])
+    print(json.dumps(asdict(result)))
+
+
+def _run_isolated(args: argparse.Namespace, batch_size: int) -> BatchBenchmarkResult:
+    cmd = [
+        sys.executable,
+        __file__,
+        "--replay-log",
+        args.replay_log,
+        "--model",
+        args.model,
+        "--batch-sizes",
+        str(batch_size),
+        "--warmup",
+        str(args.warmup),
+        "--child",
+    ]
+    if args.model_path is not None:
+        cmd += ["--model-path", args.model_path]
+    if args.limit is not None:
+        cmd += ["--limit", str(args.limit)]
+    out = subprocess.run(cmd, check=True, capture_output=True, text=True)
+    return BatchBenchmarkResult(**json.loads(out.stdout.strip().splitlines()[-1]))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Replay-driven inference benchmark")
+    parser.add_argument("--replay-log", required=True, help="Replay log to replay")
+    parser.add_argument("--model", default="llama3", help="Model backend name")
+    parser.add_argument(
+        "--model-path",
+        default=None,
+        help="Filesystem path to the model weights directory",
+    )
+    parser.add_argument(
+        "--batch-sizes",
+        default="1",
+        help="Comma separated batch sizes to benchmark",
+    )
+    parser.add_argument(
+        "--limit", type=int, default=None, help="Replay at most N records"
+    )
+    parser.add_argument(
+        "--warmup", type=int, default=1, help="Records run before timing"
+    )
+    parser.add_argument(
+        "--report",
+        default="output/bench/replay_report.json",
+        help="Path to write the JSON report",
+    )
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        _child(args)
+        return
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(levelname)s - %(message)s",
+    )
+
+    batch_sizes = [int(b) for b in args.batch_sizes.split(",") if b.strip()]
+    results = []
+    for size in batch_sizes:
+        r = _run_isolated(args, size)
+        results.append(r)
+        logging.info(
+            "batch=%d throughput=%.2f/s p50=%.1fms p95=%.1fms rss=%.0fMB agreement=%.3f",
+            r.batch_size,
+            r.throughput,
+            r.p50_latency_ms,
+            r.p95_latency_ms,
+            r.peak_rss_mb,
+            r.label_agreement,
+        )
+    write_report(
+        args.report,
+        results,
+        meta={
+            "model": args.model,
+            "model_path": args.model_path,
+            "replay_log": args.replay_log,
+            "num_records": results[0].num_records if results else 0,
+        },
+    )
+    logging.info("Report written to %s", args.report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""Autotune CPU execution parameters and write a runtime profile.
+
+Example::
+
+    python scripts/tune.py --model qwen --model-path /models/qwen \
+      --input data/context/context.jsonl --sample 32
+
+Every combination of intra-op threads, inter-op threads, batch size and
+dtype is measured with the real model on a sample of context units. The
+fastest configuration is stored in the runtime profile file, keyed by a
+hardware fingerprint; ``get_inference_model`` and ``run_pipeline`` load it
+automatically on matching hardware.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+
+import argparse
+import json
+import logging
+import random
+from pathlib import Path
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from config.path_config import RUNTIME_PROFILE_PATH  # noqa: E402
+from scripts.main_pipeline import load_records  # noqa: E402
+from utils.context_builder.document_store import (  # noqa: E402
+    DocumentStore,
+    default_store_path,
+)
+from utils.llm_inference.autotuner import CPUAutotuner, summarize  # noqa: E402
+from utils.llm_inference.runtime_profile import save_runtime_profile  # noqa: E402
+
+
+def _ints(value: str):
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Tune CPU inference settings")
+    parser.add_argument("--model", default="llama3", help="Model backend name")
+    parser.add_argument("--model-path", default=None, help="Model weights path")
+    parser.add_argument(
+        "--input",
+        default="data/context/context.jsonl",
+        help="Context units to sample prompts from (JSONL or Parquet)",
+    )
+    parser.add_argument(
+        "--doc-store",
+        default=None,
+        help="Document store for offset-only contexts "
+        "(default: the .docs file next to --input, if present)",
+    )
+    parser.add_argument("--sample", type=int, default=32, help="Contexts per trial")
+    parser.add_argument("--intra-op", type=_ints, default=None)
+    parser.add_argument("--inter-op", type=_ints, default=[1, 2])
+    parser.add_argument("--batch-sizes", type=_ints, default=[1, 4, 8])
+    parser.add_argument("--dtypes", default="float32,bfloat16")
+    parser.add_argument("--max-new-tokens", type=int, default=8)
+    parser.add_argument("--profile", default=str(RUNTIME_PROFILE_PATH))
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(levelname)s - %(message)s",
+    )
+
+    contexts = load_records(args.input)
+    random.Random(args.seed).shuffle(contexts)
+    store_path = (
+        Path(args.doc_store) if args.doc_store else default_store_path(args.input)
+    )
+    store = DocumentStore.open(store_path) if store_path.exists() else None
+    texts = [c.resolve_text(store) for c in contexts[: args.sample]]
+    if store is not None:
+        store.close()
+    if not all(texts):
+        # contexts written with --omit-text only hold offsets into the store
+        parser.error("sampled contexts have no text; pass their --doc-store")
+    logging.info("Tuning on %d sampled contexts", len(texts))
+
+    tuner = CPUAutotuner(
+        args.model,
+        args.model_path,
+        intra_op_threads=args.intra_op,
+        inter_op_threads=args.inter_op,
+        batch_sizes=args.batch_sizes,
+        dtypes=[d.strip() for d in args.dtypes.split(",") if d.strip()],
+        max_new_tokens=args.max_new_tokens,
+    )
+    results = tuner.run(texts)
+    print(json.dumps(summarize(results), indent=2))
+
+    profile = CPUAutotuner.best_profile(results)
+    path = save_runtime_profile(profile, args.profile)
+    logging.info(
+        "Best: %d intra / %d inter threads, batch %d, %s "
+        "(%.1f tok/s); profile written to %s",
+        profile.intra_op_threads,
+        profile.inter_op_threads,
+        profile.batch_size,
+        profile.dtype,
+        profile.tokens_per_sec,
+        path,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+from utils.context_builder import build_context
+from utils.context_builder.approx_counter import ApproxTokenCounter
+from utils.context_builder.tokenizer_wrapper import TokenCounter
+from utils.context_builder.validator import recheck_token_counts, validate_contexts
+from utils.parsed_doc import ParsedDoc
+
+
+class SubwordTokenizer:
+    """Stand-in tokenizer: one token per 3 characters of each word."""
+
+    model_name = "subword"
+
+    def count_tokens(self, text):
+        return sum(-(-len(w) // 3) for w in text.split())
+
+
+class DigitSplittingTokenizer(SubwordTokenizer):
+    """Like :class:`SubwordTokenizer`, but every digit is its own token."""
+
+    def count_tokens(self, text):
+        digits = sum(c.isdigit() for c in text)
+        letters = "".join(" " if c.isdigit() else c for c in text)
+        return super().count_tokens(letters) + digits
+
+    def count_tokens_batch(self, texts, batch_size=1024):
+        return [self.count_tokens(t) for t in texts]
+
+
+SAMPLES = [
+    "Raw sequencing reads were deposited in GEO under accession GSE12345.",
+    "Data are available from the corresponding author on reasonable request.",
+    "We thank the reviewers.",
+    "The crystal structure has been deposited in the Protein Data Bank.",
+    "Supplementary tables list all primers used in this study.",
+]
+
+
+def test_calibrated_counter_respects_error_bound():
+    tokenizer = SubwordTokenizer()
+    counter = ApproxTokenCounter.calibrate(SAMPLES, tokenizer)
+    assert isinstance(counter, TokenCounter)
+    bound = 1 + counter.max_relative_error
+    for text in SAMPLES:
+        assert tokenizer.count_tokens(text) <= counter.count_tokens(text) * bound + 1e-9
+    assert len(counter.encode(SAMPLES[0])) == counter.count_tokens(SAMPLES[0])
+
+
+def test_build_context_with_approx_counter():
+    doc = ParsedDoc(
+        doc_id="DOC1",
+        source_type="xml",
+        title="Sample Title",
+        abstract="This is the abstract. It has two sentences.",
+        body=" ".join(SAMPLES * 4),
+    )
+    contexts = build_context(doc, max_tokens=40, stride=8, counter="approx")
+    margin = ApproxTokenCounter().max_relative_error
+    windows = contexts[1:]
+    assert windows
+    assert validate_contexts(windows, 40, safety_margin=margin) == windows
+
+
+def test_digit_feature_tracks_digit_splitting_tokenizers():
+    tokenizer = DigitSplittingTokenizer()
+    accession = "Reads are in GenBank MN908947 and GSE123456 (doi:10.5061/dryad.8515)."
+    counter = ApproxTokenCounter.calibrate(SAMPLES + [accession] * 2, tokenizer)
+    assert counter.calibration.calibrated
+    assert counter.calibration.digit_coef > 0.5
+    assert counter.count_tokens(accession) >= tokenizer.count_tokens(accession)
+    assert not ApproxTokenCounter().calibration.calibrated
+
+
+def test_recheck_replaces_counts_and_drops_oversized_windows():
+    doc = ParsedDoc(
+        doc_id="DOC2",
+        source_type="xml",
+        title="Accessions",
+        abstract="",
+        body=" ".join(["Reads: SRR1234567, SRR7654321 and SRR1122334."] * 12),
+    )
+    contexts = build_context(doc, max_tokens=40, stride=8, counter="approx")
+    tokenizer = DigitSplittingTokenizer()
+    checked = recheck_token_counts(contexts, tokenizer, 40)
+    assert checked
+    for ctx in checked:
+        assert ctx.token_count == tokenizer.count_tokens(ctx.text) <= 40
+    dropped = [c for c in contexts if c not in checked]
+    assert all(tokenizer.count_tokens(c.text) > 40 for c in dropped)
@@ -0,0 +1,130 @@
+import json
+
+from scripts.main_pipeline import run_pipeline
+from utils.context_builder import ContextRecord
+from utils.llm_inference.stub_inference import StubInferenceModel
+from utils.refinement.question_ranker import QuestionRanker
+
+
+class UnsureStub(StubInferenceModel):
+    """Unsure about first-pass prompts, confident about re-asks."""
+
+    def __init__(self, latency_ms=0.0):
+        super().__init__(latency_ms=latency_ms)
+        self.batches = []
+
+    def predict_batch(self, items, **kwargs):
+        self.batches.append(len(items))
+        results = super().predict_batch(items, **kwargs)
+        for (_, context), result in zip(items, results):
+            reask = "Question:" in context
+            result.predicted_label = "primary" if reask else "secondary"
+            result.confidence = 0.95 if reask else 0.5
+        return results
+
+
+def test_run_pipeline_reasks_low_confidence_in_batches(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    records = [
+        ContextRecord(f"reask_{i}", "DOC", f"We reused the XYZ{i} dataset.", "body", 8)
+        for i in range(3)
+    ]
+    model = UnsureStub()
+    summary = run_pipeline(
+        records,
+        model=model,
+        enable_reask=True,
+        output_csv=tmp_path / "submission.csv",
+        save_errors=False,
+        batch_size=3,
+    )
+    assert summary["reask_candidates"] == 3
+    assert summary["accepted_corrections"] == 3
+    # one inference batch, then the re-asks of all contexts together
+    assert model.batches[0] == 3
+    assert sum(model.batches[1:]) == summary["corrections"]
+    assert max(model.batches[1:]) == 3
+    # the first question is accepted for every context
+    assert summary["corrections"] == 3
+    assert summary["skipped_questions"]["after_accept"] > 0
+    (path,) = (tmp_path / "data" / "predictions").glob("predictions_*.jsonl")
+    rows = [json.loads(line) for line in path.open()]
+    assert {r["final_label"] for r in rows} == {"primary"}
+
+    # the corrections log is the ranker's training data
+    (log,) = (tmp_path / "data" / "predictions").glob("corrections_*.jsonl")
+    ranker = QuestionRanker.from_corrections(log)
+    asked = json.loads(log.open().readline())["metadata"]["question_type"]
+    assert ranker.score(asked, "secondary") > ranker.score("unseen", "secondary")
+
+
+def test_run_pipeline_records_skipped_reasks(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    records = [
+        ContextRecord(f"budget_{i}", "DOC", f"We reused the ABC{i} data.", "body", 50)
+        for i in range(4)
+    ]
+    summary = run_pipeline(
+        records,
+        model=UnsureStub(),
+        enable_reask=True,
+        output_csv=tmp_path / "submission.csv",
+        save_errors=False,
+        batch_size=4,
+        max_reasks=1,
+        reask_token_budget=200,
+    )
+    # each re-ask is estimated at 50 + 32 tokens, so two fit
+    assert summary["accepted_corrections"] == 2
+    assert summary["reask_tokens"] == 164
+    assert summary["reask_skipped"] == {"token budget": 2}
+    (path,) = (tmp_path / "data" / "predictions").glob("reask_skipped_*.jsonl")
+    assert len([json.loads(line) for line in path.open()]) == 2
+
+
+def test_deadline_stops_reasking_to_save_time(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    records = [
+        ContextRecord(f"deadline_{i}", "DOC", f"We reused the XYZ{i} dataset.", "body", 8)
+        for i in range(6)
+    ]
+    kwargs = dict(
+        enable_reask=True,
+        output_csv=tmp_path / "submission.csv",
+        save_errors=False,
+        batch_size=2,
+        time_budget_s=5.0,
+    )
+    model = UnsureStub(latency_ms=20)
+    unhurried = run_pipeline(records, model=model, **kwargs)
+    assert unhurried["schedule_modes"] == {"full": 6}
+    assert sum(model.batches) == 12
+
+    # a 4.99 s re-ask reserve leaves too little for all contexts in full mode
+    records = [ContextRecord(r.context_id + "_b", "DOC", r.text, "body", 8) for r in records]
+    model = UnsureStub(latency_ms=20)
+    hurried = run_pipeline(records, model=model, reask_time_budget_s=4.99, **kwargs)
+    assert hurried["schedule_modes"] == {"full": 2, "no_reask": 4}
+    assert hurried["reask_candidates"] == hurried["corrections"] == 2
+    # fewer model calls, so less time spent than the unhurried run
+    assert sum(model.batches) == 8
+    assert hurried["elapsed_s"] < unhurried["elapsed_s"]
+
+
+def test_question_top_n_limits_generated_questions(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    records = [
+        ContextRecord(f"top_n_{i}", "DOC", f"We reused the XYZ{i} dataset.", "body", 8)
+        for i in range(2)
+    ]
+    summary = run_pipeline(
+        records,
+        model=UnsureStub(),
+        enable_reask=True,
+        output_csv=tmp_path / "submission.csv",
+        save_errors=False,
+        batch_size=2,
+        question_top_n=1,
+    )
+    assert summary["corrections"] == 2
+    assert summary["skipped_questions"]["after_accept"] == 0
@@ -0,0 +1,81 @@
+from utils.llm_inference.base_inference import LLMResult
+from utils.refinement.budget_allocator import ReaskBudgetAllocator, expected_gain
+
+
+def _result(context_id, confidence, logits):
+    return LLMResult(context_id, "primary", confidence, "", "", logits, {})
+
+
+def test_expected_gain_prefers_small_margins():
+    close = _result("a", 0.6, {"primary": 1.0, "secondary": 0.9, "none": -2.0})
+    clear = _result("b", 0.6, {"primary": 3.0, "secondary": 0.0, "none": -2.0})
+    assert expected_gain(close) > expected_gain(clear)
+    assert expected_gain(close, "confidence") == expected_gain(clear, "confidence")
+    assert expected_gain(_result("c", 0.3, {})) == 0.7
+
+
+def test_token_budget_keeps_gain_order():
+    allocator = ReaskBudgetAllocator(
+        token_budget=300, questions_per_context=1, question_tokens=0
+    )
+    allocator.push(_result("low", 0.9, {}), 100)
+    allocator.push(_result("big", 0.2, {}), 250)
+    allocator.push(_result("mid", 0.5, {}), 100)
+    allocator.push(_result("top", 0.1, {}), 150)
+
+    # "big" waits behind "top" instead of being dropped
+    assert allocator.next_batch(10) == ["top"]
+    allocator.record("top", 1)
+    assert allocator.next_batch(10) == ["mid"]
+    allocator.record("mid", 1)
+    assert allocator.next_batch(10) == []
+    assert allocator.spent_tokens == 250
+    assert [(s.context_id, s.reason) for s in allocator.skipped] == [
+        ("big", "token budget"),
+        ("low", "token budget"),
+    ]
+
+
+def test_token_budget_is_mostly_spent_across_contexts():
+    allocator = ReaskBudgetAllocator(token_budget=1000)
+    for i in range(10):
+        allocator.push(_result(f"c{i}", 0.5 - i / 100, {}), 68)
+
+    served = []
+    while True:
+        batch = allocator.next_batch(4)
+        if not batch:
+            break
+        for context_id in batch:
+            # the first question is accepted, so one re-ask is used
+            assert 1 <= allocator.reask_cap(context_id) <= 8
+            allocator.record(context_id, 1)
+            served.append(context_id)
+
+    assert served == [f"c{i}" for i in range(9, -1, -1)]
+    assert allocator.spent_tokens == 1000
+    assert allocator.skipped == []
+
+
+def test_granted_reasks_never_exceed_the_budget():
+    allocator = ReaskBudgetAllocator(token_budget=1000)
+    for i in range(10):
+        allocator.push(_result(f"c{i}", 0.5, {}), 68)
+    while batch := allocator.next_batch(4):
+        for context_id in batch:
+            allocator.record(context_id, allocator.reask_cap(context_id))
+    assert allocator.spent_tokens == 1000
+    assert len(allocator.skipped) == 8
+
+
+def test_time_budget_skips_the_rest():
+    now = [0.0]
+    allocator = ReaskBudgetAllocator(time_budget_s=5.0, clock=lambda: now[0])
+    for i in range(4):
+        allocator.push(_result(f"c{i}", i / 10, {}), 10)
+    assert allocator.next_batch(2) == ["c0", "c1"]
+    now[0] = 6.0
+    assert allocator.next_batch(2) == []
+    assert {s.context_id for s in allocator.skipped} == {"c2", "c3"}
+    assert {s.reason for s in allocator.skipped} == {"time budget spent"}
+
@@ -0,0 +1,44 @@
+import pandas as pd
+
+from utils.context_builder import build_from_jsonl
+from utils.parsed_doc import ParsedDoc
+
+
+def _write_docs(path, n):
+    with path.open("w", encoding="utf-8") as fh:
+        for i in range(n):
+            body = " ".join(f"Sentence {j} of paper {i}." for j in range(30))
+            doc = ParsedDoc(doc_id=f"D{i}", source_type="xml", title=f"T{i}", body=body)
+            fh.write(doc.model_dump_json() + "\n")
+
+
+def test_parallel_build_matches_sequential(tmp_path):
+    docs = tmp_path / "docs.jsonl"
+    _write_docs(docs, 12)
+    seq = build_from_jsonl(
+        docs, tmp_path / "seq.jsonl", max_tokens=48, stride=8, counter="approx"
+    )
+    par = build_from_jsonl(
+        docs,
+        tmp_path / "par.jsonl",
+        max_tokens=48,
+        stride=8,
+        counter="approx",
+        workers=2,
+        chunk_size=3,
+        max_in_flight=2,
+    )
+    assert seq["documents"] == par["documents"] == 12
+    assert seq["contexts"] == par["contexts"] > 12
+    assert (tmp_path / "seq.jsonl").read_text() == (tmp_path / "par.jsonl").read_text()
+
+
+def test_parquet_output(tmp_path):
+    docs = tmp_path / "docs.jsonl"
+    _write_docs(docs, 3)
+    stats = build_from_jsonl(
+        docs, tmp_path / "ctx.parquet", max_tokens=48, stride=8, counter="approx"
+    )
+    df = pd.read_parquet(tmp_path / "ctx.parquet")
+    assert len(df) == stats["contexts"]
+    assert df["doc_id"].iloc[0] == "D0"
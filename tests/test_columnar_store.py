@@ -0,0 +1,72 @@
+import pyarrow.parquet as pq
+
+from utils.context_builder import build_context
+from utils.context_builder.columnar_store import (
+    CONTEXT_SCHEMA,
+    iter_parquet_contexts,
+    iter_parquet_records,
+    iter_record_batches,
+    write_parquet,
+)
+from utils.parsed_doc import ParsedDoc
+
+
+def _contexts():
+    doc = ParsedDoc(
+        doc_id="DOC1",
+        source_type="xml",
+        title="Sample Title",
+        abstract="This is the abstract. It has two sentences.",
+        body="Reads were deposited in GEO under GSE12345. More text here.\n"
+        "Structures are in PDB 1ABC. We thank the reviewers.",
+    )
+    windows = build_context(doc, max_tokens=24, stride=4, counter="approx")
+    mentions = build_context(
+        doc, max_tokens=24, stride=4, counter="approx", mode="mentions"
+    )
+    return windows + mentions
+
+
+def test_parquet_round_trip(tmp_path):
+    contexts = _contexts()
+    path = write_parquet(contexts, tmp_path / "ctx.parquet", row_group_size=2)
+    assert pq.read_schema(path).equals(CONTEXT_SCHEMA)
+    loaded = list(iter_parquet_contexts(path, batch_size=3))
+    assert [c.model_dump() for c in loaded] == [c.model_dump() for c in contexts]
+    assert any(c.mentions for c in loaded)
+    assert loaded[0].char_start is None
+
+
+def test_record_batches_select_columns(tmp_path):
+    contexts = _contexts()
+    path = write_parquet(contexts, tmp_path / "ctx.parquet")
+    batches = list(iter_record_batches(path, columns=["context_id", "token_count"]))
+    assert batches[0].schema.names == ["context_id", "token_count"]
+    assert sum(b.num_rows for b in batches) == len(contexts)
+
+
+def test_records_read_straight_from_columns_match_units(tmp_path):
+    from scripts.main_pipeline import load_records
+    from utils.context_builder import ContextRecord
+
+    contexts = _contexts()
+    path = write_parquet(contexts, tmp_path / "ctx.parquet", row_group_size=2)
+    expected = [ContextRecord.from_unit(c) for c in contexts]
+    assert list(iter_parquet_records(path, batch_size=3)) == expected
+    assert load_records(str(path)) == expected
+    assert load_records(str(path), validate=True) == expected
+    assert any(r.mentions for r in expected)
+
+
+def test_streaming_writer_buffers_at_most_one_row_group(tmp_path):
+    from utils.context_builder.columnar_store import ParquetContextWriter
+
+    contexts = _contexts()
+    with ParquetContextWriter(tmp_path / "ctx.parquet", row_group_size=3) as writer:
+        for context in contexts:
+            writer.write([context])
+            assert len(writer._pending) < 3
+    metadata = pq.ParquetFile(tmp_path / "ctx.parquet").metadata
+    assert metadata.num_row_groups == -(-len(contexts) // 3)
+    with ParquetContextWriter(tmp_path / "default.parquet") as writer:
+        assert writer.row_group_size <= 4096
@@ -0,0 +1,58 @@
+import pytest
+
+from utils.context_builder import check_context_ids
+from utils.context_builder.validator import verify_context_ids
+from utils.context_builder.context_formatter import format_context, make_context_id
+
+
+def _unit(text="Data are in GSE1.", start=0, context_id=None):
+    ctx = format_context(
+        doc_id="DOC1",
+        text=text,
+        section="body",
+        start_sentence_idx=start,
+        end_sentence_idx=start + 1,
+        original_paragraph_id=0,
+        token_count=5,
+        importance_score=0.5,
+    )
+    if context_id is not None:
+        ctx.context_id = context_id
+    return ctx
+
+
+def test_context_id_is_content_hash():
+    assert _unit().context_id == _unit().context_id
+    assert _unit().context_id != _unit(text="Other text.").context_id
+    assert _unit().context_id != _unit(start=3).context_id
+    assert _unit().context_id == make_context_id(
+        "DOC1", "body", 0, 1, "Data are in GSE1."
+    )
+
+
+def test_check_context_ids_drops_repeats_and_detects_collisions():
+    seen = {}
+    assert len(check_context_ids([_unit(), _unit(start=2)], seen)) == 2
+    assert check_context_ids([_unit()], seen) == []
+    with pytest.raises(ValueError):
+        check_context_ids([_unit(start=5, context_id=_unit().context_id)], seen)
+
+
+def test_seen_ids_hold_compact_digests():
+    seen = {}
+    check_context_ids([_unit(), _unit(start=2)], seen)
+    assert all(isinstance(k, int) and k < 2**64 for k in seen)
+    assert all(isinstance(v, int) and v < 2**64 for v in seen.values())
+
+
+def test_suspected_collisions_are_confirmed_by_rereading():
+    seen, suspects = {}, []
+    first = _unit()
+    clash = _unit(start=5, context_id=first.context_id)
+    kept = check_context_ids([first, clash], seen, suspects)
+    assert kept == [first, clash]
+    assert suspects == [(first.context_id, ("DOC1", "body", 5, 6, None, None))]
+    with pytest.raises(ValueError, match="collision"):
+        verify_context_ids(suspects, kept)
+    # a digest clash between different ids is not a collision
+    verify_context_ids(suspects, [clash])
@@ -0,0 +1,73 @@
+from utils.context_builder import DocumentStore, DocumentStoreWriter, build_context
+from utils.parsed_doc import ParsedDoc
+
+
+def _doc():
+    return ParsedDoc(
+        doc_id="DOC1",
+        source_type="xml",
+        title="Sample Title",
+        abstract="This is the abstract. It has two sentences.",
+        body=(
+            "Reads were deposited in GEO under GSE12345. "
+            "Structures are in the PDB.\nData are available on request. "
+            "We thank the reviewers."
+        ),
+    )
+
+
+def test_store_round_trip_ascii_and_unicode(tmp_path):
+    store = DocumentStore()
+    store.add("a", "plain ascii text")
+    store.add("b", "Größe des Datensatzes: 5 µl")
+    path = store.save(tmp_path / "docs.docs")
+
+    opened = DocumentStore.open(path)
+    try:
+        assert "a" in opened and len(opened) == 2
+        assert opened.slice("a", 6, 11) == "ascii"
+        assert opened.slice("b", 0, 5) == "Größe"
+        assert opened.text("b") == "Größe des Datensatzes: 5 µl"
+    finally:
+        opened.close()
+
+
+def test_offset_units_reproduce_window_text():
+    doc = _doc()
+    inline = build_context(doc, max_tokens=20, stride=5, counter="approx")
+    store = DocumentStore()
+    offsets = build_context(
+        doc, max_tokens=20, stride=5, counter="approx", store=store
+    )
+    assert len(inline) == len(offsets)
+    for full, ref in zip(inline[1:], offsets[1:]):
+        assert ref.text == ""
+        assert (ref.char_start, ref.char_end) == (full.char_start, full.char_end)
+        assert ref.resolve_text(store) == full.text
+
+
+def test_context_ids_do_not_depend_on_store():
+    doc = _doc()
+    first = build_context(doc, max_tokens=20, stride=5, counter="approx")
+    again = build_context(doc, max_tokens=20, stride=5, counter="approx")
+    stored = build_context(
+        doc, max_tokens=20, stride=5, counter="approx", store=DocumentStore()
+    )
+    ids = [c.context_id for c in first]
+    assert ids == [c.context_id for c in again] == [c.context_id for c in stored]
+    assert len(set(ids)) == len(ids)
+
+
+def test_writer_appends_documents_as_they_arrive(tmp_path):
+    path = tmp_path / "docs.docs"
+    with DocumentStoreWriter(path) as writer:
+        writer.add("a", "plain ascii text")
+        writer.add("b", "Größe")
+        writer.add("a", "ignored repeat")
+    assert path.read_bytes() == "plain ascii textGröße".encode("utf-8")
+    opened = DocumentStore.open(path)
+    try:
+        assert opened.text("a") == "plain ascii text"
+        assert opened.slice("b", 0, 5) == "Größe"
+    finally:
+        opened.close()
@@ -0,0 +1,88 @@
+import pytest
+import torch
+from transformers import GPT2Config, GPT2LMHeadModel
+
+from utils.llm_inference.inference_engine import (
+    bucket_length,
+    left_pad,
+    pad_token_id,
+    top_scores,
+    unbatch,
+)
+
+
+def _tiny_model():
+    torch.manual_seed(0)
+    config = GPT2Config(
+        vocab_size=64, n_positions=64, n_embd=16, n_layer=1, n_head=2, eos_token_id=63
+    )
+    return GPT2LMHeadModel(config).eval()
+
+
+def _generate(model, batch, steps):
+    return model.generate(
+        **batch,
+        max_new_tokens=steps,
+        do_sample=False,
+        output_scores=True,
+        return_dict_in_generate=True,
+    )
+
+
+def test_left_pad_aligns_prompts_on_the_right():
+    batch = left_pad(
+        [{"input_ids": torch.tensor([[5, 6, 7]])}, {"input_ids": torch.tensor([[8]])}],
+        pad_id=0,
+    )
+    assert batch["input_ids"].tolist() == [[5, 6, 7], [0, 0, 8]]
+    assert batch["attention_mask"].tolist() == [[1, 1, 1], [0, 0, 1]]
+
+
+def test_unbatch_cuts_rows_after_eos():
+    sequences = torch.tensor([[0, 5, 9, 63, 3], [4, 5, 9, 8, 7]])
+    scores = [torch.arange(4.0).reshape(2, 2) + i for i in range(3)]
+    first, second = unbatch(sequences, scores, [1, 2], eos_token_id=63)
+    assert first["tokens"].tolist() == [5, 9, 63]
+    assert len(first["scores"]) == 2
+    assert second["tokens"].tolist() == [4, 5, 9, 8, 7]
+    assert [s.tolist() for s in second["scores"]] == [[[2.0, 3.0]], [[3.0, 4.0]], [[4.0, 5.0]]]
+
+
+def test_batched_generate_matches_single_prompts():
+    model = _tiny_model()
+    prompts = [torch.tensor([[1, 2, 3, 4, 5]]), torch.tensor([[7, 8]])]
+    inputs = [{"input_ids": p, "attention_mask": torch.ones_like(p)} for p in prompts]
+
+    batch = left_pad(inputs, pad_token_id(model))
+    output = _generate(model, batch, steps=4)
+    batched = unbatch(output.sequences, output.scores, [5, 2], 63)
+
+    for single_inputs, got in zip(inputs, batched):
+        single = _generate(model, single_inputs, steps=4)
+        assert got["tokens"].tolist() == single.sequences[0].tolist()
+        for a, b in zip(got["scores"], single.scores):
+            assert torch.allclose(a, b, atol=1e-4)
+
+
+def test_top_scores_keeps_best_and_requested_tokens():
+    rows = [torch.tensor([[0.1, 3.0, 2.0, -1.0]]), torch.tensor([[5.0, 0.0, 1.0, 0.5]])]
+    steps = top_scores(rows, k=1, keep=[3, 99])
+    assert steps == [{1: 3.0, 3: -1.0}, {0: 5.0, 3: 0.5}]
+
+
+def test_long_prompts_share_buckets_beyond_the_largest():
+    buckets = (64, 128, 2048)
+    assert bucket_length(100, buckets) == 128
+    assert bucket_length(2049, buckets) == bucket_length(4096, buckets) == 4096
+    assert bucket_length(4097, buckets) == 6144
+
+
+def test_compile_flag_is_rejected_for_other_backends(monkeypatch, capsys):
+    from scripts.main_pipeline import main
+
+    argv = ["main_pipeline.py", "--model", "qwen", "--compile"]
+    monkeypatch.setattr("sys.argv", argv)
+    with pytest.raises(SystemExit) as exc:
+        main()
+    assert exc.value.code == 2
+    assert "--compile is only supported" in capsys.readouterr().err
@@ -0,0 +1,56 @@
+from utils.context_builder import BuildManifest, build_incremental
+from utils.parsed_doc import ParsedDoc
+
+
+def _write_docs(path, bodies):
+    with path.open("w", encoding="utf-8") as fh:
+        for doc_id, body in bodies.items():
+            doc = ParsedDoc(doc_id=doc_id, source_type="xml", title=doc_id, body=body)
+            fh.write(doc.model_dump_json() + "\n")
+
+
+def _contexts(out):
+    return sorted(
+        (c.doc_id, c.context_id) for c in BuildManifest.load(out).iter_contexts()
+    )
+
+
+def test_incremental_build_only_rebuilds_changed_docs(tmp_path):
+    docs = tmp_path / "docs.jsonl"
+    out = tmp_path / "contexts"
+    bodies = {f"D{i}": f"Body of paper {i}. Data are in GSE{1000 + i}." for i in range(3)}
+    _write_docs(docs, bodies)
+    stats = build_incremental(docs, out, max_tokens=32, stride=8, counter="approx")
+    assert stats["added"] == 3 and stats["contexts"] > 0
+    first = _contexts(out)
+
+    stats = build_incremental(docs, out, max_tokens=32, stride=8, counter="approx")
+    assert stats == {
+        "added": 0, "changed": 0, "removed": 0, "unchanged": 3, "contexts": 0
+    }
+    assert _contexts(out) == first
+
+    bodies["D1"] = "A revised body. Data are now in GSE9999."
+    bodies["D3"] = "A new paper without data."
+    del bodies["D2"]
+    _write_docs(docs, bodies)
+    stats = build_incremental(docs, out, max_tokens=32, stride=8, counter="approx")
+    assert (stats["added"], stats["changed"], stats["removed"]) == (1, 1, 1)
+    current = _contexts(out)
+    assert {d for d, _ in current} == {"D0", "D1", "D3"}
+    assert [c for c in first if c[0] == "D0"] == [c for c in current if c[0] == "D0"]
+
+    manifest = BuildManifest.load(out)
+    manifest.compact()
+    assert len(manifest.segments) == 1
+    assert _contexts(out) == current
+
+
+def test_parameter_change_rebuilds_everything(tmp_path):
+    docs = tmp_path / "docs.jsonl"
+    out = tmp_path / "contexts"
+    _write_docs(docs, {"D0": "Some text. More text."})
+    build_incremental(docs, out, max_tokens=32, stride=8, counter="approx")
+    stats = build_incremental(docs, out, max_tokens=64, stride=8, counter="approx")
+    assert stats["added"] == 1
+    assert len(BuildManifest.load(out).segments) == 1
@@ -0,0 +1,66 @@
+import json
+
+from scripts.main_pipeline import run_pipeline
+from utils.context_builder import ContextRecord
+from utils.context_builder.mention_gate import MentionGate
+from utils.llm_inference.stub_inference import StubInferenceModel
+from utils.parsed_doc import ParsedDoc
+
+
+def _doc(doc_id, body, doi=None, references=()):
+    return ParsedDoc(
+        doc_id=doc_id,
+        source_type="xml",
+        title="A study",
+        body=body,
+        doi=doi,
+        references=list(references),
+    )
+
+
+def test_docs_without_mentions_ignores_own_doi():
+    docs = [
+        _doc("D1", "Plain methods text.", doi="10.1234/own.5678"),
+        _doc("D2", "Plain text.", references=["Data at https://doi.org/10.5061/dryad.abc12"]),
+        _doc("D3", "Reads are in GEO under accession GSE12345."),
+        _doc("D4", "This article is https://doi.org/10.1234/own.5678", doi="10.1234/own.5678"),
+        _doc("D5", "The genome (GenBank MN908947.3) was aligned."),
+        _doc("D6", "Reads are in BioProject PRJNA123456."),
+        _doc("D7", "We sampled 300 patients per 1000 admissions in 2019 (n = 45)."),
+    ]
+    # reference lists cite articles, not the data the contexts talk about
+    assert MentionGate().docs_without_mentions(docs) == {"D1", "D2", "D4", "D7"}
+
+
+class CountingStub(StubInferenceModel):
+    def predict_batch(self, items, **kwargs):
+        self.calls = getattr(self, "calls", 0) + len(items)
+        return super().predict_batch(items, **kwargs)
+
+
+def test_run_pipeline_shortcuts_documents_without_mentions(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    records = [
+        ContextRecord("ctx_a", "DOCA", "We sequenced the samples.", "body", 6),
+        ContextRecord("ctx_b", "DOCA", "Raw data are in GEO (GSE12345).", "body", 9),
+        ContextRecord("ctx_c", "DOCB", "A theoretical argument.", "body", 5),
+        ContextRecord("ctx_d", "DOCB", "Rates were 12 per 1000 in 2019.", "body", 9),
+    ]
+    model = CountingStub()
+    summary = run_pipeline(
+        records,
+        model=model,
+        enable_reask=False,
+        output_csv=tmp_path / "submission.csv",
+        save_errors=False,
+        batch_size=4,
+        no_mention_shortcut=True,
+    )
+    assert model.calls == 2
+    assert summary["no_mention_shortcut"] == 2
+    assert summary["inferred"] == 2
+    (predictions,) = (tmp_path / "data" / "predictions").glob("predictions_*.jsonl")
+    rows = [json.loads(line) for line in predictions.read_text().splitlines()]
+    assert [r["context_id"] for r in rows] == ["ctx_a", "ctx_b", "ctx_c", "ctx_d"]
+    assert [r["label_source"] for r in rows[2:]] == ["no_mention_shortcut"] * 2
+    assert {r["final_label"] for r in rows[2:]} == {"none"}
@@ -0,0 +1,67 @@
+from utils.context_builder import build_context
+from utils.context_builder.mention_window import MentionFinder, centre_window
+from utils.parsed_doc import ParsedDoc
+
+FILLER = " ".join(f"Filler sentence number {i} about methods." for i in range(40))
+
+
+def test_finder_skips_bare_four_letter_words():
+    text = "This work used GSE12345 and PDB 1ABC; see doi 10.1234/abc.5 too."
+    mentions = MentionFinder().find(text)
+    assert [m.id for m in mentions] == ["GEO:GSE12345", "PDB:PDB1ABC", "doi:10.1234/abc.5"]
+    for m in mentions:
+        assert text[m.char_start : m.char_end].upper().replace(" ", "") in m.id.upper()
+
+
+def test_finder_ignores_numbers_in_ordinary_prose():
+    finder = MentionFinder()
+    for text in [
+        "We sampled 300 patients per 1000 admissions.",
+        "We found ERR 1234 in the logs.",
+        "We enrolled 120 adults aged 18-65 (n = 45) over 24 months in 2019.",
+        "Rates were 12 per 100000 person-years; see Table 2 and Figure 3.",
+    ]:
+        assert finder.find(text) == [], text
+    # identifiers split by a space or hyphen are still recovered
+    found = finder.find("Data are in GSE 12345 and SRR-123456.")
+    assert [m.id for m in found] == ["GEO:GSE12345", "SRA:SRR123456"]
+
+
+def test_centre_window_balances_context():
+    cum = list(range(0, 110, 10))  # ten sentences of ten tokens
+    assert centre_window(cum, 5, 6, 50) == (3, 8)
+    assert centre_window(cum, 0, 1, 30) == (0, 3)
+
+
+def test_mentions_mode_emits_one_window_per_cluster():
+    doc = ParsedDoc(
+        doc_id="DOC1",
+        source_type="xml",
+        title="Sample Title",
+        abstract="An abstract without identifiers.",
+        body=(
+            FILLER
+            + " Reads are in GEO under GSE12345. Replicates are GSE12346.\n"
+            + FILLER
+            + " Structures were deposited as PDB 2XYZ.\n"
+            + FILLER
+        ),
+    )
+    windows = build_context(doc, max_tokens=64, stride=16, counter="approx")
+    contexts = build_context(
+        doc, max_tokens=64, stride=16, counter="approx", mode="mentions"
+    )
+    assert len(contexts) == 2 < len(windows)
+    assert [m.id for m in contexts[0].mentions] == ["GEO:GSE12345", "GEO:GSE12346"]
+    assert [m.id for m in contexts[1].mentions] == ["PDB:PDB2XYZ"]
+    for ctx in contexts:
+        assert ctx.token_count <= 64
+        for m in ctx.mentions:
+            assert ctx.char_start <= m.char_start < m.char_end <= ctx.char_end
+            offset = m.char_start - ctx.char_start
+            assert ctx.text[offset : offset + 3] in {"GSE", "PDB"}
+
+
+def test_mentions_mode_without_mentions_is_empty():
+    doc = ParsedDoc(doc_id="D", source_type="xml", title="T", body=FILLER)
+    assert build_context(doc, max_tokens=64, counter="approx", mode="mentions") == []
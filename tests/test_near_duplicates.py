@@ -0,0 +1,70 @@
+import json
+
+from scripts.main_pipeline import run_pipeline
+from utils.context_builder import ContextRecord
+from utils.context_builder.near_duplicates import MinHashLSH, lsh_params
+from utils.llm_inference.stub_inference import StubInferenceModel
+
+BOILERPLATE = (
+    "Data availability statement: all sequencing data generated in this study "
+    "have been deposited in the Gene Expression Omnibus and are publicly "
+    "available under accession number GSE{} as of the date of publication."
+)
+
+
+def test_lsh_params_fit_threshold():
+    bands, rows = lsh_params(128, 0.8)
+    assert bands * rows <= 128
+    assert 0.6 < (1 / bands) ** (1 / rows) < 0.9
+
+
+def test_cluster_groups_near_duplicates():
+    texts = [BOILERPLATE.format(i) for i in range(4)] + [
+        "Cryo-EM maps were refined with a completely unrelated protocol.",
+        "",
+        "",
+    ]
+    roots = MinHashLSH(threshold=0.7).cluster(texts)
+    assert roots[:4] == [0, 0, 0, 0]
+    assert roots[4:] == [4, 5, 6]
+
+
+class CountingStub(StubInferenceModel):
+    def predict_batch(self, items, **kwargs):
+        self.calls = getattr(self, "calls", 0) + len(items)
+        return super().predict_batch(items, **kwargs)
+
+
+def test_run_pipeline_fans_out_cluster_labels(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    records = [
+        ContextRecord(f"ctx_{i}", f"DOC{i}", BOILERPLATE.format(i), "body", 40)
+        for i in range(3)
+    ]
+    records.append(
+        ContextRecord("ctx_x", "DOCX", "An unrelated methods paragraph.", "body", 8)
+    )
+    model = CountingStub()
+    run_pipeline(
+        records,
+        model=model,
+        enable_reask=False,
+        output_csv=tmp_path / "submission.csv",
+        save_errors=False,
+        batch_size=2,
+        dedup_threshold=0.7,
+    )
+    assert model.calls == 2
+    (predictions,) = (tmp_path / "data" / "predictions").glob("predictions_*.jsonl")
+    rows = [json.loads(line) for line in predictions.read_text().splitlines()]
+    assert [r["context_id"] for r in rows] == ["ctx_0", "ctx_1", "ctx_2", "ctx_x"]
+    assert {r["cluster_id"] for r in rows[:3]} == {"ctx_0"}
+    assert len({r["final_label"] for r in rows[:3]}) == 1
+    assert rows[3]["cluster_id"] == "ctx_x"
+
+
+def test_cluster_members_match_their_representative():
+    words = [f"w{i}" for i in range(42)]
+    # a drifts to b drifts to c: neighbours overlap, a and c barely do
+    a, b, c = (" ".join(words[start : start + 30]) for start in (0, 6, 12))
+    assert MinHashLSH(threshold=0.5).cluster([a, b, c]) == [0, 0, 2]
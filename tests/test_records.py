@@ -0,0 +1,35 @@
+import pytest
+
+from utils.context_builder import ContextRecord, DocumentStore, build_context
+from utils.llm_inference.validator import InferenceValidator
+from utils.parsed_doc import ParsedDoc
+
+
+def test_record_from_unit_resolves_offsets():
+    doc = ParsedDoc(
+        doc_id="DOC1",
+        source_type="xml",
+        title="Title",
+        body="Data are in GSE12345. Nothing else to see here.",
+    )
+    store = DocumentStore()
+    unit = build_context(
+        doc, max_tokens=64, counter="approx", store=store, mode="mentions"
+    )[0]
+    record = ContextRecord.from_unit(unit)
+    assert not hasattr(record, "__dict__")
+    assert record.mentions == ("GEO:GSE12345",)
+    context = record.as_context(store)
+    assert context["section"] == "title"
+    assert "GSE12345" in context["text"]
+
+
+class Result:
+    predicted_label = "maybe"
+
+
+def test_validator_accepts_objects_and_mappings():
+    validator = InferenceValidator()
+    validator.validate({"predicted_label": "none"})
+    with pytest.raises(ValueError):
+        validator.validate(Result())
@@ -50,3 +50,101 @@ def test_refinement_engine_flow() -> None:
     assert isinstance(proposals[0], CorrectionProposal)
     assert proposals[0].accepted is True
     assert proposals[0].corrected_label == "primary"
+
+
+class BatchInference(DummyInference):
+    def __init__(self) -> None:
+        self.batches = []
+
+    def predict_batch(self, items):
+        self.batches.append(len(items))
+        return [self.infer(context_id, context) for context_id, context in items]
+
+
+def test_refinement_engine_run_batch_matches_run() -> None:
+    inference = BatchInference()
+    corrector = SelfCorrector(engine=CorrectionEngine(inference=inference))
+    engine = RefinementEngine(questioner=SelfQuestioner(), corrector=corrector)
+
+    items = [
+        (
+            {"context_id": f"ctx{i}", "text": f"This refers to the XYZ{i} dataset."},
+            DummyResult(f"ctx{i}", "secondary", 0.6, "", "", {}, {}),
+        )
+        for i in range(3)
+    ]
+    batched = engine.run_batch(items, batch_size=4)
+    single = [engine.run(context, original) for context, original in items]
+
+    assert [len(p) for p in batched] == [len(p) for p in single]
+    assert all(b.context_id == f"ctx{i}" for i, ps in enumerate(batched) for b in ps)
+    assert [p.accepted for ps in batched for p in ps] == [
+        p.accepted for ps in single for p in ps
+    ]
+    # ``run`` re-asks through ``infer``; only the batched pass used batches
+    assert sum(inference.batches) == sum(len(p) for p in batched)
+    assert max(inference.batches) == 4
+
+
+class CountingInference(DummyInference):
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def infer(self, context_id: str, context: str) -> DummyResult:  # type: ignore[override]
+        self.calls += 1
+        return super().infer(context_id, context)
+
+
+def _engine(inference, **kwargs) -> RefinementEngine:
+    corrector = SelfCorrector(engine=CorrectionEngine(inference=inference))
+    return RefinementEngine(SelfQuestioner(), corrector, **kwargs)
+
+
+def test_iter_proposals_reasks_lazily() -> None:
+    inference = CountingInference()
+    engine = _engine(inference)
+    context = {"context_id": "ctx1", "text": "This refers to the XYZ dataset."}
+    original = DummyResult("ctx1", "secondary", 0.6, "", "", {}, {})
+
+    proposals = engine.iter_proposals(context, original)
+    assert next(proposals).accepted is True
+    proposals.close()
+
+    assert inference.calls == 1
+    assert engine.stats.reasks == 1
+    assert engine.stats.skipped_early == engine.stats.questions - 1
+
+
+def test_stop_on_accept_and_max_reasks() -> None:
+    context = {"context_id": "ctx1", "text": "This refers to the XYZ dataset."}
+    accepted = DummyResult("ctx1", "secondary", 0.6, "", "", {}, {})
+    unchanged = DummyResult("ctx1", "primary", 0.6, "", "", {}, {})
+
+    engine = _engine(CountingInference(), stop_on_accept=True, max_reasks=2)
+    assert len(engine.run(context, accepted)) == 1
+    assert len(engine.run(context, unchanged)) == 2
+    batched = engine.run_batch([(context, accepted), (context, unchanged)])
+    assert [len(p) for p in batched] == [1, 2]
+    stats = engine.stats
+    assert stats.reasks == 6
+    assert stats.skipped_early == 2
+    per_context = stats.questions // stats.contexts
+    assert stats.skipped_over_limit == stats.contexts * (per_context - 2)
+
+
+def test_questions_carry_the_prediction_confidence() -> None:
+    from utils.refinement.question_ranker import QuestionRanker
+
+    ranker = QuestionRanker()
+    corrector = SelfCorrector(engine=CorrectionEngine(inference=DummyInference()))
+    engine = RefinementEngine(
+        questioner=SelfQuestioner(ranker=ranker), corrector=corrector
+    )
+    context = {"context_id": "ctx1", "text": "This refers to the XYZ dataset."}
+    gains = {}
+    for confidence in (0.4, 0.8):
+        original = DummyResult("ctx1", "secondary", confidence, "", "", {}, {})
+        questions = engine._questions(context, original)
+        assert {q.confidence_level for q in questions} == {confidence}
+        gains[confidence] = ranker.expected_gain(questions[0])
+    assert gains[0.8] < gains[0.4]
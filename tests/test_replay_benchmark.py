@@ -0,0 +1,69 @@
+import json
+from dataclasses import dataclass
+
+from utils.llm_inference.replay_benchmark import ReplayBenchmark, write_report
+from utils.llm_inference.replay_logger import ReplayRecord
+
+
+@dataclass
+class DummyResult:
+    context_id: str
+    predicted_label: str
+
+
+class DummyModel:
+    def predict_batch(self, items, strategy="zero-shot", max_new_tokens=32):
+        return [
+            DummyResult(cid, "primary" if "new" in text else "none")
+            for cid, text in items
+        ]
+
+
+def test_replay_benchmark_reports_agreement(tmp_path):
+    records = [
+        ReplayRecord(
+            prompt="", output="", metadata={}, context_id="c1",
+            context="new data", label="primary",
+        ),
+        ReplayRecord(
+            prompt="", output="", metadata={}, context_id="c2",
+            context="old data", label="secondary",
+        ),
+    ]
+    bench = ReplayBenchmark(DummyModel(), records, warmup=0)
+    results = bench.run([1, 2])
+    assert [r.batch_size for r in results] == [1, 2]
+    assert results[0].label_agreement == 0.5
+    assert results[1].num_records == 2
+
+    report_path = tmp_path / "report.json"
+    write_report(report_path, results, meta={"model": "dummy"})
+    report = json.loads(report_path.read_text())
+    assert report["meta"]["model"] == "dummy"
+    assert len(report["results"]) == 2
+
+
+class StrategyModel(DummyModel):
+    def __init__(self):
+        self.calls = []
+
+    def predict_batch(self, items, strategy="zero-shot", max_new_tokens=32):
+        self.calls.append((strategy, [cid for cid, _ in items]))
+        return super().predict_batch(items, strategy, max_new_tokens)
+
+
+def test_batches_never_mix_prompt_strategies():
+    records = [
+        ReplayRecord(
+            prompt="", output="", metadata={}, context_id=f"c{i}",
+            context="new data", label="primary", strategy=strategy,
+        )
+        for i, strategy in enumerate(["few-shot", "zero-shot", "few-shot", None])
+    ]
+    model = StrategyModel()
+    result = ReplayBenchmark(model, records, warmup=0).run_batch_size(4)
+    assert sorted(model.calls) == [
+        ("few-shot", ["c0", "c2"]),
+        ("zero-shot", ["c1", "c3"]),
+    ]
+    assert result.label_agreement == 1.0
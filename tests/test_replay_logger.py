@@ -0,0 +1,87 @@
+import gzip
+import threading
+import time
+
+from utils.llm_inference.replay_logger import (
+    PromptReplayLogger,
+    ReplayRecord,
+    iter_replay_records,
+)
+
+
+def _record(i: int) -> ReplayRecord:
+    return ReplayRecord(prompt=f"prompt {i}", output="primary", metadata={"i": i})
+
+
+def test_replay_logger_buffers_until_flush(tmp_path):
+    path = tmp_path / "replay.jsonl"
+    logger = PromptReplayLogger(path, buffer_size=100, flush_interval=60)
+    logger.log(_record(0))
+    assert path.read_text() == ""
+    logger.close()
+    records = list(iter_replay_records(path))
+    assert [r.metadata["i"] for r in records] == [0]
+
+
+def test_replay_logger_rotates_and_compresses(tmp_path):
+    path = tmp_path / "replay.jsonl"
+    with PromptReplayLogger(
+        path, buffer_size=1, max_bytes=50, compression="gzip"
+    ) as logger:
+        for i in range(5):
+            logger.log(_record(i))
+            logger.flush()
+    segments = sorted(tmp_path.glob("replay.*.jsonl.gz"))
+    assert segments
+    assert gzip.open(segments[0], "rt").read().strip()
+    records = list(iter_replay_records(path))
+    assert [r.metadata["i"] for r in records] == list(range(5))
+
+
+def test_replay_logger_sampling(tmp_path):
+    path = tmp_path / "replay.jsonl"
+    with PromptReplayLogger(path, sample_rate=0.0) as logger:
+        for i in range(10):
+            logger.log(_record(i))
+    assert list(iter_replay_records(path)) == []
+
+
+def test_failed_background_flush_is_logged_and_retried(tmp_path, caplog):
+    path = tmp_path / "replay.jsonl"
+    logger = PromptReplayLogger(path, buffer_size=1, flush_interval=60)
+    path.unlink()
+    path.mkdir()  # appending to a directory fails
+    with caplog.at_level("ERROR"):
+        logger.log(_record(0))
+        for _ in range(200):
+            if caplog.records:
+                break
+            time.sleep(0.01)
+    assert "Failed to write replay log" in caplog.text
+    assert logger._thread.is_alive()
+
+    path.rmdir()
+    logger.log(_record(1))
+    logger.close()
+    assert [r.metadata["i"] for r in iter_replay_records(path)] == [0, 1]
+
+
+def test_concurrent_flushes_keep_record_order(tmp_path):
+    path = tmp_path / "replay.jsonl"
+    with PromptReplayLogger(path, buffer_size=10**6, flush_interval=60) as logger:
+
+        def work(worker):
+            for i in range(200):
+                logger.log(_record(worker * 1000 + i))
+                logger.flush()
+
+        threads = [threading.Thread(target=work, args=(w,)) for w in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    seen = [r.metadata["i"] for r in iter_replay_records(path)]
+    assert len(seen) == 800
+    for worker in range(4):
+        mine = [i for i in seen if i // 1000 == worker]
+        assert mine == sorted(mine)
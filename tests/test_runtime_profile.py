@@ -0,0 +1,43 @@
+from utils.llm_inference.runtime_profile import (
+    RuntimeProfile,
+    hardware_fingerprint,
+    hardware_info,
+    load_runtime_profile,
+    save_runtime_profile,
+)
+
+
+def test_runtime_profile_roundtrip(tmp_path):
+    path = tmp_path / "profile.json"
+    assert load_runtime_profile(path) is None
+    profile = RuntimeProfile(
+        intra_op_threads=4, inter_op_threads=1, batch_size=8, dtype="bfloat16"
+    )
+    save_runtime_profile(profile, path)
+    loaded = load_runtime_profile(path)
+    assert loaded is not None
+    assert loaded.batch_size == 8
+    assert str(loaded.torch_dtype) == "torch.bfloat16"
+
+
+def test_runtime_profile_ignores_other_hardware(tmp_path):
+    path = tmp_path / "profile.json"
+    other = dict(hardware_info(), cpu="some other cpu")
+    assert hardware_fingerprint(other) != hardware_fingerprint()
+    save_runtime_profile(
+        RuntimeProfile(intra_op_threads=2, inter_op_threads=1, hardware=other),
+        path,
+    )
+    assert load_runtime_profile(path) is None
+
+
+def test_profiles_with_removed_fields_still_load(tmp_path):
+    import json
+
+    path = tmp_path / "profile.json"
+    save_runtime_profile(RuntimeProfile(intra_op_threads=2, inter_op_threads=1), path)
+    profiles = json.loads(path.read_text())
+    for entry in profiles.values():
+        entry["num_workers"] = 4
+    path.write_text(json.dumps(profiles))
+    assert load_runtime_profile(path).intra_op_threads == 2
@@ -0,0 +1,127 @@
+import json
+
+from scripts.main_pipeline import run_pipeline
+from utils.context_builder import ContextRecord
+from utils.llm_inference.scheduler import (
+    DeadlineScheduler,
+    ScheduleMode,
+    order_by_priority,
+)
+from utils.llm_inference.stub_inference import StubInferenceModel
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_order_by_priority_puts_mentions_first():
+    records = [
+        ContextRecord("a", "D", "x", "title", 5, importance_score=1.0),
+        ContextRecord("b", "D", "x", "body", 5, importance_score=0.6),
+        ContextRecord("c", "D", "x", "body", 5, mentions=("gse12345",)),
+    ]
+    assert [r.context_id for r in order_by_priority(records)] == ["c", "b", "a"]
+
+
+def test_scheduler_degrades_as_deadline_approaches():
+    clock = FakeClock()
+    scheduler = DeadlineScheduler(10.0, safety=1.0, clock=clock)
+    scheduler.begin()
+    assert scheduler.next_mode(8) == ScheduleMode.FULL
+    clock.now = 4.0  # 2 s per context: 6 left need 12 s, only 6 s remain
+    scheduler.record(ScheduleMode.FULL, 2)
+    assert scheduler.next_mode(6) == ScheduleMode.NO_REASK
+    clock.now = 5.0
+    scheduler.record(ScheduleMode.NO_REASK, 2)
+    assert scheduler.next_mode(4) == ScheduleMode.NO_REASK
+    clock.now = 8.5  # 4.5 s for 4 contexts: 2 left need 2.25 s, 1.5 s remain
+    scheduler.record(ScheduleMode.NO_REASK, 2)
+    assert scheduler.next_mode(2) == ScheduleMode.LOGIT_ONLY
+    clock.now = 11.0
+    assert scheduler.current_mode == ScheduleMode.SKIP
+    scheduler.record(ScheduleMode.LOGIT_ONLY, 1)
+    assert scheduler.next_mode(1) == ScheduleMode.SKIP
+
+
+def test_scheduler_attributes_time_to_the_finished_batch_mode():
+    clock = FakeClock()
+    scheduler = DeadlineScheduler(100.0, clock=clock)
+    clock.now = 5.0  # time before inference starts is not a batch's
+    scheduler.begin()
+    scheduler.mode = ScheduleMode.LOGIT_ONLY  # later batches already degraded
+    clock.now = 9.0
+    scheduler.record(ScheduleMode.FULL, 2)
+    assert scheduler.latency(ScheduleMode.FULL) == 2.0
+    assert scheduler.latency(ScheduleMode.LOGIT_ONLY) is None
+
+
+def test_scheduler_holds_back_the_reask_reserve_in_full_mode():
+    clock = FakeClock()
+    scheduler = DeadlineScheduler(10.0, safety=1.0, reask_reserve_s=4.0, clock=clock)
+    scheduler.begin()
+    assert scheduler.next_mode(8) == ScheduleMode.FULL
+    clock.now = 2.0  # 1 s per context: 6 left need 6 s, 8 s remain but 4 s are reserved
+    scheduler.record(ScheduleMode.FULL, 2)
+    assert scheduler.next_mode(6) == ScheduleMode.NO_REASK
+    clock.now = 4.0  # the reserve is released once re-asking stops
+    scheduler.record(ScheduleMode.NO_REASK, 2)
+    assert scheduler.next_mode(4) == ScheduleMode.NO_REASK
+
+
+def test_scheduler_skips_full_mode_when_the_reserve_is_the_whole_budget():
+    scheduler = DeadlineScheduler(5.0, reask_reserve_s=5.0, clock=FakeClock())
+    assert scheduler.next_mode(4) == ScheduleMode.NO_REASK
+
+
+def test_scheduler_without_fallback_stops_at_logit_only():
+    clock = FakeClock()
+    scheduler = DeadlineScheduler(10.0, has_fallback=False, clock=clock)
+    scheduler.mode = ScheduleMode.LOGIT_ONLY
+    clock.now = 5.0
+    scheduler.record(ScheduleMode.LOGIT_ONLY, 1)
+    assert scheduler.next_mode(99) == ScheduleMode.LOGIT_ONLY
+
+
+def test_run_pipeline_with_exhausted_budget_skips_contexts(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    records = [
+        ContextRecord(f"skip_{i}", "DOC", f"Sentence {i}.", "body", 4)
+        for i in range(3)
+    ]
+    summary = run_pipeline(
+        records,
+        model=StubInferenceModel(),
+        enable_reask=False,
+        output_csv=tmp_path / "submission.csv",
+        save_errors=False,
+        batch_size=2,
+        time_budget_s=0.0,
+    )
+    assert summary["schedule_modes"] == {"skip": 3}
+    assert summary["inferred"] == 0
+    (predictions,) = (tmp_path / "data" / "predictions").glob("predictions_*.jsonl")
+    rows = [json.loads(line) for line in predictions.read_text().splitlines()]
+    assert [r["context_id"] for r in rows] == ["skip_0", "skip_1", "skip_2"]
+    assert {r["label_source"] for r in rows} == {"deadline_skip"}
+
+
+def test_run_pipeline_with_budget_runs_full_mode(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    records = [
+        ContextRecord(f"full_{i}", "DOC", f"Sentence {i}.", "body", 4)
+        for i in range(3)
+    ]
+    summary = run_pipeline(
+        records,
+        model=StubInferenceModel(),
+        enable_reask=False,
+        output_csv=tmp_path / "submission.csv",
+        save_errors=False,
+        batch_size=2,
+        time_budget_s=600.0,
+    )
+    assert summary["schedule_modes"] == {"full": 3}
@@ -59,3 +59,4 @@ def test_self_corrector_accepts_change() -> None:
     assert proposal.accepted is True
     assert proposal.corrected_label == "primary"
     assert proposal.original_label == "secondary"
+    assert proposal.metadata["question_type"] == "clarify"
@@ -1,5 +1,7 @@
 from utils.refinement import SelfQuestioner
+from utils.refinement.question_ranker import QuestionRanker
 from utils.refinement.schema import SelfQuestionItem
+from utils.refinement.template_bank import QuestionTemplateBank
 
 
 def test_generate_questions() -> None:
@@ -17,3 +19,75 @@ def test_generate_questions() -> None:
 
     assert questions, "No questions generated"
     assert isinstance(questions[0], SelfQuestionItem)
+
+
+def test_question_ids_are_deterministic_and_texts_unique() -> None:
+    context = {"context_id": "ctx1", "text": "Samples from GEO; GEO samples again."}
+    first = SelfQuestioner().generate(context, "secondary")
+    second = SelfQuestioner().generate(context, "secondary")
+
+    assert [q.question_id for q in first] == [q.question_id for q in second]
+    assert len({q.question_id for q in first}) == len(first)
+    assert len({q.question_text.lower() for q in first}) == len(first)
+
+
+def test_duplicate_renderings_are_dropped() -> None:
+    bank = QuestionTemplateBank()
+    bank.templates = {
+        "a": ["Is ${focus} new data?", "is ${focus} new data"],
+        "b": ["Is ${focus} new data?"],
+    }
+    questioner = SelfQuestioner(template_bank=bank)
+    questions = questioner.generate({"context_id": "c", "text": "genome"}, "none")
+
+    assert [q.question_type for q in questions] == ["a"]
+
+
+def test_ranker_orders_questions_by_acceptance() -> None:
+    history = [
+        {"accepted": True, "original_label": "secondary",
+         "metadata": {"question_type": "detail_check"}},
+        {"accepted": True, "original_label": "secondary",
+         "metadata": {"question_type": "detail_check"}},
+        {"accepted": False, "original_label": "secondary",
+         "metadata": {"question_type": "classification_challenge"}},
+        {"accepted": True, "original_label": "secondary", "metadata": {}},
+    ]
+    ranker = QuestionRanker().fit(history)
+    assert ranker.score("detail_check", "secondary") > ranker.score(
+        "classification_challenge", "secondary"
+    )
+
+    context = {"context_id": "ctx1", "text": "The genome dataset was reused."}
+    questions = SelfQuestioner(ranker=ranker, top_n=2).generate(context, "secondary")
+    assert [q.question_type for q in questions] == ["detail_check"] * 2
+
+
+def test_questions_are_ranked_per_question_not_per_type() -> None:
+    history = [
+        {"accepted": True, "original_label": "secondary",
+         "metadata": {"question_type": "detail_check", "focus": "accession"}},
+        {"accepted": False, "original_label": "secondary",
+         "metadata": {"question_type": "detail_check", "focus": "figure"}},
+    ] * 3
+    ranker = QuestionRanker().fit(history)
+    assert ranker.focus_lift("accession") > 1.0 > ranker.focus_lift("figure")
+
+    context = {
+        "context_id": "ctx1",
+        "text": "Figure 2 and figure 3 use the accession.",
+        "confidence": 0.4,
+    }
+    questions = SelfQuestioner(ranker=ranker).generate(context, "secondary")
+    # every question type leads with the focus that historically flips labels
+    assert questions[0].focus == "accession"
+    gains = [ranker.expected_gain(q) for q in questions]
+    assert gains == sorted(gains, reverse=True)
+    assert len({q.question_type for q in questions[:4]}) == 4
+
+
+def test_plural_focus_terms_are_one_concept() -> None:
+    context = {"context_id": "c", "text": "The dataset and the datasets."}
+    questions = SelfQuestioner().generate(context, "none")
+    assert {q.focus for q in questions} == {"dataset"}
+    assert {q.focus_weight for q in questions} == {1.0}
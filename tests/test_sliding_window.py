@@ -0,0 +1,62 @@
+import random
+
+from utils.context_builder.sliding_window import plan_windows
+
+
+def _reference_windows(counts, max_tokens, stride, max_iter=10_000):
+    """Original backwards-walking planner; ``None`` when it fails to advance."""
+    windows = []
+    start = 0
+    n = len(counts)
+    while start < n:
+        max_iter -= 1
+        if max_iter < 0:
+            return None
+        end = start
+        total = 0
+        while end < n and total + counts[end] <= max_tokens:
+            total += counts[end]
+            end += 1
+        if start == end:
+            end += 1
+            total = counts[start]
+        windows.append((start, end, total))
+        if end >= n:
+            break
+        back = end
+        kept = 0
+        while back > start and kept < stride:
+            back -= 1
+            kept += counts[back]
+        if back == start:
+            return None
+        start = back
+    return windows
+
+
+def _cumulative(counts):
+    cum = [0]
+    for c in counts:
+        cum.append(cum[-1] + c)
+    return cum
+
+
+def test_plan_windows_matches_reference():
+    rng = random.Random(0)
+    compared = 0
+    for _ in range(2000):
+        counts = [rng.randint(0, 40) for _ in range(rng.randint(1, 60))]
+        max_tokens = rng.randint(1, 120)
+        stride = rng.randint(0, 60)
+        expected = _reference_windows(counts, max_tokens, stride)
+        if expected is None:
+            continue
+        assert plan_windows(_cumulative(counts), max_tokens, stride) == expected
+        compared += 1
+    assert compared > 100
+
+
+def test_plan_windows_always_advances():
+    # the old planner looped forever here: the overlap walked back to ``start``
+    windows = plan_windows(_cumulative([18, 10, 10]), max_tokens=20, stride=5)
+    assert [w[:2] for w in windows] == [(0, 1), (1, 3)]
@@ -0,0 +1,19 @@
+from utils.llm_inference.base_inference import MODEL_REGISTRY, get_inference_model
+from utils.llm_inference.stub_inference import StubInferenceModel
+
+
+def test_stub_registered():
+    assert MODEL_REGISTRY["stub"] is StubInferenceModel
+    model = get_inference_model(model_name="stub")
+    assert isinstance(model, StubInferenceModel)
+
+
+def test_stub_predictions_are_deterministic():
+    model = StubInferenceModel()
+    first = model.predict(context_id="c1", context="Data were deposited in GEO.")
+    second = model.predict(context_id="c1", context="Data were deposited in GEO.")
+    assert first.predicted_label == second.predicted_label
+    assert first.logits == second.logits
+    assert first.predicted_label in {"primary", "secondary", "none"}
+    assert first.meta["label_source"] == "direct_label"
+    assert first.logits[first.predicted_label] == max(first.logits.values())
@@ -0,0 +1,51 @@
+from utils.context_builder import tokenizer_wrapper
+from utils.context_builder.token_cache import TokenCountCache
+from utils.context_builder.tokenizer_wrapper import TokenizerWrapper, get_tokenizer
+
+
+class CountingTokenizer:
+    calls = 0
+
+    @classmethod
+    def from_pretrained(cls, name):
+        return cls()
+
+    def encode(self, text, add_special_tokens=False):
+        CountingTokenizer.calls += 1
+        return text.split()
+
+    def __call__(self, texts, **kwargs):
+        return {"input_ids": [self.encode(t) for t in texts]}
+
+
+def test_token_cache_lru_and_persistence(tmp_path):
+    cache = TokenCountCache(maxsize=2)
+    cache.put("tok", "a", 1)
+    cache.put("tok", "b", 2)
+    assert cache.get("tok", "a") == 1
+    cache.put("tok", "c", 3)  # evicts "b", the least recently used
+    assert cache.get("tok", "b") is None
+    assert cache.get("other", "a") is None
+    assert cache.hits == 1 and cache.misses == 2
+
+    path = cache.save(tmp_path / "counts.json")
+    restored = TokenCountCache(path=path)
+    assert restored.get("tok", "c") == 3
+
+
+def test_wrapper_only_tokenizes_cache_misses(monkeypatch):
+    monkeypatch.setattr(tokenizer_wrapper, "AutoTokenizer", CountingTokenizer)
+    get_tokenizer.cache_clear()
+    cache = TokenCountCache()
+    wrapper = TokenizerWrapper(cache=cache)
+    boilerplate = "Data are available from the authors on request."
+
+    CountingTokenizer.calls = 0
+    first = wrapper.count_tokens_batch([boilerplate, "Unique one."])
+    second = wrapper.count_tokens_batch([boilerplate, "Unique two."])
+    assert list(first) == [8, 2] and list(second) == [8, 2]
+    assert CountingTokenizer.calls == 3
+    assert wrapper.count_tokens(boilerplate) == 8
+    assert CountingTokenizer.calls == 3
+    assert cache.hit_rate == 0.4
+    get_tokenizer.cache_clear()
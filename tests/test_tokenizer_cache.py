@@ -0,0 +1,40 @@
+import utils.context_builder as context_builder
+from utils.context_builder import build_context, get_tokenizer
+from utils.context_builder import tokenizer_wrapper
+from utils.parsed_doc import ParsedDoc
+
+
+class FakeTokenizer:
+    loads = 0
+
+    @classmethod
+    def from_pretrained(cls, name):
+        cls.loads += 1
+        return cls()
+
+    def encode(self, text, add_special_tokens=False):
+        return list(range(len(text.split())))
+
+    def __call__(self, texts, **kwargs):
+        return {"input_ids": [self.encode(t) for t in texts]}
+
+
+def test_tokenizer_loaded_once_per_process(monkeypatch):
+    monkeypatch.setattr(tokenizer_wrapper, "AutoTokenizer", FakeTokenizer)
+    get_tokenizer.cache_clear()
+    context_builder._get_builders.cache_clear()
+    FakeTokenizer.loads = 0
+
+    for i in range(5):
+        doc = ParsedDoc(
+            doc_id=f"DOC{i}",
+            source_type="xml",
+            title="Title",
+            abstract="An abstract sentence.",
+            body="First sentence here. Second sentence here.",
+        )
+        assert build_context(doc, max_tokens=20, stride=5)
+
+    assert FakeTokenizer.loads == 1
+    get_tokenizer.cache_clear()
+    context_builder._get_builders.cache_clear()
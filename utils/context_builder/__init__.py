@@ -2,24 +2,178 @@
 
 from __future__ import annotations
 
+import logging
+import time
+from collections import deque
+from contextlib import ExitStack
+from concurrent.futures import Future, ProcessPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from typing import Iterable, List
+from typing import Deque, Dict, Iterator, List, Literal, Tuple, Union
 
 from ..parsed_doc import ParsedDoc
+from .approx_counter import ApproxTokenCounter
+from .document_store import DocumentStore, DocumentStoreWriter, default_store_path
+from .manifest import BuildManifest, doc_hash
+from .records import ContextRecord
 from .schema import ContextUnit
 from .sliding_window import SlidingWindowContext
 from .title_abstract_merger import TitleAbstractMerger
+from .token_cache import TokenCountCache, get_token_cache, set_token_cache
+from .tokenizer_wrapper import TokenCounter, TokenizerWrapper, get_tokenizer
+from .validator import check_context_ids, recheck_token_counts, verify_context_ids
+from .writers import open_context_writer
+
+logger = logging.getLogger(__name__)
+
+
+CounterSpec = Union[str, TokenCounter, None]
+BuildMode = Literal["windows", "mentions"]
+ChunkResult = Tuple[int, List[ContextUnit], List[Tuple[str, str]]]
+# (documents, units, (doc_id, text) pairs for the document store)
+
+
+def resolve_counter(counter: CounterSpec = None) -> TokenCounter:
+    """Return a token counter for ``counter``.
+
+    ``None`` or ``"hf"`` selects the HuggingFace tokenizer, ``"approx"`` an
+    :class:`ApproxTokenCounter` with the default calibration; counter
+    instances are returned unchanged.
+    """
+    if counter is None or counter == "hf":
+        return TokenizerWrapper()
+    if counter == "approx":
+        return ApproxTokenCounter()
+    if isinstance(counter, str):
+        raise ValueError(f"Unknown token counter: {counter}")
+    return counter
+
+
+@lru_cache(maxsize=8)
+def _get_builders(
+    max_tokens: int,
+    stride: int,
+    counter: CounterSpec = None,
+    mode: BuildMode = "windows",
+) -> Tuple[TitleAbstractMerger, SlidingWindowContext]:
+    """Return builder instances shared by every call with these parameters."""
+    tokenizer = resolve_counter(counter)
+    merger = TitleAbstractMerger(tokenizer=tokenizer)
+    if mode == "windows":
+        builder_cls = SlidingWindowContext
+    elif mode == "mentions":
+        # imported lazily: the recognizers pull in fuzzywuzzy
+        from .mention_window import MentionWindowContext
+
+        builder_cls = MentionWindowContext
+    else:
+        raise ValueError(f"Unknown build mode: {mode}")
+    builder = builder_cls(max_tokens=max_tokens, stride=stride, tokenizer=tokenizer)
+    return merger, builder
 
 
 def build_context(
-    parsed_doc: ParsedDoc, max_tokens: int = 512, stride: int = 128
+    parsed_doc: ParsedDoc,
+    max_tokens: int = 512,
+    stride: int = 128,
+    counter: CounterSpec = None,
+    store: DocumentStore | None = None,
+    mode: BuildMode = "windows",
 ) -> List[ContextUnit]:
-    """Build context units from a parsed document."""
-    merger = TitleAbstractMerger()
-    merged = merger.merge(parsed_doc)
-    builder = SlidingWindowContext(max_tokens=max_tokens, stride=stride)
-    windows = builder.build(parsed_doc)
-    return [merged, *windows]
+    """Build context units from a parsed document.
+
+    ``counter`` selects how tokens are counted (see :func:`resolve_counter`).
+    With a ``store``, sliding windows reference the document text held by
+    the store through character offsets instead of copying it.
+
+    ``mode="windows"`` returns the merged title/abstract unit followed by
+    sliding windows over the whole document. ``mode="mentions"`` only
+    returns windows centred on dataset identifier mentions (``stride`` is
+    unused), so documents without mentions yield no units.
+    """
+    merger, builder = _get_builders(max_tokens, stride, counter, mode)
+    windows = builder.build(parsed_doc, store=store)
+    if mode == "mentions":
+        return windows
+    return [merger.merge(parsed_doc), *windows]
+
+
+@lru_cache(maxsize=1)
+def _exact_counter() -> TokenCounter:
+    return TokenizerWrapper()
+
+
+def _init_build_worker(
+    max_tokens: int,
+    stride: int,
+    counter: CounterSpec,
+    mode: BuildMode,
+    token_cache_path: str | Path | None,
+) -> None:
+    """Load the persisted token cache and warm this worker's builders."""
+    if token_cache_path is not None:
+        set_token_cache(TokenCountCache(path=token_cache_path))
+    _get_builders(max_tokens, stride, counter, mode)
+
+
+def _build_chunk(
+    lines: List[str],
+    max_tokens: int,
+    stride: int,
+    counter: CounterSpec,
+    mode: BuildMode,
+    omit_text: bool,
+    recheck_counts: bool = False,
+) -> ChunkResult:
+    """Build the documents in ``lines``; texts are only returned with ``omit_text``.
+
+    With ``recheck_counts`` the units' token counts are replaced by exact
+    counts (see :func:`recheck_token_counts`).
+    """
+    store = DocumentStore() if omit_text else None
+    units: List[ContextUnit] = []
+    for line in lines:
+        units.extend(
+            build_context(
+                ParsedDoc.model_validate_json(line),
+                max_tokens=max_tokens,
+                stride=stride,
+                counter=counter,
+                store=store,
+                mode=mode,
+            )
+        )
+    if recheck_counts:
+        units = recheck_token_counts(units, _exact_counter(), max_tokens, store)
+    texts = list(store.items()) if store is not None else []
+    return len(lines), units, texts
+
+
+def _iter_chunks(path: Path, chunk_size: int) -> Iterator[List[str]]:
+    chunk: List[str] = []
+    with path.open("r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            chunk.append(line)
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+    if chunk:
+        yield chunk
+
+
+def _iter_written(path: Path) -> Iterator[ContextUnit]:
+    """Yield the units of a context file written by :func:`open_context_writer`."""
+    if path.suffix.lower() in {".parquet", ".pq"}:
+        from .columnar_store import iter_parquet_contexts
+
+        yield from iter_parquet_contexts(path)
+        return
+    with path.open("r", encoding="utf-8") as fh:
+        for line in fh:
+            if line.strip():
+                yield ContextUnit.model_validate_json(line)
 
 
 def build_from_jsonl(
@@ -27,33 +181,218 @@ def build_from_jsonl(
     output_path: str | Path,
     max_tokens: int = 512,
     stride: int = 128,
-) -> None:
-    """Read ``ParsedDoc`` objects from ``input_path`` and write context units."""
+    token_cache_path: str | Path | None = None,
+    counter: CounterSpec = None,
+    omit_text: bool = False,
+    mode: BuildMode = "windows",
+    workers: int = 1,
+    chunk_size: int = 16,
+    max_in_flight: int | None = None,
+    recheck_counts: bool = False,
+) -> Dict[str, float]:
+    """Read ``ParsedDoc`` objects from ``input_path`` and write context units.
+
+    Documents are streamed in chunks of ``chunk_size`` lines. With
+    ``workers > 1`` the chunks are built in a process pool whose workers keep
+    their tokenizer warm; at most ``max_in_flight`` chunks (default
+    ``2 * workers``) are pending at once, and results are written in input
+    order. ``output_path`` is JSONL or, with a ``.parquet`` suffix, Parquet.
+
+    When ``token_cache_path`` is given, sentence token counts are loaded from
+    that file; in-process builds (``workers <= 1``) also save them back so
+    that later runs can reuse them. With ``omit_text`` the window text is
+    left out of the output; the documents are appended once to a
+    :class:`DocumentStore` file next to ``output_path`` as they are built
+    (see :class:`DocumentStoreWriter` and :func:`default_store_path`), and
+    windows reference it by offset.
+    ``mode`` is passed to :func:`build_context`. Context ids are checked for
+    collisions across the whole input (see :func:`check_context_ids`); only
+    id digests are kept, and suspected collisions are confirmed by re-reading
+    the output. With ``recheck_counts``, units sized by an approximate ``counter`` are
+    re-counted with the HuggingFace tokenizer and dropped if they no longer
+    fit in ``max_tokens``.
+
+    Returns document and context counts, elapsed seconds and throughput.
+    """
 
     path_in = Path(input_path)
     path_out = Path(output_path)
+    started = time.perf_counter()
+    args = (max_tokens, stride, counter, mode)
+    chunks = _iter_chunks(path_in, chunk_size)
 
-    def _iter_docs() -> Iterable[ParsedDoc]:
-        with path_in.open("r", encoding="utf-8") as f:
-            for line in f:
-                if line.strip():
-                    yield ParsedDoc.model_validate_json(line)
+    pool: ProcessPoolExecutor | None = None
+    if workers > 1:
+        pool = ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_build_worker,
+            initargs=(*args, token_cache_path),
+        )
+        limit = max_in_flight or 2 * workers
+
+        def _results() -> Iterator[ChunkResult]:
+            pending: Deque[Future] = deque()
+            for chunk in chunks:
+                pending.append(
+                    pool.submit(_build_chunk, chunk, *args, omit_text, recheck_counts)
+                )
+                if len(pending) >= limit:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
 
-    contexts: List[ContextUnit] = []
-    for doc in _iter_docs():
-        contexts.extend(
-            build_context(doc, max_tokens=max_tokens, stride=stride)
+        results = _results()
+    else:
+        if token_cache_path is not None:
+            set_token_cache(TokenCountCache(path=token_cache_path))
+        results = (
+            _build_chunk(chunk, *args, omit_text, recheck_counts) for chunk in chunks
         )
 
-    with path_out.open("w", encoding="utf-8") as f:
-        for ctx in contexts:
-            f.write(ctx.model_dump_json() + "\n")
+    seen_ids: Dict[int, int] = {}
+    suspects: list = []
+    n_docs = n_contexts = 0
+    try:
+        with ExitStack() as stack:
+            writer = stack.enter_context(
+                open_context_writer(path_out, omit_text=omit_text)
+            )
+            store = (
+                stack.enter_context(DocumentStoreWriter(default_store_path(path_out)))
+                if omit_text
+                else None
+            )
+            for docs, units, texts in results:
+                for doc_id, text in texts:
+                    store.add(doc_id, text)
+                units = check_context_ids(units, seen_ids, suspects)
+                writer.write(units)
+                n_docs += docs
+                n_contexts += len(units)
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+    verify_context_ids(suspects, _iter_written(path_out))
+
+    if pool is None:
+        cache = get_token_cache()
+        logger.info("Token count cache: %s", cache.stats())
+        if token_cache_path is not None:
+            cache.save(token_cache_path)
+
+    elapsed = time.perf_counter() - started
+    return {
+        "documents": n_docs,
+        "contexts": n_contexts,
+        "seconds": round(elapsed, 3),
+        "docs_per_sec": round(n_docs / elapsed, 2) if elapsed else 0.0,
+        "contexts_per_sec": round(n_contexts / elapsed, 2) if elapsed else 0.0,
+    }
+
+
+def build_incremental(
+    input_path: str | Path,
+    output_dir: str | Path,
+    max_tokens: int = 512,
+    stride: int = 128,
+    counter: CounterSpec = None,
+    mode: BuildMode = "windows",
+    compact_below: float = 0.5,
+) -> Dict[str, int]:
+    """Rebuild only new or changed documents into a segmented output.
+
+    ``output_dir`` holds a :class:`BuildManifest` and its segments. Documents
+    whose hash and builder parameters match the manifest are skipped; the
+    others are built into one new segment. Documents missing from the input
+    are dropped. Segments are compacted once less than ``compact_below`` of
+    their units are current. Returns counts of added, changed, removed and
+    unchanged documents and of contexts written.
+    """
+    manifest = BuildManifest.load(output_dir)
+    _, builder = _get_builders(max_tokens, stride, counter, mode)
+    params = {
+        "max_tokens": max_tokens,
+        "stride": stride,
+        "tokenizer": builder.tokenizer.model_name,
+        "mode": mode,
+    }
+    if manifest.params != params:
+        manifest.reset(params)
+
+    stats = {"added": 0, "changed": 0, "removed": 0, "unchanged": 0, "contexts": 0}
+    present = set()
+    segment: str | None = None
+    fh = None
+    seen_ids: Dict[int, int] = {}
+    suspects: list = []
+    try:
+        with Path(input_path).open("r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                doc = ParsedDoc.model_validate_json(line)
+                present.add(doc.doc_id)
+                digest = doc_hash(doc)
+                if manifest.is_current(doc.doc_id, digest):
+                    stats["unchanged"] += 1
+                    continue
+                stats["changed" if doc.doc_id in manifest.docs else "added"] += 1
+                units = check_context_ids(
+                    build_context(
+                        doc,
+                        max_tokens=max_tokens,
+                        stride=stride,
+                        counter=counter,
+                        mode=mode,
+                    ),
+                    seen_ids,
+                    suspects,
+                )
+                if fh is None:
+                    segment = manifest.new_segment()
+                    manifest.root.mkdir(parents=True, exist_ok=True)
+                    fh = (manifest.root / segment).open("w", encoding="utf-8")
+                for ctx in units:
+                    fh.write(ctx.model_dump_json() + "\n")
+                manifest.record(doc.doc_id, digest, segment, len(units))
+                stats["contexts"] += len(units)
+    finally:
+        if fh is not None:
+            fh.close()
+
+    if segment is not None:
+        verify_context_ids(suspects, _iter_written(manifest.root / segment))
+        manifest.segments[segment] = stats["contexts"]
+    for doc_id in [d for d in manifest.docs if d not in present]:
+        del manifest.docs[doc_id]
+        stats["removed"] += 1
+    manifest.prune_segments()
+    manifest.save()
+    if manifest.live_fraction() < compact_below:
+        manifest.compact()
+    logger.info("Incremental build: %s", stats)
+    return stats
 
 
 __all__ = [
+    "ApproxTokenCounter",
+    "BuildManifest",
     "build_context",
     "build_from_jsonl",
+    "build_incremental",
+    "check_context_ids",
+    "default_store_path",
+    "resolve_counter",
+    "ContextRecord",
     "ContextUnit",
+    "DocumentStore",
+    "DocumentStoreWriter",
     "SlidingWindowContext",
     "TitleAbstractMerger",
+    "TokenCountCache",
+    "TokenCounter",
+    "TokenizerWrapper",
+    "get_token_cache",
+    "get_tokenizer",
+    "set_token_cache",
 ]
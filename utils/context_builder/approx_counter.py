@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import math
+import re
+import zlib
+from dataclasses import dataclass
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+_PUNCT = re.compile(r"[^\w\s]")
+_DIGIT = re.compile(r"\d")
+
+
+@dataclass(frozen=True)
+class CounterCalibration:
+    """Linear token model ``tokens ~ chars, words, punctuation, digits``.
+
+    ``max_relative_error`` bounds ``(true - estimate) / estimate`` on the
+    calibration sample, so ``estimate * (1 + max_relative_error)`` is an
+    upper bound on the true count. Only calibrations fitted by
+    :meth:`ApproxTokenCounter.calibrate` are ``calibrated``; for the others
+    the bound is a guess.
+    """
+
+    char_coef: float
+    word_coef: float
+    punct_coef: float
+    digit_coef: float = 0.0
+    intercept: float = 0.0
+    max_relative_error: float = 0.25
+    calibrated: bool = False
+
+
+# The defaults below are hand-set, not fitted, so their error bounds are
+# not guaranteed. LLaMA tokenizers split numbers into single digits, which
+# makes accession- and DOI-heavy sentences much longer than plain prose; the
+# digit term adds roughly one token per digit on top of the character term.
+# Fit a calibration on a corpus sample with :meth:`ApproxTokenCounter.calibrate`,
+# or re-check window counts with the exact tokenizer (``recheck_counts`` in
+# :func:`build_from_jsonl`).
+CALIBRATIONS: Dict[str, CounterCalibration] = {
+    "hf-internal-testing/llama-tokenizer": CounterCalibration(
+        char_coef=0.18,
+        word_coef=0.2,
+        punct_coef=0.6,
+        digit_coef=0.82,
+        max_relative_error=0.25,
+    ),
+}
+DEFAULT_CALIBRATION = CounterCalibration(
+    char_coef=0.25,
+    word_coef=0.0,
+    punct_coef=0.5,
+    digit_coef=0.75,
+    max_relative_error=0.35,
+)
+
+
+def _features(text: str) -> tuple[int, int, int, int]:
+    return (
+        len(text),
+        len(text.split()),
+        len(_PUNCT.findall(text)),
+        len(_DIGIT.findall(text)),
+    )
+
+
+class ApproxTokenCounter:
+    """Estimate token counts from character, word, punctuation and digit counts.
+
+    Implements the same ``count_tokens``/``count_tokens_batch``/``encode``
+    protocol as :class:`TokenizerWrapper` without loading a tokenizer, which
+    makes context building possible on offline nodes. Consumers use
+    ``max_relative_error`` as a safety margin when sizing windows.
+    """
+
+    def __init__(
+        self,
+        model_name: str = "hf-internal-testing/llama-tokenizer",
+        calibration: CounterCalibration | None = None,
+    ) -> None:
+        self.model_name = f"approx:{model_name}"
+        self.calibration = calibration or CALIBRATIONS.get(
+            model_name, DEFAULT_CALIBRATION
+        )
+
+    @property
+    def max_relative_error(self) -> float:
+        return self.calibration.max_relative_error
+
+    def count_tokens(self, text: str) -> int:
+        if not text.strip():
+            return 0
+        chars, words, punct, digits = _features(text)
+        c = self.calibration
+        estimate = (
+            c.char_coef * chars
+            + c.word_coef * words
+            + c.punct_coef * punct
+            + c.digit_coef * digits
+        )
+        return max(1, math.ceil(estimate + c.intercept))
+
+    def count_tokens_batch(
+        self, texts: Sequence[str], batch_size: int = 1024
+    ) -> np.ndarray:
+        return np.fromiter(
+            (self.count_tokens(t) for t in texts), dtype=np.int64, count=len(texts)
+        )
+
+    def encode(self, text: str) -> List[int]:
+        """Return pseudo token ids; only their number is meaningful."""
+        words = text.split() or [""]
+        n = self.count_tokens(text)
+        return [zlib.crc32(words[i % len(words)].encode("utf-8")) for i in range(n)]
+
+    # ------------------------------------------------------------------
+    @classmethod
+    def calibrate(
+        cls, texts: Sequence[str], tokenizer, model_name: str | None = None
+    ) -> "ApproxTokenCounter":
+        """Fit a calibration against ``tokenizer`` on ``texts``.
+
+        ``tokenizer`` is anything with ``count_tokens`` (e.g. a
+        :class:`TokenizerWrapper`). The returned counter's error bound is the
+        worst under-estimate observed on ``texts``.
+        """
+        texts = [t for t in texts if t.strip()]
+        if not texts:
+            raise ValueError("calibration requires non-empty texts")
+        features = np.array([_features(t) for t in texts], dtype=np.float64)
+        truth = np.array([tokenizer.count_tokens(t) for t in texts], dtype=np.float64)
+        design = np.hstack([features, np.ones((len(texts), 1))])
+        coefs, *_ = np.linalg.lstsq(design, truth, rcond=None)
+        coefs = [float(c) for c in coefs]
+        name = model_name or getattr(tokenizer, "model_name", "custom")
+        counter = cls(name, CounterCalibration(*coefs[:4], intercept=coefs[4]))
+        estimates = counter.count_tokens_batch(texts).astype(np.float64)
+        worst = float(np.max((truth - estimates) / estimates))
+        counter.calibration = CounterCalibration(
+            *coefs[:4],
+            intercept=coefs[4],
+            max_relative_error=max(0.0, worst),
+            calibrated=True,
+        )
+        return counter
+
+
+__all__ = [
+    "ApproxTokenCounter",
+    "CALIBRATIONS",
+    "CounterCalibration",
+    "DEFAULT_CALIBRATION",
+]
@@ -0,0 +1,264 @@
+"""Arrow/Parquet storage for context units.
+
+``SourceInfo`` is flattened into top-level columns and the low-cardinality
+string columns (``doc_id``, ``section``, ``source_type``) are
+dictionary-encoded. Files are zstd-compressed. Rows are read back batch by
+batch and validated with one pydantic call per batch instead of parsing
+one JSON line at a time; files written by :class:`ParquetContextWriter` are
+trusted and can be read straight into :class:`ContextRecord` objects
+without validation.
+"""
+from __future__ import annotations
+
+from itertools import islice
+from pathlib import Path
+from typing import Iterator, List, Optional, Sequence
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from pydantic import TypeAdapter
+
+from .records import ContextRecord
+from .schema import ContextUnit
+
+_DICT_STRING = pa.dictionary(pa.int32(), pa.string())
+
+MENTION_TYPE = pa.struct(
+    [
+        ("id", pa.string()),
+        ("id_type", pa.string()),
+        ("char_start", pa.int64()),
+        ("char_end", pa.int64()),
+    ]
+)
+
+CONTEXT_SCHEMA = pa.schema(
+    [
+        pa.field("context_id", pa.string(), nullable=False),
+        pa.field("doc_id", _DICT_STRING, nullable=False),
+        pa.field("text", pa.string()),
+        pa.field("section", _DICT_STRING),
+        pa.field("start_sentence_idx", pa.int32()),
+        pa.field("end_sentence_idx", pa.int32()),
+        pa.field("original_paragraph_id", pa.int32()),
+        pa.field("source_type", _DICT_STRING),
+        pa.field("token_count", pa.int32()),
+        pa.field("importance_score", pa.float64()),
+        pa.field("char_start", pa.int64()),
+        pa.field("char_end", pa.int64()),
+        pa.field("mentions", pa.list_(MENTION_TYPE)),
+    ]
+)
+
+_UNIT_LIST = TypeAdapter(List[ContextUnit])
+
+_SOURCE_FIELDS = (
+    "section",
+    "start_sentence_idx",
+    "end_sentence_idx",
+    "original_paragraph_id",
+    "source_type",
+)
+
+
+def to_record_batch(
+    contexts: Sequence[ContextUnit], omit_text: bool = False
+) -> pa.RecordBatch:
+    """Convert ``contexts`` to a record batch in :data:`CONTEXT_SCHEMA`.
+
+    With ``omit_text``, units that carry character offsets get empty text.
+    """
+    sources = [c.source for c in contexts]
+    columns = {
+        "context_id": [c.context_id for c in contexts],
+        "doc_id": [c.doc_id for c in contexts],
+        "text": [
+            "" if omit_text and c.char_start is not None else c.text
+            for c in contexts
+        ],
+        **{name: [getattr(s, name) for s in sources] for name in _SOURCE_FIELDS},
+        "token_count": [c.token_count for c in contexts],
+        "importance_score": [c.importance_score for c in contexts],
+        "char_start": [c.char_start for c in contexts],
+        "char_end": [c.char_end for c in contexts],
+        "mentions": [[m.model_dump() for m in c.mentions] for c in contexts],
+    }
+    return pa.RecordBatch.from_pydict(columns, schema=CONTEXT_SCHEMA)
+
+
+def from_record_batch(batch: pa.RecordBatch) -> List[ContextUnit]:
+    """Rebuild context units from a batch written by :func:`to_record_batch`."""
+    columns = {}
+    for name, column in zip(batch.schema.names, batch.columns):
+        if pa.types.is_dictionary(column.type):
+            # decoding first is much faster than converting dictionary values
+            column = column.cast(pa.string())
+        columns[name] = column.to_pylist()
+    if columns["text"] and None in columns["text"]:
+        columns["text"] = [t or "" for t in columns["text"]]
+    sources = [
+        dict(zip(_SOURCE_FIELDS, values))
+        for values in zip(*(columns.pop(name) for name in _SOURCE_FIELDS))
+    ]
+    names = list(columns)
+    rows = [
+        dict(zip(names, values), source=source)
+        for values, source in zip(zip(*columns.values()), sources)
+    ]
+    # one validator call per batch is much cheaper than one per row
+    return _UNIT_LIST.validate_python(rows)
+
+
+# columns a :class:`ContextRecord` is built from
+RECORD_COLUMNS = (
+    "context_id",
+    "doc_id",
+    "text",
+    "section",
+    "token_count",
+    "importance_score",
+    "char_start",
+    "char_end",
+    "mentions",
+)
+
+
+def _strings(column: pa.Array) -> list:
+    if pa.types.is_dictionary(column.type):
+        column = column.cast(pa.string())
+    return column.to_pylist()
+
+
+def records_from_record_batch(batch: pa.RecordBatch) -> List[ContextRecord]:
+    """Build :class:`ContextRecord` objects straight from the columns.
+
+    Skips pydantic entirely, so only use it on trusted files such as those
+    written by :class:`ParquetContextWriter`. ``batch`` needs the
+    :data:`RECORD_COLUMNS`.
+    """
+    mentions = batch.column("mentions")
+    mention_ids = iter(pc.struct_field(pc.list_flatten(mentions), "id").to_pylist())
+    lengths = pc.list_value_length(mentions).fill_null(0).to_pylist()
+    rows = zip(
+        batch.column("context_id").to_pylist(),
+        _strings(batch.column("doc_id")),
+        [t or "" for t in batch.column("text").to_pylist()],
+        _strings(batch.column("section")),
+        batch.column("token_count").to_pylist(),
+        batch.column("importance_score").to_pylist(),
+        batch.column("char_start").to_pylist(),
+        batch.column("char_end").to_pylist(),
+        [tuple(islice(mention_ids, n)) for n in lengths],
+    )
+    return [ContextRecord(*row) for row in rows]
+
+
+class ParquetContextWriter:
+    """Stream context units to a zstd-compressed Parquet file.
+
+    Units are buffered until ``row_group_size`` of them can be written as
+    one row group, so many small :meth:`write` calls do not fragment the
+    file. The default keeps a streaming build's buffer to a few thousand
+    units; :func:`write_parquet`, whose input is already in memory, uses
+    larger row groups.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        omit_text: bool = False,
+        compression: str = "zstd",
+        row_group_size: int = 4096,
+    ) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.omit_text = omit_text
+        self.row_group_size = row_group_size
+        self._pending: List[ContextUnit] = []
+        self._writer = pq.ParquetWriter(
+            self.path, CONTEXT_SCHEMA, compression=compression
+        )
+
+    def write(self, contexts: Sequence[ContextUnit]) -> None:
+        self._pending.extend(contexts)
+        while len(self._pending) >= self.row_group_size:
+            self._flush(self._pending[: self.row_group_size])
+            del self._pending[: self.row_group_size]
+
+    def _flush(self, contexts: Sequence[ContextUnit]) -> None:
+        if contexts:
+            self._writer.write_batch(to_record_batch(contexts, self.omit_text))
+
+    def close(self) -> None:
+        self._flush(self._pending)
+        self._pending = []
+        self._writer.close()
+
+    def __enter__(self) -> "ParquetContextWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def write_parquet(
+    contexts: Sequence[ContextUnit],
+    path: str | Path,
+    omit_text: bool = False,
+    row_group_size: int = 65_536,
+) -> Path:
+    """Write ``contexts`` to ``path`` in row groups of ``row_group_size``."""
+    with ParquetContextWriter(
+        path, omit_text=omit_text, row_group_size=row_group_size
+    ) as writer:
+        writer.write(contexts)
+    return Path(path)
+
+
+def iter_record_batches(
+    path: str | Path,
+    batch_size: int = 65_536,
+    columns: Optional[Sequence[str]] = None,
+) -> Iterator[pa.RecordBatch]:
+    """Yield record batches from ``path``, optionally only some ``columns``."""
+    parquet = pq.ParquetFile(path)
+    yield from parquet.iter_batches(
+        batch_size=batch_size, columns=list(columns) if columns else None
+    )
+
+
+def iter_parquet_contexts(
+    path: str | Path, batch_size: int = 65_536
+) -> Iterator[ContextUnit]:
+    """Yield context units from a file written by :class:`ParquetContextWriter`."""
+    for batch in iter_record_batches(path, batch_size):
+        yield from from_record_batch(batch)
+
+
+def iter_parquet_records(
+    path: str | Path, batch_size: int = 65_536
+) -> Iterator[ContextRecord]:
+    """Yield records from a trusted file, reading only :data:`RECORD_COLUMNS`."""
+    for batch in iter_record_batches(path, batch_size, RECORD_COLUMNS):
+        yield from records_from_record_batch(batch)
+
+
+def is_context_parquet(path: str | Path) -> bool:
+    """Whether ``path`` uses the flattened :data:`CONTEXT_SCHEMA` layout."""
+    return "section" in pq.read_schema(path).names
+
+
+__all__ = [
+    "CONTEXT_SCHEMA",
+    "ParquetContextWriter",
+    "RECORD_COLUMNS",
+    "from_record_batch",
+    "is_context_parquet",
+    "iter_parquet_contexts",
+    "iter_parquet_records",
+    "iter_record_batches",
+    "records_from_record_batch",
+    "to_record_batch",
+    "write_parquet",
+]
@@ -1,8 +1,42 @@
 from __future__ import annotations
 
-import uuid
+import hashlib
+import json
+from typing import Sequence
 
-from .schema import ContextUnit, SourceInfo
+from .schema import ContextUnit, Mention, SourceInfo
+
+
+def make_context_id(
+    doc_id: str,
+    section: str,
+    start_sentence_idx: int,
+    end_sentence_idx: int,
+    text: str,
+    char_start: int | None = None,
+    char_end: int | None = None,
+) -> str:
+    """Return a stable id for a unit's location and content.
+
+    The id hashes the document, section, sentence span, character offsets
+    and text, so rebuilding the same corpus yields the same ids. 96 bits
+    keep accidental collisions negligible at corpus scale; see
+    :func:`~utils.context_builder.validator.check_context_ids`.
+    """
+    text_digest = hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+    payload = json.dumps(
+        [
+            doc_id,
+            section,
+            start_sentence_idx,
+            end_sentence_idx,
+            char_start,
+            char_end,
+            text_digest,
+        ]
+    )
+    digest = hashlib.blake2b(payload.encode("utf-8"), digest_size=12).hexdigest()
+    return f"ctx_{digest}"
 
 
 def format_context(
@@ -15,10 +49,26 @@ def format_context(
     token_count: int,
     importance_score: float,
     source_type: str | None = None,
+    char_start: int | None = None,
+    char_end: int | None = None,
+    mentions: Sequence[Mention] = (),
+    omit_text: bool = False,
 ) -> ContextUnit:
-    """Create a :class:`ContextUnit` with standard metadata."""
+    """Create a :class:`ContextUnit` with standard metadata.
 
-    context_id = f"ctx_{uuid.uuid4().hex[:8]}"
+    ``text`` always feeds the context id; with ``omit_text`` it is left out
+    of the unit, which then relies on ``char_start``/``char_end``.
+    """
+
+    context_id = make_context_id(
+        doc_id,
+        section,
+        start_sentence_idx,
+        end_sentence_idx,
+        text,
+        char_start,
+        char_end,
+    )
     source = SourceInfo(
         section=section,
         start_sentence_idx=start_sentence_idx,
@@ -29,11 +79,14 @@ def format_context(
     return ContextUnit(
         context_id=context_id,
         doc_id=doc_id,
-        text=text,
+        text="" if omit_text else text,
         source=source,
         token_count=token_count,
         importance_score=importance_score,
+        char_start=char_start,
+        char_end=char_end,
+        mentions=list(mentions),
     )
 
 
-__all__ = ["format_context"]
+__all__ = ["format_context", "make_context_id"]
@@ -1,7 +1,6 @@
 from __future__ import annotations
 
-import uuid
-
+from .context_formatter import make_context_id
 from .schema import ContextUnit, SourceInfo
 
 
@@ -17,7 +16,7 @@ class ContextUnitBuilder:
         importance_score: float,
         source_type: str | None = None,
     ) -> ContextUnit:
-        context_id = f"ctx_{uuid.uuid4().hex[:8]}"
+        context_id = make_context_id(doc_id, section, 0, 0, text)
         source = SourceInfo(
             section=section,
             start_sentence_idx=0,
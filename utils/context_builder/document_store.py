@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import json
+import mmap
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple
+
+
+class DocumentStore:
+    """Shared document text referenced by offset-based context units.
+
+    Overlapping windows only store ``doc_id`` plus character offsets; their
+    text is sliced from this store on demand. A store is built in memory with
+    :meth:`add` and written with :meth:`save` as one UTF-8 blob plus a JSON
+    index. :meth:`open` memory-maps a saved blob, so documents are read from
+    the page cache instead of being loaded up front.
+    """
+
+    def __init__(self, decoded_cache_size: int = 32) -> None:
+        self._texts: Dict[str, str] = {}
+        # doc_id -> (byte offset, byte length, is_ascii)
+        self._index: Dict[str, Tuple[int, int, bool]] = {}
+        self._mm: Optional[mmap.mmap] = None
+        self._view: Optional[memoryview] = None
+        self._decoded: "OrderedDict[str, str]" = OrderedDict()
+        self._decoded_cache_size = decoded_cache_size
+
+    # ------------------------------------------------------------------
+    def add(self, doc_id: str, text: str) -> None:
+        self._texts[doc_id] = text
+
+    def items(self) -> Iterator[Tuple[str, str]]:
+        """Yield ``(doc_id, text)`` for documents added in memory."""
+        return iter(self._texts.items())
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._texts or doc_id in self._index
+
+    def __len__(self) -> int:
+        return len(self._texts) + len(self._index)
+
+    def text(self, doc_id: str) -> str:
+        """Return the full text of ``doc_id``."""
+        if doc_id in self._texts:
+            return self._texts[doc_id]
+        cached = self._decoded.get(doc_id)
+        if cached is not None:
+            self._decoded.move_to_end(doc_id)
+            return cached
+        offset, length, _ = self._lookup(doc_id)
+        decoded = bytes(self._view[offset : offset + length]).decode("utf-8")
+        self._decoded[doc_id] = decoded
+        while len(self._decoded) > self._decoded_cache_size:
+            self._decoded.popitem(last=False)
+        return decoded
+
+    def slice(self, doc_id: str, start: int, end: int) -> str:
+        """Return characters ``start:end`` of ``doc_id``."""
+        if doc_id in self._texts:
+            return self._texts[doc_id][start:end]
+        offset, length, is_ascii = self._lookup(doc_id)
+        if is_ascii:
+            # byte and character offsets coincide; decode only the slice
+            end = min(end, length)
+            return bytes(self._view[offset + start : offset + end]).decode("ascii")
+        return self.text(doc_id)[start:end]
+
+    def _lookup(self, doc_id: str) -> Tuple[int, int, bool]:
+        try:
+            return self._index[doc_id]
+        except KeyError:
+            raise KeyError(f"Document not in store: {doc_id}") from None
+
+    # ------------------------------------------------------------------
+    def save(self, path: str | Path) -> Path:
+        """Write the in-memory documents to ``path`` and ``path.index.json``."""
+        with DocumentStoreWriter(path) as writer:
+            for doc_id, text in self._texts.items():
+                writer.add(doc_id, text)
+        return writer.path
+
+    @classmethod
+    def open(cls, path: str | Path) -> "DocumentStore":
+        """Memory-map a store written by :meth:`save`."""
+        path = Path(path)
+        store = cls()
+        store._index = {
+            k: (int(v[0]), int(v[1]), bool(v[2]))
+            for k, v in json.loads(_index_path(path).read_text(encoding="utf-8")).items()
+        }
+        if path.stat().st_size:
+            with path.open("rb") as f:
+                store._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            store._view = memoryview(store._mm)
+        return store
+
+    def close(self) -> None:
+        if self._view is not None:
+            self._view.release()
+            self._view = None
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+
+
+class DocumentStoreWriter:
+    """Append documents to a store file as they arrive.
+
+    Produces the same files as :meth:`DocumentStore.save`, but only the
+    index is held in memory; each text is written when it is added. The
+    index is written on :meth:`close`. A document added twice keeps its
+    first text.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._index: Dict[str, Tuple[int, int, bool]] = {}
+        self._offset = 0
+        self._fh = self.path.open("wb")
+
+    def add(self, doc_id: str, text: str) -> None:
+        if doc_id in self._index:
+            return
+        data = text.encode("utf-8")
+        self._fh.write(data)
+        self._index[doc_id] = (self._offset, len(data), len(data) == len(text))
+        self._offset += len(data)
+
+    def close(self) -> None:
+        if self._fh.closed:
+            return
+        self._fh.close()
+        _index_path(self.path).write_text(json.dumps(self._index), encoding="utf-8")
+
+    def __enter__(self) -> "DocumentStoreWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def _index_path(path: Path) -> Path:
+    return path.with_name(path.name + ".index.json")
+
+
+def default_store_path(context_path: str | Path) -> Path:
+    """Location of the document store written next to ``context_path``."""
+    return Path(context_path).with_suffix(".docs")
+
+
+__all__ = ["DocumentStore", "DocumentStoreWriter", "default_store_path"]
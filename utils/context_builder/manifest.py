@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from ..parsed_doc import ParsedDoc
+from .schema import ContextUnit
+
+MANIFEST_NAME = "manifest.json"
+
+
+def doc_hash(doc: ParsedDoc) -> str:
+    """Return a digest of ``doc``'s content."""
+    payload = doc.model_dump_json().encode("utf-8")
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+
+class BuildManifest:
+    """Track which segment holds the contexts of each document.
+
+    A segmented output directory holds ``manifest.json`` plus
+    ``segment-NNNNN.jsonl`` files. The manifest records the builder
+    parameters and, per ``doc_id``, the hash of its ``ParsedDoc``, the
+    segment holding its units and their count. A rebuild writes units of
+    new or changed documents to a fresh segment; readers only take a
+    document's units from the segment the manifest points at, so stale
+    copies in older segments are ignored until :meth:`compact` or until
+    their segment holds no live document and is removed.
+    """
+
+    def __init__(self, root: str | Path) -> None:
+        self.root = Path(root)
+        self.params: Dict[str, Any] = {}
+        self.docs: Dict[str, Dict[str, Any]] = {}
+        self.segments: Dict[str, int] = {}
+        self.next_segment = 0
+
+    # ------------------------------------------------------------------
+    @property
+    def path(self) -> Path:
+        return self.root / MANIFEST_NAME
+
+    @classmethod
+    def load(cls, root: str | Path) -> "BuildManifest":
+        """Load the manifest in ``root``; an empty one if there is none."""
+        manifest = cls(root)
+        if manifest.path.exists():
+            data = json.loads(manifest.path.read_text(encoding="utf-8"))
+            manifest.params = data["params"]
+            manifest.docs = data["docs"]
+            manifest.segments = data["segments"]
+            manifest.next_segment = data["next_segment"]
+        return manifest
+
+    def save(self) -> Path:
+        """Write the manifest atomically, after its segments are complete."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        data = {
+            "params": self.params,
+            "docs": self.docs,
+            "segments": self.segments,
+            "next_segment": self.next_segment,
+        }
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(data, sort_keys=True), encoding="utf-8")
+        os.replace(tmp, self.path)
+        return self.path
+
+    # ------------------------------------------------------------------
+    def is_current(self, doc_id: str, digest: str) -> bool:
+        entry = self.docs.get(doc_id)
+        return entry is not None and entry["hash"] == digest
+
+    def new_segment(self) -> str:
+        name = f"segment-{self.next_segment:05d}.jsonl"
+        self.next_segment += 1
+        return name
+
+    def record(self, doc_id: str, digest: str, segment: str, count: int) -> None:
+        self.docs[doc_id] = {"hash": digest, "segment": segment, "contexts": count}
+
+    def reset(self, params: Dict[str, Any]) -> None:
+        """Forget every document, e.g. because the builder parameters changed."""
+        self.params = dict(params)
+        self.docs = {}
+
+    def prune_segments(self) -> List[str]:
+        """Delete segments that no document points at; return their names."""
+        live = {entry["segment"] for entry in self.docs.values()}
+        removed = [name for name in self.segments if name not in live]
+        for name in removed:
+            del self.segments[name]
+            (self.root / name).unlink(missing_ok=True)
+        return removed
+
+    def live_fraction(self) -> float:
+        """Share of stored units that belong to current documents."""
+        total = sum(self.segments.values())
+        live = sum(entry["contexts"] for entry in self.docs.values())
+        return live / total if total else 1.0
+
+    # ------------------------------------------------------------------
+    def iter_contexts(self) -> Iterator[ContextUnit]:
+        """Yield the current units of every document, segment by segment."""
+        for name in sorted(self.segments):
+            with (self.root / name).open("r", encoding="utf-8") as fh:
+                for line in fh:
+                    if not line.strip():
+                        continue
+                    ctx = ContextUnit.model_validate_json(line)
+                    entry = self.docs.get(ctx.doc_id)
+                    if entry is not None and entry["segment"] == name:
+                        yield ctx
+
+    def compact(self) -> Optional[str]:
+        """Rewrite all current units into one segment and drop the others."""
+        if not self.segments:
+            return None
+        name = self.new_segment()
+        count = 0
+        with (self.root / name).open("w", encoding="utf-8") as fh:
+            for ctx in self.iter_contexts():
+                fh.write(ctx.model_dump_json() + "\n")
+                count += 1
+        for entry in self.docs.values():
+            entry["segment"] = name
+        self.segments[name] = count
+        self.prune_segments()
+        self.save()
+        return name
+
+
+def is_manifest_dir(path: str | Path) -> bool:
+    return (Path(path) / MANIFEST_NAME).exists()
+
+
+__all__ = ["BuildManifest", "MANIFEST_NAME", "doc_hash", "is_manifest_dir"]
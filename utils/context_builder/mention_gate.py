@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Set
+
+from ..parsed_doc import ParsedDoc
+from .mention_window import MentionFinder
+from .records import ContextRecord
+
+if TYPE_CHECKING:  # pragma: no cover - only for type checkers
+    from .document_store import DocumentStore
+
+
+class MentionGate:
+    """Find documents that mention no DOI or accession identifier.
+
+    Contexts of such documents cannot cite a dataset, so the pipeline can
+    label them ``none`` without a model call. Only the text contexts are
+    built from is scanned: reference lists cite article DOIs in almost every
+    paper and would keep nearly all documents out of the shortcut. Only the
+    strict identifier patterns are used, since fuzzy matches turn ordinary
+    numbers into mentions. A document's own DOI does not count as a mention.
+    """
+
+    def __init__(self, finder: MentionFinder | None = None) -> None:
+        self.finder = finder or MentionFinder()
+
+    def _mentions_other_ids(self, text: str, own_doi: Optional[str] = None) -> bool:
+        own = self.finder.dois.doi_norm.normalize(own_doi) if own_doi else None
+        return any(m.id != own for m in self.finder.find(text, fuzzy=False))
+
+    def doc_has_mentions(self, doc: ParsedDoc) -> bool:
+        """Check the parser's accessions, then scan title, abstract and body."""
+        if doc.accessions:
+            return True
+        text = "\n".join([doc.title, doc.abstract, doc.body])
+        return self._mentions_other_ids(text, doc.doi)
+
+    def docs_without_mentions(self, docs: Iterable[ParsedDoc]) -> Set[str]:
+        return {doc.doc_id for doc in docs if not self.doc_has_mentions(doc)}
+
+    def records_without_mentions(
+        self,
+        records: Iterable[ContextRecord],
+        store: Optional["DocumentStore"] = None,
+    ) -> Set[str]:
+        """Like :meth:`docs_without_mentions` when only contexts are available.
+
+        Records built in ``mentions`` mode already list their identifiers;
+        other records of a document are scanned until one mentions an id.
+        """
+        by_doc: Dict[str, List[ContextRecord]] = defaultdict(list)
+        for record in records:
+            by_doc[record.doc_id].append(record)
+        return {
+            doc_id
+            for doc_id, members in by_doc.items()
+            if not any(r.mentions for r in members)
+            and not any(
+                self._mentions_other_ids(r.resolve_text(store)) for r in members
+            )
+        }
+
+
+__all__ = ["MentionGate"]
@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import re
+from bisect import bisect_right
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+from ..doi_recognizer import AccessionMatcher, DOIRecognizer
+from ..doi_recognizer.pattern_registry import PatternMatch
+from ..parsed_doc import ParsedDoc
+from .context_formatter import format_context
+from .context_weighter import compute_importance
+from .document_store import DocumentStore
+from .schema import ContextUnit, Mention
+from .sliding_window import SlidingWindowContext
+from .validator import validate_contexts
+
+# The registry's PDB pattern accepts any four-character word; only keep
+# matches introduced by "PDB" whose code starts with a digit.
+_PDB_CODE = re.compile(r"PDB[:\s-]*\d", re.I)
+_SEPARATORS = re.compile(r"[\s-]+")
+
+
+class MentionFinder:
+    """Locate dataset identifiers in a document with their offsets.
+
+    Combines the accession patterns of :class:`AccessionMatcher` with the
+    DOI/PubMed patterns of :class:`DOIRecognizer`. Fuzzy accession hits are
+    only kept for identifiers split by spaces or hyphens ("GSE 12345") whose
+    joined form matches the strict pattern; ``find(text, fuzzy=False)``
+    skips fuzzy matching altogether. Overlapping matches are collapsed to
+    the longest one.
+    """
+
+    def __init__(self) -> None:
+        self.accessions = AccessionMatcher()
+        self.dois = DOIRecognizer()
+
+    def find(self, text: str, fuzzy: bool = True) -> List[Mention]:
+        raw = [
+            m
+            for m in self.accessions.registry.find(text)
+            if m.id_type != "PDB" or _PDB_CODE.match(m.value)
+        ]
+        dois = self.dois.regex.extract(text)
+        if fuzzy:
+            raw.extend(
+                joined
+                for m in self.accessions.fuzzy.resolve(text)
+                if (joined := self._join_split(text, m)) is not None
+            )
+            dois = dois or self.dois.fuzzy.extract(text)
+        raw.extend(dois)
+        raw.sort(key=lambda m: (m.start, m.start - m.end))
+
+        mentions: List[Mention] = []
+        last_end = -1
+        for m in raw:
+            if m.start < last_end:
+                continue
+            if m.id_type == "doi":
+                normalized = self.dois.doi_norm.normalize(m.value)
+            else:
+                normalized = self.accessions.normalizer.normalize(m.value, m.id_type)
+            end = min(m.end, len(text))
+            mentions.append(
+                Mention(
+                    id=normalized,
+                    id_type=m.id_type.lower(),
+                    char_start=m.start,
+                    char_end=end,
+                )
+            )
+            last_end = end
+        return mentions
+
+    def _join_split(self, text: str, m: PatternMatch) -> PatternMatch | None:
+        pattern = self.accessions.registry.PATTERNS.get(m.id_type)
+        joined = _SEPARATORS.sub("", text[m.start : m.end])
+        if pattern is None or not pattern.fullmatch(joined):
+            return None
+        return PatternMatch(m.id_type, joined, m.start, m.end)
+
+
+def centre_window(
+    cum: Sequence[int], lo: int, hi: int, max_tokens: int
+) -> Tuple[int, int]:
+    """Grow sentences ``[lo, hi)`` into a window of at most ``max_tokens``.
+
+    Sentences are added on whichever side currently has less context, so the
+    mentions stay near the middle of the window.
+    """
+    n = len(cum) - 1
+    start, end = lo, hi
+    while True:
+        left_ok = start > 0 and cum[end] - cum[start - 1] <= max_tokens
+        right_ok = end < n and cum[end + 1] - cum[start] <= max_tokens
+        if not (left_ok or right_ok):
+            return start, end
+        left = cum[lo] - cum[start]
+        right = cum[end] - cum[hi]
+        if left_ok and (not right_ok or left <= right):
+            start -= 1
+        else:
+            end += 1
+
+
+class MentionWindowContext(SlidingWindowContext):
+    """Build one window per cluster of identifier mentions.
+
+    Instead of tiling the whole document, mentions found by
+    :class:`MentionFinder` are grouped while they fit in the token budget,
+    and each group is widened into a window centred on it. Documents
+    without mentions produce no windows.
+    """
+
+    def __init__(self, *args, finder: MentionFinder | None = None, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.finder = finder or MentionFinder()
+
+    def _clusters(
+        self, mention_sentences: List[int], cum: Sequence[int]
+    ) -> List[Tuple[int, int]]:
+        """Group sorted sentence indices into ``[lo, hi)`` spans within budget."""
+        clusters: List[Tuple[int, int]] = []
+        for idx in mention_sentences:
+            if clusters:
+                lo, hi = clusters[-1]
+                if idx < hi:
+                    continue
+                if cum[idx + 1] - cum[lo] <= self.budget:
+                    clusters[-1] = (lo, idx + 1)
+                    continue
+            clusters.append((idx, idx + 1))
+        return clusters
+
+    def build(
+        self, doc: ParsedDoc, store: DocumentStore | None = None
+    ) -> List[ContextUnit]:
+        sentences = self._prepare_sentences(doc)
+        doc_text, starts = self._document_text(sentences)
+        mentions = self.finder.find(doc_text)
+        if not mentions:
+            return []
+        if store is not None:
+            store.add(doc.doc_id, doc_text)
+
+        token_counts = self.tokenizer.count_tokens_batch([s[3] for s in sentences])
+        cum = np.concatenate(([0], np.cumsum(token_counts))).tolist()
+        owners = [bisect_right(starts, m.char_start) - 1 for m in mentions]
+
+        contexts: List[ContextUnit] = []
+        for lo, hi in self._clusters(sorted(set(owners)), cum):
+            start, end = centre_window(cum, lo, hi, self.budget)
+            snippet = sentences[start:end]
+            char_start = starts[start]
+            char_end = starts[end - 1] + len(snippet[-1][3])
+            section = snippet[0][0]
+            ctx = format_context(
+                doc_id=doc.doc_id,
+                text=doc_text[char_start:char_end],
+                section=section,
+                start_sentence_idx=snippet[0][2],
+                end_sentence_idx=snippet[-1][2],
+                original_paragraph_id=snippet[0][1],
+                token_count=cum[end] - cum[start],
+                importance_score=compute_importance(
+                    snippet[0][2], len(sentences), section
+                ),
+                source_type="mention",
+                char_start=char_start,
+                char_end=char_end,
+                mentions=[m for m, o in zip(mentions, owners) if lo <= o < hi],
+                omit_text=store is not None,
+            )
+            contexts.append(ctx)
+        return validate_contexts(contexts, self.max_tokens, self.safety_margin)
+
+
+__all__ = ["MentionFinder", "MentionWindowContext", "centre_window"]
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import re
+import zlib
+from typing import Dict, List, Sequence, Set, Tuple
+
+import numpy as np
+
+_TOKEN = re.compile(r"\w+")
+
+
+def lsh_params(num_perm: int, threshold: float) -> Tuple[int, int]:
+    """Return ``(bands, rows)`` balancing missed and spurious candidates.
+
+    Two signatures become candidates when they agree on every row of at
+    least one band, which happens with probability ``1 - (1 - s**r)**b``
+    for Jaccard similarity ``s``. The chosen split minimises the area of
+    that curve below ``threshold`` plus the area above it that it misses.
+    """
+    grid = np.linspace(0.0, 1.0, 201)
+    below = grid <= threshold
+    best, best_error = (1, num_perm), float("inf")
+    for bands in range(1, num_perm + 1):
+        for rows in range(1, num_perm // bands + 1):
+            prob = 1.0 - (1.0 - grid**rows) ** bands
+            error = np.mean(np.where(below, prob, 1.0 - prob))
+            if error < best_error:
+                best, best_error = (bands, rows), error
+    return best
+
+
+class MinHashLSH:
+    """Cluster near-duplicate texts with MinHash signatures and LSH banding.
+
+    Texts are shingled into word ``shingle_size``-grams; each signature holds
+    ``num_perm`` minima of multiply-shift hashes. Candidates sharing a band
+    are merged when their estimated Jaccard similarity reaches
+    ``threshold``. Hashes are seeded, so clusters are stable across runs.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.8,
+        num_perm: int = 128,
+        shingle_size: int = 3,
+        seed: int = 1,
+    ) -> None:
+        if not 0.0 < threshold <= 1.0:
+            raise ValueError("threshold must be in (0, 1]")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.bands, self.rows = lsh_params(num_perm, threshold)
+        rng = np.random.default_rng(seed)
+        # odd multipliers make ``(a * x + b) >> 32`` a universal hash family
+        self._a = rng.integers(1, 2**63, size=(num_perm, 1), dtype=np.uint64) | 1
+        self._b = rng.integers(0, 2**63, size=(num_perm, 1), dtype=np.uint64)
+
+    # ------------------------------------------------------------------
+    def _shingles(self, text: str) -> np.ndarray:
+        tokens = _TOKEN.findall(text.lower())
+        if not tokens:
+            return np.empty(0, dtype=np.uint64)
+        hashes = np.fromiter(
+            (zlib.crc32(t.encode("utf-8")) for t in tokens),
+            dtype=np.uint64,
+            count=len(tokens),
+        )
+        k = min(self.shingle_size, len(tokens))
+        # combine k consecutive token hashes into one 64-bit shingle hash
+        shingles = np.zeros(len(tokens) - k + 1, dtype=np.uint64)
+        for offset in range(k):
+            window = hashes[offset : offset + len(shingles)]
+            shingles = shingles * np.uint64(1_000_003) + window
+        return np.unique(shingles)
+
+    def signature(self, text: str) -> np.ndarray | None:
+        """Return the MinHash signature of ``text``; ``None`` if it has no words."""
+        shingles = self._shingles(text)
+        if not len(shingles):
+            return None
+        hashed = (self._a * shingles[None, :] + self._b) >> np.uint64(32)
+        return hashed.min(axis=1).astype(np.uint32)
+
+    # ------------------------------------------------------------------
+    def cluster(self, texts: Sequence[str]) -> List[int]:
+        """Return, for every text, the index of its cluster representative.
+
+        A text sharing a band with any earlier text becomes a candidate of
+        that text's representative, and joins the earliest candidate whose
+        estimated Jaccard similarity with it reaches ``threshold``. Otherwise
+        it becomes a representative itself. Membership is checked against
+        the representative, never chained, so every member is within
+        ``threshold`` of the text whose label it inherits. ``result[i] == i``
+        marks texts that need to be processed.
+        """
+        roots = list(range(len(texts)))
+        signatures = [self.signature(t) for t in texts]
+        # each bucket holds the representatives of the texts that landed in it
+        buckets: List[Dict[bytes, Set[int]]] = [{} for _ in range(self.bands)]
+        for i, sig in enumerate(signatures):
+            if sig is None:
+                continue
+            keys = [
+                sig[band * self.rows : (band + 1) * self.rows].tobytes()
+                for band in range(self.bands)
+            ]
+            candidates = set().union(
+                *(bucket.get(key, ()) for bucket, key in zip(buckets, keys))
+            )
+            for rep in sorted(candidates):
+                if np.mean(signatures[rep] == sig) >= self.threshold:
+                    roots[i] = rep
+                    break
+            for bucket, key in zip(buckets, keys):
+                bucket.setdefault(key, set()).add(roots[i])
+        return roots
+
+
+__all__ = ["MinHashLSH", "lsh_params"]
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
+
+from .schema import ContextUnit
+
+if TYPE_CHECKING:  # pragma: no cover - only for type checkers
+    from .document_store import DocumentStore
+
+
+@dataclass(slots=True)
+class ContextRecord:
+    """Slotted in-memory form of a :class:`ContextUnit` for the inference path.
+
+    Units are validated once when they are read; inside the pipeline this
+    record avoids pydantic's per-instance overhead and ``model_dump`` copies.
+    ``mentions`` keeps only the normalised identifiers.
+    """
+
+    context_id: str
+    doc_id: str
+    text: str
+    section: str
+    token_count: int
+    importance_score: float = 0.0
+    char_start: Optional[int] = None
+    char_end: Optional[int] = None
+    mentions: Tuple[str, ...] = ()
+
+    @classmethod
+    def from_unit(cls, unit: ContextUnit) -> "ContextRecord":
+        return cls(
+            unit.context_id,
+            unit.doc_id,
+            unit.text,
+            unit.source.section,
+            unit.token_count,
+            unit.importance_score,
+            unit.char_start,
+            unit.char_end,
+            tuple(m.id for m in unit.mentions),
+        )
+
+    def resolve_text(self, store: Optional["DocumentStore"] = None) -> str:
+        """Return ``text``, slicing it from ``store`` when it was omitted."""
+        if self.text or store is None or self.char_start is None:
+            return self.text
+        return store.slice(self.doc_id, self.char_start, self.char_end)
+
+    def as_context(self, store: Optional["DocumentStore"] = None) -> Dict[str, str]:
+        """Return the mapping consumed by the refinement loop."""
+        return {
+            "context_id": self.context_id,
+            "doc_id": self.doc_id,
+            "section": self.section,
+            "text": self.resolve_text(store),
+        }
+
+
+__all__ = ["ContextRecord"]
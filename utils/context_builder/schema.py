@@ -1,7 +1,12 @@
 from __future__ import annotations
 
+from typing import TYPE_CHECKING, List, Optional
+
 from pydantic import BaseModel, Field
 
+if TYPE_CHECKING:  # pragma: no cover - only for type checkers
+    from .document_store import DocumentStore
+
 
 class SourceInfo(BaseModel):
     """Metadata describing the origin of a context unit."""
@@ -13,15 +18,40 @@ class SourceInfo(BaseModel):
     source_type: str = ""
 
 
+class Mention(BaseModel):
+    """Dataset identifier found in a document, with document offsets."""
+
+    id: str
+    id_type: str
+    char_start: int = Field(ge=0)
+    char_end: int = Field(ge=0)
+
+
 class ContextUnit(BaseModel):
-    """Standard structure for a context unit passed to the LLM."""
+    """Standard structure for a context unit passed to the LLM.
+
+    ``char_start``/``char_end`` locate the unit in its document's text as
+    held by a :class:`~utils.context_builder.document_store.DocumentStore`.
+    When a unit is built against a store its ``text`` is left empty and is
+    materialised on demand with :meth:`resolve_text`. Units built around
+    identifier mentions list them in ``mentions``.
+    """
 
     context_id: str
     doc_id: str
-    text: str
+    text: str = ""
     source: SourceInfo
     token_count: int
     importance_score: float = 0.0
+    char_start: Optional[int] = Field(default=None, ge=0)
+    char_end: Optional[int] = Field(default=None, ge=0)
+    mentions: List[Mention] = Field(default_factory=list)
+
+    def resolve_text(self, store: Optional["DocumentStore"] = None) -> str:
+        """Return ``text``, slicing it from ``store`` when it was omitted."""
+        if self.text or store is None or self.char_start is None:
+            return self.text
+        return store.slice(self.doc_id, self.char_start, self.char_end)
 
 
-__all__ = ["ContextUnit", "SourceInfo"]
+__all__ = ["ContextUnit", "Mention", "SourceInfo"]
@@ -1,12 +1,16 @@
 from __future__ import annotations
 
 import re
-from typing import List, Tuple
+from bisect import bisect_right
+from typing import List, Sequence, Tuple
+
+import numpy as np
 
 from ..parsed_doc import ParsedDoc
 from .context_formatter import format_context
 from .context_weighter import compute_importance
-from .tokenizer_wrapper import TokenizerWrapper
+from .document_store import DocumentStore
+from .tokenizer_wrapper import TokenCounter, TokenizerWrapper
 from .validator import validate_contexts
 from .schema import ContextUnit
 
@@ -15,6 +19,38 @@ SentenceInfo = Tuple[str, int, int, str]
 # (section, paragraph_id, sentence_idx, text)
 
 
+def plan_windows(
+    cum: Sequence[int], max_tokens: int, stride: int
+) -> List[Tuple[int, int, int]]:
+    """Plan ``(start, end, token_count)`` sentence windows.
+
+    ``cum[i]`` is the number of tokens in the first ``i`` sentences. Each
+    window takes as many sentences as fit in ``max_tokens`` (at least one),
+    and the next window starts at the latest sentence that keeps ``stride``
+    tokens of overlap. Both boundaries are found by binary search, so a
+    document is planned in ``O(windows * log(sentences))``.
+    """
+    n = len(cum) - 1
+    windows: List[Tuple[int, int, int]] = []
+    start = 0
+    while start < n:
+        # largest ``end`` with cum[end] - cum[start] <= max_tokens
+        end = bisect_right(cum, cum[start] + max_tokens, start, n + 1) - 1
+        if end <= start:
+            end = start + 1
+        windows.append((start, end, cum[end] - cum[start]))
+        if end >= n:
+            break
+        if stride > 0:
+            # latest ``back`` with cum[end] - cum[back] >= stride
+            back = bisect_right(cum, cum[end] - stride, start, end) - 1
+        else:
+            back = end
+        # always advance, even when the overlap would swallow the window
+        start = max(back, start + 1)
+    return windows
+
+
 class SlidingWindowContext:
     """Build context units using a sliding window over document sentences."""
 
@@ -22,11 +58,14 @@ class SlidingWindowContext:
         self,
         max_tokens: int = 512,
         stride: int = 128,
-        tokenizer: TokenizerWrapper | None = None,
+        tokenizer: TokenCounter | None = None,
     ) -> None:
         self.max_tokens = max_tokens
         self.stride = stride
         self.tokenizer = tokenizer or TokenizerWrapper()
+        # approximate counters may under-count; plan against a reduced budget
+        self.safety_margin = getattr(self.tokenizer, "max_relative_error", 0.0)
+        self.budget = int(max_tokens / (1 + self.safety_margin))
 
     # ------------------------------------------------------------------
     # Sentence preparation
@@ -66,45 +105,42 @@ class SlidingWindowContext:
     def _generate_windows(
         self, sentences: List[SentenceInfo]
     ) -> List[Tuple[int, int, int]]:
-        token_counts = [
-            self.tokenizer.count_tokens(s[3]) for s in sentences
-        ]
-        windows: List[Tuple[int, int, int]] = []
-        start = 0
-        n = len(sentences)
-        while start < n:
-            end = start
-            total = 0
-            while end < n and total + token_counts[end] <= self.max_tokens:
-                total += token_counts[end]
-                end += 1
-            if start == end:
-                end += 1
-                total = token_counts[start]
-            windows.append((start, end, total))
-            if end >= n:
-                break
-            # compute new start to keep ``stride`` tokens overlap
-            overlap = self.stride
-            back = end
-            kept = 0
-            while back > start and kept < overlap:
-                back -= 1
-                kept += token_counts[back]
-            start = back
-        return windows
+        token_counts = self.tokenizer.count_tokens_batch([s[3] for s in sentences])
+        cum = np.concatenate(([0], np.cumsum(token_counts))).tolist()
+        return plan_windows(cum, self.budget, self.stride)
 
     # ------------------------------------------------------------------
     # Public API
     # ------------------------------------------------------------------
-    def build(self, doc: ParsedDoc) -> List[ContextUnit]:
+    @staticmethod
+    def _document_text(sentences: List[SentenceInfo]) -> Tuple[str, List[int]]:
+        """Join ``sentences`` with spaces and return their start offsets."""
+        starts: List[int] = []
+        pos = 0
+        for s in sentences:
+            starts.append(pos)
+            pos += len(s[3]) + 1
+        return " ".join(s[3] for s in sentences), starts
+
+    def build(
+        self, doc: ParsedDoc, store: DocumentStore | None = None
+    ) -> List[ContextUnit]:
+        """Build windows for ``doc``.
+
+        With a ``store``, the document text is added to it once and the
+        returned units only carry character offsets (``text`` is empty).
+        """
         sentences = self._prepare_sentences(doc)
         total_sentences = len(sentences)
         windows = self._generate_windows(sentences)
+        doc_text, starts = self._document_text(sentences)
+        if store is not None:
+            store.add(doc.doc_id, doc_text)
         contexts: List[ContextUnit] = []
         for start, end, token_count in windows:
             snippet = sentences[start:end]
-            text = " ".join(s[3] for s in snippet)
+            char_start = starts[start]
+            char_end = starts[end - 1] + len(snippet[-1][3])
             section = snippet[0][0]
             start_sentence_idx = snippet[0][2]
             end_sentence_idx = snippet[-1][2]
@@ -114,7 +150,7 @@ class SlidingWindowContext:
             )
             ctx = format_context(
                 doc_id=doc.doc_id,
-                text=text,
+                text=doc_text[char_start:char_end],
                 section=section,
                 start_sentence_idx=start_sentence_idx,
                 end_sentence_idx=end_sentence_idx,
@@ -122,9 +158,12 @@ class SlidingWindowContext:
                 token_count=token_count,
                 importance_score=importance,
                 source_type=section,
+                char_start=char_start,
+                char_end=char_end,
+                omit_text=store is not None,
             )
             contexts.append(ctx)
-        return validate_contexts(contexts, self.max_tokens)
+        return validate_contexts(contexts, self.max_tokens, self.safety_margin)
 
 
-__all__ = ["SlidingWindowContext"]
+__all__ = ["SlidingWindowContext", "plan_windows"]
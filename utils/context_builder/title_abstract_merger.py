@@ -5,7 +5,7 @@ import regex as re
 from ..parsed_doc import ParsedDoc
 from .context_unit_builder import ContextUnitBuilder
 from .text_formatter import TextFormatter
-from .tokenizer_wrapper import TokenizerWrapper
+from .tokenizer_wrapper import TokenCounter, TokenizerWrapper
 from .schema import ContextUnit
 
 
@@ -15,7 +15,7 @@ class TitleAbstractMerger:
     def __init__(
         self,
         formatter: TextFormatter | None = None,
-        tokenizer: TokenizerWrapper | None = None,
+        tokenizer: TokenCounter | None = None,
         builder: ContextUnitBuilder | None = None,
     ) -> None:
         self.formatter = formatter or TextFormatter()
@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+CacheKey = Tuple[str, bytes]
+# (tokenizer name, sentence digest)
+
+
+class TokenCountCache:
+    """LRU cache of sentence token counts shared across documents.
+
+    Boilerplate such as licence or data availability statements recurs in
+    many papers; caching its token count avoids re-tokenizing it. Entries are
+    keyed by tokenizer name and a digest of the sentence, so the cache can be
+    shared by tokenizers of different models and persisted to JSON.
+    """
+
+    def __init__(self, maxsize: int = 500_000, path: str | Path | None = None) -> None:
+        self.maxsize = maxsize
+        self.path = Path(path) if path else None
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[CacheKey, int]" = OrderedDict()
+        self._lock = threading.Lock()
+        if self.path is not None and self.path.exists():
+            self.load(self.path)
+
+    # ------------------------------------------------------------------
+    @staticmethod
+    def key(tokenizer_name: str, text: str) -> CacheKey:
+        digest = hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+        return tokenizer_name, digest
+
+    def get(self, tokenizer_name: str, text: str) -> Optional[int]:
+        key = self.key(tokenizer_name, text)
+        with self._lock:
+            count = self._data.get(key)
+            if count is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._data.move_to_end(key)
+            return count
+
+    def put(self, tokenizer_name: str, text: str, count: int) -> None:
+        self._put(self.key(tokenizer_name, text), count)
+
+    def _put(self, key: CacheKey, count: int) -> None:
+        with self._lock:
+            self._data[key] = count
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def lookup_many(
+        self, tokenizer_name: str, texts: Sequence[str]
+    ) -> Tuple[np.ndarray, List[int], List[CacheKey]]:
+        """Return ``(counts, missing_idx, missing_keys)`` for ``texts``.
+
+        ``counts`` holds ``-1`` where the cache had no entry.
+        """
+        counts = np.full(len(texts), -1, dtype=np.int64)
+        missing: List[int] = []
+        missing_keys: List[CacheKey] = []
+        keys = [self.key(tokenizer_name, t) for t in texts]
+        with self._lock:
+            for i, key in enumerate(keys):
+                count = self._data.get(key)
+                if count is None:
+                    missing.append(i)
+                    missing_keys.append(key)
+                else:
+                    counts[i] = count
+                    self._data.move_to_end(key)
+            self.hits += len(texts) - len(missing)
+            self.misses += len(missing)
+        return counts, missing, missing_keys
+
+    def store_many(self, keys: Sequence[CacheKey], counts: Sequence[int]) -> None:
+        for key, count in zip(keys, counts):
+            self._put(key, int(count))
+
+    # ------------------------------------------------------------------
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "entries": len(self._data),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hit_rate, 4),
+        }
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def save(self, path: str | Path | None = None) -> Path:
+        """Persist the cache as ``{tokenizer: {digest_hex: count}}`` JSON."""
+        target = Path(path or self.path or "token_counts.json")
+        target.parent.mkdir(parents=True, exist_ok=True)
+        payload: Dict[str, Dict[str, int]] = {}
+        with self._lock:
+            for (name, digest), count in self._data.items():
+                payload.setdefault(name, {})[digest.hex()] = count
+        target.write_text(json.dumps(payload), encoding="utf-8")
+        return target
+
+    def load(self, path: str | Path) -> None:
+        payload = json.loads(Path(path).read_text(encoding="utf-8"))
+        for name, entries in payload.items():
+            for digest_hex, count in entries.items():
+                self._put((name, bytes.fromhex(digest_hex)), count)
+
+
+_shared_cache: Optional[TokenCountCache] = None
+
+
+def get_token_cache() -> TokenCountCache:
+    """Return the process-wide cache used by default by tokenizer wrappers."""
+    global _shared_cache
+    if _shared_cache is None:
+        _shared_cache = TokenCountCache()
+    return _shared_cache
+
+
+def set_token_cache(cache: TokenCountCache) -> None:
+    """Replace the process-wide cache, e.g. with a persisted one."""
+    global _shared_cache
+    _shared_cache = cache
+
+
+__all__ = ["TokenCountCache", "get_token_cache", "set_token_cache"]
@@ -1,25 +1,116 @@
 from __future__ import annotations
 
-from typing import List
+from functools import lru_cache
+from typing import List, Optional, Protocol, Sequence, runtime_checkable
 
+import numpy as np
 from transformers import AutoTokenizer
 
+from .token_cache import TokenCountCache, get_token_cache
+
+DEFAULT_TOKENIZER = "hf-internal-testing/llama-tokenizer"
+
+
+@lru_cache(maxsize=None)
+def get_tokenizer(model_name: str = DEFAULT_TOKENIZER):
+    """Return the process-wide tokenizer for ``model_name``.
+
+    Tokenizers are loaded once per process and shared by every
+    :class:`TokenizerWrapper` using the same model name.
+    """
+    return AutoTokenizer.from_pretrained(model_name)
+
+
+@runtime_checkable
+class TokenCounter(Protocol):
+    """Interface the context builders need from a tokenizer.
+
+    Approximate counters additionally expose ``max_relative_error``, the
+    bound on how far a count may under-estimate the true token count.
+    """
+
+    model_name: str
+
+    def count_tokens(self, text: str) -> int: ...
+
+    def count_tokens_batch(
+        self, texts: Sequence[str], batch_size: int = 1024
+    ) -> np.ndarray: ...
+
+    def encode(self, text: str) -> List[int]: ...
+
 
 class TokenizerWrapper:
-    """Thin wrapper around a LLaMA tokenizer for token counting."""
+    """Thin wrapper around a LLaMA tokenizer for token counting.
+
+    Token counts go through a :class:`TokenCountCache` (the process-wide one
+    unless ``cache`` is given); pass ``use_cache=False`` to disable it.
+    """
 
     def __init__(
-        self, model_name: str = "hf-internal-testing/llama-tokenizer"
+        self,
+        model_name: str = DEFAULT_TOKENIZER,
+        cache: TokenCountCache | None = None,
+        use_cache: bool = True,
     ) -> None:
-        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        self.model_name = model_name
+        self.tokenizer = get_tokenizer(model_name)
+        self._cache = cache
+        self.use_cache = use_cache
+
+    @property
+    def cache(self) -> Optional[TokenCountCache]:
+        if not self.use_cache:
+            return None
+        return self._cache if self._cache is not None else get_token_cache()
 
     def count_tokens(self, text: str) -> int:
         """Return the number of tokens for ``text``."""
-        return len(self.tokenizer.encode(text, add_special_tokens=False))
+        cache = self.cache
+        if cache is not None:
+            count = cache.get(self.model_name, text)
+            if count is not None:
+                return count
+        count = len(self.tokenizer.encode(text, add_special_tokens=False))
+        if cache is not None:
+            cache.put(self.model_name, text, count)
+        return count
+
+    def count_tokens_batch(
+        self, texts: Sequence[str], batch_size: int = 1024
+    ) -> np.ndarray:
+        """Return token counts for ``texts`` as an ``int64`` array.
+
+        Cached sentences are answered from the cache; the rest are sent to
+        the tokenizer's batch API ``batch_size`` at a time, which lets fast
+        tokenizers encode them in parallel.
+        """
+        cache = self.cache
+        if cache is None:
+            return self._encode_counts(texts, batch_size)
+        counts, missing, keys = cache.lookup_many(self.model_name, texts)
+        if missing:
+            fresh = self._encode_counts([texts[i] for i in missing], batch_size)
+            counts[missing] = fresh
+            cache.store_many(keys, fresh)
+        return counts
+
+    def _encode_counts(self, texts: Sequence[str], batch_size: int) -> np.ndarray:
+        counts = np.empty(len(texts), dtype=np.int64)
+        for offset in range(0, len(texts), batch_size):
+            chunk = list(texts[offset : offset + batch_size])
+            encoded = self.tokenizer(
+                chunk,
+                add_special_tokens=False,
+                return_attention_mask=False,
+                return_token_type_ids=False,
+            )["input_ids"]
+            counts[offset : offset + len(chunk)] = [len(ids) for ids in encoded]
+        return counts
 
     def encode(self, text: str) -> List[int]:
         """Encode ``text`` and return the token ids."""
         return self.tokenizer.encode(text, add_special_tokens=False)
 
 
-__all__ = ["TokenizerWrapper"]
+__all__ = ["DEFAULT_TOKENIZER", "TokenCounter", "TokenizerWrapper", "get_tokenizer"]
@@ -1,22 +1,145 @@
 from __future__ import annotations
 
-from typing import Iterable, List
+import hashlib
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Sequence, Tuple
 
 from .schema import ContextUnit
 
+if TYPE_CHECKING:  # pragma: no cover - only for type checkers
+    from .document_store import DocumentStore
+    from .tokenizer_wrapper import TokenCounter
+
+ContextLocation = Tuple[str, str, int, int, Optional[int], Optional[int]]
+# (doc_id, section, start_sentence_idx, end_sentence_idx, char_start, char_end)
+
 
 def validate_contexts(
-    contexts: Iterable[ContextUnit], max_tokens: int
+    contexts: Iterable[ContextUnit],
+    max_tokens: int,
+    safety_margin: float = 0.0,
 ) -> List[ContextUnit]:
-    """Filter invalid context units."""
+    """Filter invalid context units.
+
+    ``safety_margin`` is the relative error of approximate token counts; a
+    unit is kept only if ``token_count * (1 + safety_margin)`` fits in
+    ``max_tokens``.
+    """
     valid: List[ContextUnit] = []
     for ctx in contexts:
-        if not ctx.text.strip():
+        if ctx.text:
+            if not ctx.text.strip():
+                continue
+        elif ctx.char_start is None or ctx.char_end <= ctx.char_start:
             continue
-        if ctx.token_count > max_tokens:
+        if ctx.token_count * (1 + safety_margin) > max_tokens:
             continue
         valid.append(ctx)
     return valid
 
 
-__all__ = ["validate_contexts"]
+def recheck_token_counts(
+    contexts: Sequence[ContextUnit],
+    counter: "TokenCounter",
+    max_tokens: int,
+    store: Optional["DocumentStore"] = None,
+) -> List[ContextUnit]:
+    """Re-count ``contexts`` with an exact ``counter``.
+
+    Approximate counts can fall short (e.g. on digit-heavy text). Each
+    unit's ``token_count`` is replaced by the exact count and units that no
+    longer fit in ``max_tokens`` are dropped. ``store`` resolves units built
+    without text.
+    """
+    if not contexts:
+        return []
+    counts = counter.count_tokens_batch([ctx.resolve_text(store) for ctx in contexts])
+    valid: List[ContextUnit] = []
+    for ctx, count in zip(contexts, counts):
+        if count <= max_tokens:
+            ctx.token_count = int(count)
+            valid.append(ctx)
+    return valid
+
+
+def _location(ctx: ContextUnit) -> ContextLocation:
+    src = ctx.source
+    return (
+        ctx.doc_id,
+        src.section,
+        src.start_sentence_idx,
+        src.end_sentence_idx,
+        ctx.char_start,
+        ctx.char_end,
+    )
+
+
+def _digest(value: object) -> int:
+    return int.from_bytes(
+        hashlib.blake2b(repr(value).encode("utf-8"), digest_size=8).digest(), "big"
+    )
+
+
+def check_context_ids(
+    contexts: Iterable[ContextUnit],
+    seen: Optional[Dict[int, int]] = None,
+    suspects: Optional[List[Tuple[str, ContextLocation]]] = None,
+) -> List[ContextUnit]:
+    """Drop repeated units and fail on context id collisions.
+
+    ``seen`` maps 8-byte digests of ids to digests of the location that
+    produced them, so memory stays small on large corpora; it is updated in
+    place and can be shared across documents. A unit whose id was already
+    seen at the same location (e.g. a document listed twice) is dropped.
+    An id seen at a different location raises ``ValueError``, unless
+    ``suspects`` is given: the unit is then kept and ``(context_id,
+    location)`` is appended, to be confirmed against the units actually
+    written with :func:`verify_context_ids` (the digests of two different
+    ids can collide).
+    """
+    seen = {} if seen is None else seen
+    unique: List[ContextUnit] = []
+    for ctx in contexts:
+        location = _location(ctx)
+        key = _digest(ctx.context_id)
+        previous = seen.get(key)
+        if previous is None:
+            seen[key] = _digest(location)
+            unique.append(ctx)
+        elif previous != _digest(location):
+            if suspects is None:
+                raise ValueError(
+                    f"context_id collision for {ctx.context_id}: "
+                    f"{location} differs from an earlier unit"
+                )
+            suspects.append((ctx.context_id, location))
+            unique.append(ctx)
+    return unique
+
+
+def verify_context_ids(
+    suspects: Sequence[Tuple[str, ContextLocation]],
+    contexts: Iterable[ContextUnit],
+) -> None:
+    """Re-read ``contexts`` to confirm collisions flagged by :func:`check_context_ids`.
+
+    Raises ``ValueError`` naming both locations when a suspect id was
+    produced at another location too.
+    """
+    if not suspects:
+        return
+    flagged = dict(suspects)
+    for ctx in contexts:
+        location = flagged.get(ctx.context_id)
+        if location is not None and _location(ctx) != location:
+            raise ValueError(
+                f"context_id collision for {ctx.context_id}: "
+                f"{_location(ctx)} vs {location}"
+            )
+
+
+__all__ = [
+    "check_context_ids",
+    "recheck_token_counts",
+    "validate_contexts",
+    "verify_context_ids",
+]
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Optional, Sequence
+
+from .schema import ContextUnit
+
+
+class JsonlContextWriter:
+    """Append context units to a JSONL file, one unit per line.
+
+    With ``omit_text``, units that carry character offsets are written
+    without their text (see :class:`DocumentStore`).
+    """
+
+    def __init__(self, path: str | Path, omit_text: bool = False) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.omit_text = omit_text
+        self._fh = self.path.open("w", encoding="utf-8")
+
+    def write(self, contexts: Sequence[ContextUnit]) -> None:
+        for ctx in contexts:
+            if self.omit_text and ctx.char_start is not None:
+                self._fh.write(ctx.model_dump_json(exclude={"text"}) + "\n")
+            else:
+                self._fh.write(ctx.model_dump_json() + "\n")
+
+    def close(self) -> None:
+        self._fh.close()
+
+    def __enter__(self) -> "JsonlContextWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def open_context_writer(
+    path: str | Path, omit_text: bool = False, fmt: Optional[str] = None
+):
+    """Return a writer for ``path``; ``fmt`` defaults to its suffix."""
+    fmt = fmt or Path(path).suffix.lower().lstrip(".")
+    if fmt in {"parquet", "pq"}:
+        # imported lazily to keep pyarrow optional for JSONL builds
+        from .columnar_store import ParquetContextWriter
+
+        return ParquetContextWriter(path, omit_text=omit_text)
+    if fmt == "jsonl":
+        return JsonlContextWriter(path, omit_text=omit_text)
+    raise ValueError(f"Unsupported context format: {fmt}")
+
+
+__all__ = ["JsonlContextWriter", "open_context_writer"]
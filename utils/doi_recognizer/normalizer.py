@@ -25,6 +25,7 @@ class AccessionNormalizer:
         "ena": ("ERR", "ERP", "ERS", "ERX"),
         "ega": ("EGAD", "EGAS", "EGAE", "EGAN"),
         "pdb": "",
+        "bioproject": "PRJ",
         "pmid": "PMID",
         "pmcid": "PMC",
     }
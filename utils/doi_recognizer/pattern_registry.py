@@ -26,6 +26,13 @@ class PatternRegistry:
         "PDB": re.compile(r"(?:PDB[:\s-]*)?[0-9A-Z]{4}", re.I),
         "EGA": re.compile(r"EGA[DS]\d{11,13}", re.I),
         "ENA": re.compile(r"ER[RXDS]\d{6,10}", re.I),
+        # INSDC nucleotide accessions (one letter and five digits or two
+        # letters and six, e.g. MN908947.3) without the version suffix; kept
+        # case-sensitive so that lower-case words with digits do not match
+        "GenBank": re.compile(
+            r"\b(?:[A-Z]\d{5}|[A-Z]{2}\d{6})(?=(?:\.\d+)?\b)"
+        ),
+        "BioProject": re.compile(r"PRJ(?:NA|EB|DB)\d{3,9}", re.I),
     }
 
     def find(self, text: str) -> List[PatternMatch]:
@@ -0,0 +1,183 @@
+"""Sweep CPU execution parameters and pick the fastest configuration."""
+from __future__ import annotations
+
+import itertools
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional, Sequence
+
+from .runtime_profile import RuntimeProfile, hardware_info
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class TrialConfig:
+    """One point of the parameter sweep."""
+
+    intra_op_threads: int
+    inter_op_threads: int
+    batch_size: int
+    dtype: str
+
+
+@dataclass
+class TrialResult:
+    """Measured throughput for a :class:`TrialConfig`."""
+
+    config: TrialConfig
+    tokens_per_sec: float
+    peak_rss_mb: float
+    error: str = ""
+
+
+def _run_trial(
+    model_name: str,
+    model_path: Optional[str],
+    texts: Sequence[str],
+    config: TrialConfig,
+    max_new_tokens: int,
+) -> TrialResult:  # pragma: no cover - runs in a fresh interpreter
+    import torch
+
+    from .base_inference import get_inference_model
+    from .replay_benchmark import peak_rss_mb
+
+    torch.set_num_threads(config.intra_op_threads)
+    torch.set_num_interop_threads(config.inter_op_threads)
+    model = get_inference_model(
+        model_name=model_name,
+        model_path=model_path,
+        torch_dtype=getattr(torch, config.dtype),
+        use_runtime_profile=False,
+    )
+    items = [(f"trial_{i}", text) for i, text in enumerate(texts)]
+
+    # time the stages ``predict_batch`` runs in the pipeline
+    tokens = 0
+    start = time.perf_counter()
+    for offset in range(0, len(items), config.batch_size):
+        prepared = model.prepare_batch(items[offset : offset + config.batch_size])
+        outputs = model.forward_batch(prepared, max_new_tokens=max_new_tokens)
+        model.finalize_batch(prepared, outputs)
+        tokens += sum(
+            p.inputs["input_ids"].shape[-1] + len(out.scores)
+            for p, out in zip(prepared, outputs)
+        )
+    elapsed = time.perf_counter() - start
+    return TrialResult(
+        config=config,
+        tokens_per_sec=tokens / elapsed if elapsed else 0.0,
+        peak_rss_mb=peak_rss_mb(),
+    )
+
+
+class CPUAutotuner:
+    """Measure tokens/s for every combination of the given parameters.
+
+    Trials run the backend's own batch stages (``prepare_batch``,
+    ``forward_batch``, ``finalize_batch``), as the pipeline does, so the
+    profile is tuned for the code path that uses it.
+
+    Each trial runs in a freshly spawned process because torch's inter-op
+    thread pool can only be sized once per interpreter.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        model_path: Optional[str] = None,
+        *,
+        intra_op_threads: Sequence[int] | None = None,
+        inter_op_threads: Sequence[int] = (1, 2),
+        batch_sizes: Sequence[int] = (1, 4, 8),
+        dtypes: Sequence[str] = ("float32", "bfloat16"),
+        max_new_tokens: int = 8,
+    ) -> None:
+        cpus = os.cpu_count() or 1
+        self.model_name = model_name
+        self.model_path = model_path
+        self.intra_op_threads = list(
+            intra_op_threads
+            or sorted({max(1, cpus // 4), max(1, cpus // 2), cpus})
+        )
+        self.inter_op_threads = list(inter_op_threads)
+        self.batch_sizes = list(batch_sizes)
+        self.dtypes = list(dtypes)
+        self.max_new_tokens = max_new_tokens
+
+    def trials(self) -> List[TrialConfig]:
+        return [
+            TrialConfig(intra, inter, batch, dtype)
+            for intra, inter, batch, dtype in itertools.product(
+                self.intra_op_threads,
+                self.inter_op_threads,
+                self.batch_sizes,
+                self.dtypes,
+            )
+        ]
+
+    def run(self, texts: Sequence[str]) -> List[TrialResult]:
+        """Run every trial on ``texts`` and return the measurements."""
+        results: List[TrialResult] = []
+        ctx = multiprocessing.get_context("spawn")
+        for config in self.trials():
+            with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+                future = pool.submit(
+                    _run_trial,
+                    self.model_name,
+                    self.model_path,
+                    list(texts),
+                    config,
+                    self.max_new_tokens,
+                )
+                try:
+                    result = future.result()
+                except Exception as exc:  # e.g. dtype unsupported on this CPU
+                    result = TrialResult(config, 0.0, 0.0, error=repr(exc))
+            logger.info(
+                "trial %s -> %.1f tok/s, %.0f MB%s",
+                asdict(config),
+                result.tokens_per_sec,
+                result.peak_rss_mb,
+                f" ({result.error})" if result.error else "",
+            )
+            results.append(result)
+        return results
+
+    @staticmethod
+    def best_profile(results: Sequence[TrialResult]) -> RuntimeProfile:
+        """Turn the fastest successful trial into a :class:`RuntimeProfile`."""
+        ok = [r for r in results if not r.error and r.tokens_per_sec > 0]
+        if not ok:
+            raise RuntimeError("No autotuning trial succeeded")
+        best = max(ok, key=lambda r: r.tokens_per_sec)
+        return RuntimeProfile(
+            intra_op_threads=best.config.intra_op_threads,
+            inter_op_threads=best.config.inter_op_threads,
+            batch_size=best.config.batch_size,
+            dtype=best.config.dtype,
+            tokens_per_sec=round(best.tokens_per_sec, 2),
+            peak_rss_mb=round(best.peak_rss_mb, 1),
+            hardware=hardware_info(),
+        )
+
+
+def summarize(results: Sequence[TrialResult]) -> List[Dict[str, Any]]:
+    """Flatten trial results for logging or JSON output."""
+    return [
+        {
+            **asdict(r.config),
+            "tokens_per_sec": round(r.tokens_per_sec, 2),
+            "peak_rss_mb": round(r.peak_rss_mb, 1),
+            "error": r.error,
+        }
+        for r in results
+    ]
+
+
+__all__ = ["CPUAutotuner", "TrialConfig", "TrialResult", "summarize"]
@@ -7,20 +7,47 @@ prompt replay logging.
 """
 from __future__ import annotations
 
+import threading
 from abc import ABC
-from dataclasses import dataclass, asdict
-from typing import Any, Dict, Optional
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 import torch
 from transformers import AutoModelForCausalLM, AutoTokenizer
 
+from .inference_engine import left_pad, pad_token_id, top_scores, unbatch
 from .output_decoder import LLMOutputDecoder, DecodingStrategy
 from .prompt_generator import PromptGenerator
 from .replay_logger import PromptReplayLogger, ReplayRecord
+from .runtime_profile import apply_runtime_profile, load_cpu_runtime_profile
 from .validator import InferenceValidator
 
 
-@dataclass
+@dataclass(slots=True)
+class PreparedPrompt:
+    """A prompt formatted and tokenized for one context, ready for the model."""
+
+    context_id: str
+    context: str
+    strategy: str
+    prompt: str
+    inputs: Any
+
+
+@dataclass(slots=True)
+class RawGeneration:
+    """Undecoded model output for one prompt.
+
+    ``tokens`` are the backend's output tokens, turned into text by
+    :meth:`BaseInferenceModel.decode_tokens`; ``scores`` holds one sparse
+    ``{token_id: score}`` map per generated token.
+    """
+
+    tokens: Any
+    scores: List[Dict[int, float]]
+
+
+@dataclass(slots=True)
 class LLMResult:
     """Structured result returned by inference models."""
 
@@ -34,22 +61,38 @@ class LLMResult:
 
 
 class BaseInferenceModel(ABC):
-    """Abstract base class for all inference backends."""
+    """Abstract base class for all inference backends.
+
+    Generation keeps the ``score_top_k`` best scores of each step and the
+    scores of the label tokens.
+    """
+
+    score_top_k = 20
 
     def __init__(
         self,
         model_path: str,
-        replay_log: Optional[str] = None,
+        replay_log: Optional[str | PromptReplayLogger] = None,
         template_version: str = "v1.0",
+        torch_dtype: torch.dtype | str | None = None,
     ) -> None:
         self.model_path = model_path
         self.template_version = template_version
+        if isinstance(torch_dtype, str):
+            torch_dtype = getattr(torch, torch_dtype)
+        self.torch_dtype = torch_dtype or torch.float16
         self.prompt_generator = PromptGenerator()
         self.decoder = LLMOutputDecoder()
         self.validator = InferenceValidator()
-        self.logger: Optional[PromptReplayLogger] = (
-            PromptReplayLogger(replay_log) if replay_log else None
-        )
+        self.label_token_ids = [
+            self.decoder.logit_decoder._token_id(label) for label in self.decoder.labels
+        ]
+        # fast tokenizers must not be used from two threads at once
+        self._tokenizer_lock = threading.Lock()
+        if isinstance(replay_log, PromptReplayLogger) or replay_log is None:
+            self.logger: Optional[PromptReplayLogger] = replay_log
+        else:
+            self.logger = PromptReplayLogger(replay_log)
         self.model_name = model_path.split("/")[-1]
         self.load_model()
 
@@ -65,7 +108,7 @@ class BaseInferenceModel(ABC):
         )
         self.engine = AutoModelForCausalLM.from_pretrained(
             self.model_path,
-            torch_dtype=torch.float16,
+            torch_dtype=self.torch_dtype,
             device_map="auto",
             trust_remote_code=True,
         )
@@ -74,43 +117,109 @@ class BaseInferenceModel(ABC):
         """Format the prompt for the given ``context`` and ``strategy``."""
         return self.prompt_generator.generate(context, strategy)
 
-    def predict(
+    def encode(self, prompt: str) -> Any:
+        """Tokenize ``prompt`` into model inputs.
+
+        Runs on the CPU only, so it can be done ahead of the forward pass.
+        """
+        with self._tokenizer_lock:
+            return self.tokenizer(prompt, return_tensors="pt")
+
+    def decode_tokens(self, tokens: Any) -> str:
+        """Turn :attr:`RawGeneration.tokens` into text."""
+        with self._tokenizer_lock:
+            return self.tokenizer.decode(tokens, skip_special_tokens=True)
+
+    def generate_from_inputs(
         self,
-        context_id: str,
-        context: str,
-        strategy: str = "zero-shot",
+        inputs: Any,
         temperature: float = 0.0,
         max_new_tokens: int = 32,
-    ) -> LLMResult:
-        """Run inference on ``context`` and return an :class:`LLMResult`."""
-        prompt = self.format_prompt(context, strategy)
-        inputs = self.tokenizer(prompt, return_tensors="pt").to(
-            self.engine.device
-        )
+    ) -> RawGeneration:
+        """Run the model on encoded ``inputs``."""
+        return self.generate_batch_from_inputs(
+            [inputs], temperature=temperature, max_new_tokens=max_new_tokens
+        )[0]
+
+    def generate_batch_from_inputs(
+        self,
+        inputs: Sequence[Any],
+        temperature: float = 0.0,
+        max_new_tokens: int = 32,
+    ) -> List[RawGeneration]:
+        """Run one batched ``generate`` call over several encoded prompts.
+
+        Prompts are left-padded to the longest one with an attention mask
+        (see :func:`~utils.llm_inference.inference_engine.left_pad`), and the
+        output is split back into one :class:`RawGeneration` per prompt.
+        """
+        batch = left_pad(inputs, pad_token_id(self.engine))
         outputs = self.engine.generate(
-            **inputs,
+            **{k: v.to(self.engine.device) for k, v in batch.items()},
             max_new_tokens=max_new_tokens,
             temperature=temperature,
             do_sample=temperature > 0,
             output_scores=True,
             return_dict_in_generate=True,
         )
-        text = self.tokenizer.decode(
-            outputs.sequences[0], skip_special_tokens=True
+        generated = unbatch(
+            outputs.sequences,
+            outputs.scores,
+            [x["input_ids"].shape[-1] for x in inputs],
+            self.engine.generation_config.eos_token_id,
         )
-        scores = [score[0].tolist() for score in outputs.scores]
+        return [
+            RawGeneration(
+                g["tokens"].tolist(),
+                top_scores(g["scores"], self.score_top_k, self.label_token_ids),
+            )
+            for g in generated
+        ]
+
+    # ------------------------------------------------------------------
+    # Prediction stages
+    #
+    # ``predict`` is split into ``prepare`` (prompt formatting and
+    # tokenization), ``forward`` (the model call, returning undecoded
+    # :class:`RawGeneration`) and ``finalize`` (detokenization, decoding,
+    # validation and replay logging), so the CPU-only stages can overlap
+    # with the model; see :class:`PipelinedExecutor`.
+    # ------------------------------------------------------------------
+    def prepare(
+        self, context_id: str, context: str, strategy: str = "zero-shot"
+    ) -> PreparedPrompt:
+        prompt = self.format_prompt(context, strategy)
+        return PreparedPrompt(context_id, context, strategy, prompt, self.encode(prompt))
+
+    def forward(
+        self,
+        prepared: PreparedPrompt,
+        temperature: float = 0.0,
+        max_new_tokens: int = 32,
+    ) -> RawGeneration:
+        return self.generate_from_inputs(
+            prepared.inputs, temperature=temperature, max_new_tokens=max_new_tokens
+        )
+
+    def finalize(
+        self,
+        prepared: PreparedPrompt,
+        output: RawGeneration,
+        temperature: float = 0.0,
+        decoding: DecodingStrategy = DecodingStrategy.TEXT2LABEL,
+    ) -> LLMResult:
         prediction = self.decoder.decode(
-            context_id=context_id,
-            text=text,
-            scores=scores,
-            strategy=DecodingStrategy.TEXT2LABEL,
+            context_id=prepared.context_id,
+            text=self.decode_tokens(output.tokens),
+            scores=output.scores,
+            strategy=decoding,
         )
         result = LLMResult(
-            context_id=context_id,
+            context_id=prepared.context_id,
             predicted_label=prediction.final_label,
             confidence=prediction.confidence,
             raw_output=prediction.raw_output,
-            prompt=prompt,
+            prompt=prepared.prompt,
             logits=prediction.logits,
             meta={
                 "model_name": self.model_name,
@@ -120,17 +229,97 @@ class BaseInferenceModel(ABC):
                 "label_source": prediction.label_source,
             },
         )
-        self.validator.validate(asdict(result))
+        self.validator.validate(result)
         if self.logger:
             self.logger.log(
                 ReplayRecord(
-                    prompt=prompt,
+                    prompt=prepared.prompt,
                     output=prediction.raw_output,
                     metadata=result.meta,
+                    context_id=prepared.context_id,
+                    context=prepared.context,
+                    strategy=prepared.strategy,
+                    label=result.predicted_label,
                 )
             )
         return result
 
+    def prepare_batch(
+        self, items: Sequence[Tuple[str, str]], strategy: str = "zero-shot"
+    ) -> List[PreparedPrompt]:
+        return [self.prepare(cid, context, strategy) for cid, context in items]
+
+    def forward_batch(
+        self,
+        prepared: Sequence[PreparedPrompt],
+        temperature: float = 0.0,
+        max_new_tokens: int = 32,
+    ) -> List[RawGeneration]:
+        """Run the model on ``prepared`` prompts in one batched call."""
+        if not prepared:
+            return []
+        return self.generate_batch_from_inputs(
+            [p.inputs for p in prepared],
+            temperature=temperature,
+            max_new_tokens=max_new_tokens,
+        )
+
+    def finalize_batch(
+        self,
+        prepared: Sequence[PreparedPrompt],
+        outputs: Sequence[RawGeneration],
+        temperature: float = 0.0,
+        decoding: DecodingStrategy = DecodingStrategy.TEXT2LABEL,
+    ) -> List[LLMResult]:
+        return [
+            self.finalize(p, output, temperature=temperature, decoding=decoding)
+            for p, output in zip(prepared, outputs)
+        ]
+
+    def predict(
+        self,
+        context_id: str,
+        context: str,
+        strategy: str = "zero-shot",
+        temperature: float = 0.0,
+        max_new_tokens: int = 32,
+        decoding: DecodingStrategy = DecodingStrategy.TEXT2LABEL,
+    ) -> LLMResult:
+        """Run inference on ``context`` and return an :class:`LLMResult`.
+
+        ``decoding`` selects how the output is turned into a label; with
+        :attr:`DecodingStrategy.LOGIT_MAPPED` the label is read from the
+        label-token scores alone, so ``max_new_tokens=1`` is enough.
+        """
+        prepared = self.prepare(context_id, context, strategy)
+        output = self.forward(
+            prepared, temperature=temperature, max_new_tokens=max_new_tokens
+        )
+        return self.finalize(
+            prepared, output, temperature=temperature, decoding=decoding
+        )
+
+    def predict_batch(
+        self,
+        items: Sequence[Tuple[str, str]],
+        strategy: str = "zero-shot",
+        temperature: float = 0.0,
+        max_new_tokens: int = 32,
+        decoding: DecodingStrategy = DecodingStrategy.TEXT2LABEL,
+    ) -> List[LLMResult]:
+        """Run inference on ``(context_id, context)`` pairs.
+
+        Runs the batch stages (:meth:`prepare_batch`, :meth:`forward_batch`,
+        :meth:`finalize_batch`) one after another.
+        """
+        prepared = self.prepare_batch(items, strategy)
+        outputs = self.forward_batch(
+            prepared, temperature=temperature, max_new_tokens=max_new_tokens
+        )
+        return self.finalize_batch(
+            prepared, outputs, temperature=temperature, decoding=decoding
+        )
+
     # Backwards compatibility for older code using ``infer``
     def infer(self, *args: Any, **kwargs: Any) -> LLMResult:
         return self.predict(*args, **kwargs)
@@ -144,6 +333,7 @@ from .qwen_inference import QwenInferenceModel  # noqa: E402
 from .deepseek_inference import DeepSeekInferenceModel  # noqa: E402
 from .mixtral_inference import MixtralInferenceModel  # noqa: E402
 from .gemma_inference import GemmaInferenceModel  # noqa: E402
+from .stub_inference import StubInferenceModel  # noqa: E402
 
 
 MODEL_REGISTRY = {
@@ -152,15 +342,28 @@ MODEL_REGISTRY = {
     "deepseek": DeepSeekInferenceModel,
     "mixtral": MixtralInferenceModel,
     "gemma": GemmaInferenceModel,
+    "stub": StubInferenceModel,
 }
 
 
 def get_inference_model(
     model_name: Optional[str] = None,
     model_path: Optional[str] = None,
+    use_runtime_profile: bool = True,
     **kwargs: Any,
 ) -> BaseInferenceModel:
-    """Instantiate an inference model based on ``model_name`` or ``model_path``."""
+    """Instantiate an inference model based on ``model_name`` or ``model_path``.
+
+    When a runtime profile tuned on this hardware exists (see
+    ``scripts/tune.py``) and no GPU is available, its thread settings are
+    applied and its dtype is used unless ``torch_dtype`` is given.
+    """
+
+    if use_runtime_profile:
+        profile = load_cpu_runtime_profile()
+        if profile is not None:
+            apply_runtime_profile(profile)
+            kwargs.setdefault("torch_dtype", profile.torch_dtype)
 
     if model_name:
         cls = MODEL_REGISTRY.get(model_name.lower())
@@ -179,6 +382,8 @@ def get_inference_model(
 __all__ = [
     "BaseInferenceModel",
     "LLMResult",
+    "PreparedPrompt",
+    "RawGeneration",
     "MODEL_REGISTRY",
     "get_inference_model",
 ]
@@ -1,7 +1,6 @@
 """DeepSeek inference backend using HuggingFace APIs."""
 from __future__ import annotations
 
-import torch
 from transformers import AutoModelForCausalLM, AutoTokenizer
 
 from .base_inference import BaseInferenceModel
@@ -18,7 +17,7 @@ class DeepSeekInferenceModel(BaseInferenceModel):
         )
         self.engine = AutoModelForCausalLM.from_pretrained(
             self.model_path,
-            torch_dtype=torch.float16,
+            torch_dtype=self.torch_dtype,
             device_map="auto",
             trust_remote_code=True,
         )
@@ -1,7 +1,6 @@
 """Gemma model inference backend using HuggingFace Transformers."""
 from __future__ import annotations
 
-import torch
 from transformers import AutoModelForCausalLM, AutoTokenizer
 
 from .base_inference import BaseInferenceModel
@@ -17,7 +16,7 @@ class GemmaInferenceModel(BaseInferenceModel):
         )
         self.engine = AutoModelForCausalLM.from_pretrained(
             self.model_path,
-            torch_dtype=torch.float16,
+            torch_dtype=self.torch_dtype,
             device_map="auto",
             trust_remote_code=True,
         )
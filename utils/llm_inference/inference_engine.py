@@ -1,22 +1,42 @@
 """Core model execution utilities."""
 from __future__ import annotations
 
+import logging
+import os
+import re
 from dataclasses import dataclass
 from importlib import import_module
-from typing import Any, Dict
+from pathlib import Path
+from typing import Any, Dict, List, Sequence, Set, Tuple
 
 import torch
 from transformers import AutoModelForCausalLM
 
+from config.path_config import COMPILE_CACHE_DIR
+
+logger = logging.getLogger(__name__)
+
 
 @dataclass
 class EngineConfig:
-    """Configuration for the inference engine."""
+    """Configuration for the inference engine.
+
+    When ``compile`` is enabled the model forward is wrapped in
+    :func:`torch.compile`. Prompts are left-padded to the nearest entry in
+    ``length_buckets`` (longer ones to a multiple of the largest) so that
+    only one static graph per bucket is compiled,
+    and compiled artefacts are persisted under ``compile_cache_dir`` so that
+    later runs on the same machine start warm.
+    """
 
     model_path: str
     device: str | None = None
     dtype: torch.dtype = torch.float16
     backend: str = "transformers"
+    compile: bool = False
+    compile_mode: str = "reduce-overhead"
+    compile_cache_dir: str | None = None
+    length_buckets: Tuple[int, ...] = (64, 128, 256, 512, 1024, 2048)
 
 
 class ModelLoader:
@@ -35,6 +55,113 @@ class ModelLoader:
         raise ValueError(f"Unsupported backend: {self.config.backend}")
 
 
+def bucket_length(length: int, buckets: Tuple[int, ...]) -> int:
+    """Return the smallest bucket that fits ``length``.
+
+    Longer prompts are rounded up to a multiple of the largest bucket, so
+    they also share a few compiled graphs instead of one per length.
+    """
+    ordered = sorted(buckets)
+    for bucket in ordered:
+        if length <= bucket:
+            return bucket
+    top = ordered[-1]
+    return -(-length // top) * top
+
+
+def pad_token_id(model: Any) -> int:
+    """Token id used to pad prompts for ``model`` (falls back to EOS, then 0)."""
+    gen_config = model.generation_config
+    pad_id = gen_config.pad_token_id
+    if pad_id is None:
+        pad_id = gen_config.eos_token_id
+    if isinstance(pad_id, (list, tuple)):
+        pad_id = pad_id[0]
+    return 0 if pad_id is None else pad_id
+
+
+def left_pad(inputs: Sequence[Dict[str, Any]], pad_id: int) -> Dict[str, torch.Tensor]:
+    """Stack single-prompt encodings into one left-padded batch.
+
+    Padding goes on the left so every prompt ends at the last position and
+    generation continues from the real final token; the returned
+    ``attention_mask`` masks the padding out.
+    """
+    ids = [x["input_ids"].reshape(-1) for x in inputs]
+    masks = [
+        x["attention_mask"].reshape(-1) if "attention_mask" in x else torch.ones_like(i)
+        for x, i in zip(inputs, ids)
+    ]
+    width = max(len(i) for i in ids)
+    pad = torch.nn.functional.pad
+    return {
+        "input_ids": torch.stack(
+            [pad(i, (width - len(i), 0), value=pad_id) for i in ids]
+        ),
+        "attention_mask": torch.stack(
+            [pad(m, (width - len(m), 0), value=0) for m in masks]
+        ),
+    }
+
+
+def unbatch(
+    sequences: torch.Tensor,
+    scores: Sequence[torch.Tensor],
+    prompt_lengths: Sequence[int],
+    eos_token_id: int | Sequence[int] | None = None,
+) -> List[Dict[str, Any]]:
+    """Split a left-padded batched ``generate`` output per prompt.
+
+    Each entry holds the prompt and generated ``tokens`` without padding and
+    one ``(1, vocab)`` score row per generated token. Rows that hit EOS
+    before the longest one are cut after their EOS, so their last score row
+    is the one a single-prompt call would have ended on.
+    """
+    if isinstance(eos_token_id, int):
+        eos_token_id = [eos_token_id]
+    eos = set(eos_token_id or ())
+    width = sequences.shape[-1] - len(scores)
+    results = []
+    for row, length in enumerate(prompt_lengths):
+        generated = sequences[row, width:].tolist()
+        steps = len(generated)
+        for step, token in enumerate(generated):
+            if token in eos:
+                steps = step + 1
+                break
+        results.append(
+            {
+                "tokens": sequences[row, width - length : width + steps],
+                "scores": [score[row : row + 1] for score in scores[:steps]],
+            }
+        )
+    return results
+
+
+def top_scores(
+    scores: Sequence[torch.Tensor], k: int, keep: Sequence[int] = ()
+) -> List[Dict[int, float]]:
+    """Reduce per-step ``(1, vocab)`` score rows to ``{token_id: score}`` maps.
+
+    Each map holds the ``k`` best tokens of its step plus the ``keep``
+    tokens (such as label tokens), which is all the decoders read; copying
+    these few values to Python is much cheaper than the full vocabulary.
+    """
+    if not scores:
+        return []
+    rows = torch.cat(list(scores)).float()
+    vocab = rows.shape[-1]
+    values, ids = rows.topk(min(k, vocab), dim=-1)
+    keep = [t for t in keep if 0 <= t < vocab]
+    kept = rows[:, keep].tolist()
+    steps = []
+    for step_ids, step_values, step_kept in zip(ids.tolist(), values.tolist(), kept):
+        step = dict(zip(step_ids, step_values))
+        step.update(zip(keep, step_kept))
+        steps.append(step)
+    return steps
+
+
 class InferenceEngine:
     """Run forward passes on the language model."""
 
@@ -45,8 +172,69 @@ class InferenceEngine:
         if config.device:
             self.model.to(config.device)
         self.model.eval()
+        self._compiled_buckets: Set[int] = set()
+        self._cache_file: Path | None = None
+        if config.compile:
+            self._enable_compile()
+
+    # ------------------------------------------------------------------
+    # torch.compile support
+    # ------------------------------------------------------------------
+    def _enable_compile(self) -> None:  # pragma: no cover - heavy compile
+        cache_dir = Path(self.config.compile_cache_dir or COMPILE_CACHE_DIR)
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        os.environ.setdefault("TORCHINDUCTOR_CACHE_DIR", str(cache_dir / "inductor"))
+        os.environ.setdefault("TRITON_CACHE_DIR", str(cache_dir / "triton"))
+        try:
+            import torch._inductor.config as inductor_config
+
+            inductor_config.fx_graph_cache = True
+        except Exception:  # pragma: no cover - older torch
+            pass
+
+        slug = re.sub(r"[^A-Za-z0-9_.-]+", "_", str(self.config.model_path))
+        self._cache_file = cache_dir / f"{slug}_{self.config.compile_mode}.bin"
+        if self._cache_file.exists() and hasattr(torch.compiler, "load_cache_artifacts"):
+            torch.compiler.load_cache_artifacts(self._cache_file.read_bytes())
+            logger.info("Loaded compile cache from %s", self._cache_file)
+
+        # a static KV cache keeps decoder shapes fixed across generation steps
+        self.model.generation_config.cache_implementation = "static"
+        self.model.forward = torch.compile(
+            self.model.forward, mode=self.config.compile_mode, dynamic=False
+        )
+
+    def save_compile_cache(self) -> None:
+        """Persist compiled artefacts so the next run starts warm."""
+        if self._cache_file is None or not hasattr(torch.compiler, "save_cache_artifacts"):
+            return
+        artifacts = torch.compiler.save_cache_artifacts()
+        if artifacts is not None:
+            self._cache_file.write_bytes(artifacts[0])
+
+    def _pad_to_bucket(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
+        input_ids = inputs["input_ids"]
+        length = input_ids.shape[-1]
+        pad = bucket_length(length, self.config.length_buckets) - length
+        if pad <= 0:
+            return inputs
+        pad_id = pad_token_id(self.model)
+        padded = dict(inputs)
+        padded["input_ids"] = torch.nn.functional.pad(input_ids, (pad, 0), value=pad_id)
+        padded["attention_mask"] = torch.nn.functional.pad(
+            inputs["attention_mask"], (pad, 0), value=0
+        )
+        return padded
+
+    def warmup(self, max_new_tokens: int = 32) -> None:  # pragma: no cover
+        """Compile every length bucket ahead of time."""
+        for bucket in sorted(self.config.length_buckets):
+            ids = torch.zeros((1, bucket), dtype=torch.long)
+            self.generate(
+                {"input_ids": ids, "attention_mask": torch.ones_like(ids)},
+                max_new_tokens=max_new_tokens,
+            )
 
-    @torch.inference_mode()
     def generate(
         self,
         inputs: Dict[str, Any],
@@ -54,19 +242,46 @@ class InferenceEngine:
         temperature: float = 0.0,
     ) -> Dict[str, Any]:
         """Generate text and collect logits for the last token."""
+        return self.generate_batch(
+            [inputs], max_new_tokens=max_new_tokens, temperature=temperature
+        )[0]
+
+    @torch.inference_mode()
+    def generate_batch(
+        self,
+        inputs: Sequence[Dict[str, Any]],
+        max_new_tokens: int = 32,
+        temperature: float = 0.0,
+    ) -> List[Dict[str, Any]]:
+        """Run one left-padded ``generate`` call over several prompts.
+
+        Returns one ``{"tokens", "scores"}`` dict per prompt, as
+        :meth:`generate` does; see :func:`unbatch`.
+        """
+        lengths = [x["input_ids"].shape[-1] for x in inputs]
+        batch = left_pad(inputs, pad_token_id(self.model))
+        if self.config.compile:
+            batch = self._pad_to_bucket(batch)
+        batch = {k: v.to(self.model.device) for k, v in batch.items()}
         output = self.model.generate(
-            **inputs,
+            **batch,
             max_new_tokens=max_new_tokens,
             temperature=temperature,
+            do_sample=temperature > 0,
             return_dict_in_generate=True,
             output_scores=True,
         )
-        tokens = output.sequences[0]
-        scores = output.scores
-        return {
-            "tokens": tokens,
-            "scores": scores,
-        }
+        if self.config.compile:
+            bucket = batch["input_ids"].shape[-1]
+            if bucket not in self._compiled_buckets:
+                self._compiled_buckets.add(bucket)
+                self.save_compile_cache()
+        return unbatch(
+            output.sequences,
+            output.scores,
+            lengths,
+            self.model.generation_config.eos_token_id,
+        )
 
 
 # ---------------------------------------------------------------------------
@@ -88,6 +303,9 @@ MODEL_REGISTRY = {
     "deepseek": (
         "utils.llm_inference.deepseek_inference:DeepSeekInferenceModel"
     ),
+    "stub": (
+        "utils.llm_inference.stub_inference:StubInferenceModel"
+    ),
 }
 
 
@@ -1,19 +1,69 @@
 """LLaMA 3 inference backend and backward compatible wrapper."""
 from __future__ import annotations
 
-from .base_inference import BaseInferenceModel, LLMResult
+from typing import Any, List, Sequence
+
+from .base_inference import BaseInferenceModel, LLMResult, RawGeneration
 from .tokenizer_wrapper import TokenizerWrapper, TokenizerConfig
-from .inference_engine import EngineConfig, InferenceEngine
+from .inference_engine import EngineConfig, InferenceEngine, top_scores
 
 
 class LLaMA3InferenceModel(BaseInferenceModel):
-    """Inference model for LLaMA 3."""
+    """Inference model for LLaMA 3.
+
+    ``compile=True`` runs the model through :func:`torch.compile` (see
+    :class:`EngineConfig`); ``compile_cache_dir`` overrides where compiled
+    artefacts are stored.
+    """
+
+    def __init__(
+        self,
+        model_path: str,
+        compile: bool = False,
+        compile_cache_dir: str | None = None,
+        **kwargs: Any,
+    ) -> None:
+        self.compile = compile
+        self.compile_cache_dir = compile_cache_dir
+        super().__init__(model_path=model_path, **kwargs)
 
     def load_model(self) -> None:  # pragma: no cover - heavy load
         self.tokenizer = TokenizerWrapper(
             TokenizerConfig(model_path=self.model_path)
         )
-        self.engine = InferenceEngine(EngineConfig(model_path=self.model_path))
+        self.engine = InferenceEngine(
+            EngineConfig(
+                model_path=self.model_path,
+                dtype=self.torch_dtype,
+                compile=self.compile,
+                compile_cache_dir=self.compile_cache_dir,
+            )
+        )
+
+    def encode(self, prompt: str) -> Any:  # pragma: no cover - heavy load
+        with self._tokenizer_lock:
+            return self.tokenizer.encode(prompt)
+
+    def decode_tokens(self, tokens: Any) -> str:  # pragma: no cover - heavy load
+        with self._tokenizer_lock:
+            return self.tokenizer.decode(tokens)
+
+    def generate_batch_from_inputs(
+        self,
+        inputs: Sequence[Any],
+        temperature: float = 0.0,
+        max_new_tokens: int = 32,
+    ) -> List[RawGeneration]:  # pragma: no cover - heavy inference
+        generated = self.engine.generate_batch(
+            inputs, max_new_tokens=max_new_tokens, temperature=temperature
+        )
+        return [
+            RawGeneration(
+                g["tokens"].tolist(),
+                top_scores(g["scores"], self.score_top_k, self.label_token_ids),
+            )
+            for g in generated
+        ]
 
 
 # Backwards compatibility -----------------------------------------------------
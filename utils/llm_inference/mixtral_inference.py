@@ -1,7 +1,6 @@
 """Mixtral mixture-of-experts inference backend."""
 from __future__ import annotations
 
-import torch
 from transformers import AutoModelForCausalLM, AutoTokenizer
 
 from .base_inference import BaseInferenceModel
@@ -16,7 +15,8 @@ class MixtralInferenceModel(BaseInferenceModel):
         Models are loaded from ``self.model_path`` using HuggingFace's
         :func:`~transformers.AutoTokenizer.from_pretrained` and
         :func:`~transformers.AutoModelForCausalLM.from_pretrained` helpers. The
-        model weights are cast to ``float16`` and the device placement is
+        model weights are cast to ``self.torch_dtype`` (``float16`` unless a
+        runtime profile says otherwise) and the device placement is
         automatically determined. If the model configuration supports Flash
         Attention v2, it is enabled to improve inference speed.
         """
@@ -26,7 +26,7 @@ class MixtralInferenceModel(BaseInferenceModel):
         )
         self.engine = AutoModelForCausalLM.from_pretrained(
             self.model_path,
-            torch_dtype=torch.float16,
+            torch_dtype=self.torch_dtype,
             device_map="auto",
             trust_remote_code=True,
         )
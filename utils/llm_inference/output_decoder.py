@@ -11,7 +11,7 @@ from .logit_decoder import LogitDecoder
 from .validator import LabelValidator
 
 
-@dataclass
+@dataclass(slots=True)
 class FinalPrediction:
     """Standardized prediction structure produced by the decoder."""
 
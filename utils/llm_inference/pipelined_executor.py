@@ -0,0 +1,150 @@
+"""Overlap CPU pre- and post-processing with model forward passes.
+
+:class:`PipelinedExecutor` runs the stages of
+:meth:`~utils.llm_inference.base_inference.BaseInferenceModel.predict_batch`
+on separate threads connected by bounded queues: a producer thread formats
+and tokenizes upcoming batches, a model thread runs the forward passes and
+the consuming thread detokenizes, decodes and validates results while the
+model works on the next batch. The model thread only returns raw token ids
+and a few scores per step (see :class:`RawGeneration`), so no Python-heavy
+work holds it up. The bounded queues keep at most ``depth`` batches waiting
+between stages.
+"""
+from __future__ import annotations
+
+import queue
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from .base_inference import BaseInferenceModel, LLMResult, PreparedPrompt, RawGeneration
+from .decoding_strategy import DecodingStrategy
+
+_DONE = object()
+
+
+@dataclass(slots=True)
+class BatchJob:
+    """One batch of ``(context_id, context)`` items and how to run it.
+
+    ``payload`` is returned untouched with the results. Jobs without a
+    ``model`` are passed through with no results.
+    """
+
+    payload: Any
+    items: Sequence[Tuple[str, str]]
+    model: Optional[BaseInferenceModel]
+    max_new_tokens: int = 32
+    decoding: DecodingStrategy = DecodingStrategy.TEXT2LABEL
+    prepared: List[PreparedPrompt] = field(default_factory=list)
+    outputs: List[RawGeneration] = field(default_factory=list)
+
+
+def run_job(job: BatchJob) -> List[LLMResult]:
+    """Run ``job`` on the calling thread."""
+    if job.model is None:
+        return []
+    return job.model.predict_batch(
+        job.items, max_new_tokens=job.max_new_tokens, decoding=job.decoding
+    )
+
+
+class _Failure:
+    def __init__(self, exc: BaseException) -> None:
+        self.exc = exc
+
+
+class PipelinedExecutor:
+    """Run :class:`BatchJob` stages on three threads.
+
+    ``jobs`` is consumed lazily by the producer thread, so work done while
+    generating jobs (such as resolving context text) is overlapped too;
+    anything that must track finished batches, such as a
+    :class:`DeadlineScheduler`, belongs on the consuming side.
+    Results come back in job order. An exception in any stage is re-raised
+    in the consuming thread.
+    """
+
+    def __init__(self, depth: int = 2) -> None:
+        if depth < 1:
+            raise ValueError("depth must be at least 1")
+        self.depth = depth
+
+    def run(self, jobs: Iterable[BatchJob]) -> Iterator[Tuple[BatchJob, List[LLMResult]]]:
+        prepared: queue.Queue = queue.Queue(self.depth)
+        forwarded: queue.Queue = queue.Queue(self.depth)
+        stop = threading.Event()
+
+        def put(q: queue.Queue, item: Any) -> bool:
+            while not stop.is_set():
+                try:
+                    q.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def get(q: queue.Queue) -> Any:
+            while not stop.is_set():
+                try:
+                    return q.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+            return _DONE
+
+        def produce() -> None:
+            try:
+                for job in jobs:
+                    if job.model is not None:
+                        job.prepared = job.model.prepare_batch(job.items)
+                    if not put(prepared, job):
+                        return
+            except BaseException as exc:  # noqa: BLE001 - re-raised by the consumer
+                put(prepared, _Failure(exc))
+                return
+            put(prepared, _DONE)
+
+        def forward() -> None:
+            while True:
+                job = get(prepared)
+                if job is _DONE or isinstance(job, _Failure):
+                    put(forwarded, job)
+                    return
+                try:
+                    if job.model is not None:
+                        job.outputs = job.model.forward_batch(
+                            job.prepared, max_new_tokens=job.max_new_tokens
+                        )
+                except BaseException as exc:  # noqa: BLE001 - re-raised by the consumer
+                    put(forwarded, _Failure(exc))
+                    return
+                if not put(forwarded, job):
+                    return
+
+        threads = [
+            threading.Thread(target=produce, name="prepare", daemon=True),
+            threading.Thread(target=forward, name="forward", daemon=True),
+        ]
+        for thread in threads:
+            thread.start()
+        try:
+            while True:
+                job = get(forwarded)
+                if job is _DONE:
+                    return
+                if isinstance(job, _Failure):
+                    raise job.exc
+                results: List[LLMResult] = []
+                if job.model is not None:
+                    results = job.model.finalize_batch(
+                        job.prepared, job.outputs, decoding=job.decoding
+                    )
+                job.prepared, job.outputs = [], []
+                yield job, results
+        finally:
+            stop.set()
+            for thread in threads:
+                thread.join()
+
+
+__all__ = ["BatchJob", "PipelinedExecutor", "run_job"]
@@ -0,0 +1,190 @@
+"""Replay recorded inference logs to benchmark an inference backend."""
+from __future__ import annotations
+
+import json
+import math
+import platform
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+try:  # pragma: no cover - not available on Windows
+    import resource
+except ImportError:  # pragma: no cover
+    resource = None  # type: ignore
+
+from .base_inference import BaseInferenceModel
+from .replay_logger import ReplayRecord, iter_replay_records
+
+
+@dataclass
+class BatchBenchmarkResult:
+    """Metrics collected for a single batch size."""
+
+    batch_size: int
+    num_records: int
+    total_seconds: float
+    throughput: float
+    p50_latency_ms: float
+    p95_latency_ms: float
+    peak_rss_mb: float
+    label_agreement: float
+
+
+def _percentile(values: Sequence[float], pct: float) -> float:
+    """Nearest-rank percentile of ``values``."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def peak_rss_mb() -> float:
+    """Return the peak resident set size of this process in MiB.
+
+    The value never decreases during the life of a process, so compare batch
+    sizes by running each one in a fresh interpreter (see
+    ``scripts/replay_benchmark.py``).
+    """
+    if resource is None:
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ``ru_maxrss`` is reported in bytes on macOS and KiB elsewhere
+    divisor = 1024 * 1024 if platform.system() == "Darwin" else 1024
+    return peak / divisor
+
+
+class ReplayBenchmark:
+    """Replay :class:`ReplayRecord` entries against ``model``.
+
+    Each record is re-run from its stored ``context`` (falling back to the
+    recorded prompt for logs that predate context capture) and the new label
+    is compared with the recorded one.
+    """
+
+    def __init__(
+        self,
+        model: BaseInferenceModel,
+        records: Iterable[ReplayRecord],
+        *,
+        max_new_tokens: int = 32,
+        warmup: int = 1,
+    ) -> None:
+        self.model = model
+        self.records = list(records)
+        self.max_new_tokens = max_new_tokens
+        self.warmup = warmup
+
+    @classmethod
+    def from_log(
+        cls,
+        model: BaseInferenceModel,
+        path: str | Path,
+        limit: Optional[int] = None,
+        **kwargs: Any,
+    ) -> "ReplayBenchmark":
+        records: List[ReplayRecord] = []
+        for record in iter_replay_records(path):
+            if limit is not None and len(records) >= limit:
+                break
+            records.append(record)
+        return cls(model, records, **kwargs)
+
+    # ------------------------------------------------------------------
+    def _batches(self, batch_size: int) -> Iterator[List[ReplayRecord]]:
+        """Yield batches of at most ``batch_size`` records sharing a strategy."""
+        groups: Dict[str, List[ReplayRecord]] = {}
+        for record in self.records:
+            groups.setdefault(record.strategy or "zero-shot", []).append(record)
+        for records in groups.values():
+            for offset in range(0, len(records), batch_size):
+                yield records[offset : offset + batch_size]
+
+    def _run_batch(self, batch: Sequence[ReplayRecord]) -> List[str]:
+        strategies = {r.strategy or "zero-shot" for r in batch}
+        if len(strategies) != 1:
+            raise ValueError(f"batch mixes prompt strategies: {sorted(strategies)}")
+        (strategy,) = strategies
+        items = [
+            (r.context_id or f"replay_{i}", r.context or r.prompt)
+            for i, r in enumerate(batch)
+        ]
+        results = self.model.predict_batch(
+            items, strategy=strategy, max_new_tokens=self.max_new_tokens
+        )
+        return [r.predicted_label for r in results]
+
+    def run_batch_size(self, batch_size: int) -> BatchBenchmarkResult:
+        """Replay all records in batches of ``batch_size``.
+
+        Records are grouped by prompt strategy so that every batch is built
+        with the prompt it was recorded with.
+        """
+        if batch_size < 1:
+            raise ValueError("batch_size must be positive")
+        for record in self.records[: self.warmup]:
+            self._run_batch([record])
+
+        latencies: List[float] = []
+        matches = 0
+        compared = 0
+        start = time.perf_counter()
+        for batch in self._batches(batch_size):
+            t0 = time.perf_counter()
+            labels = self._run_batch(batch)
+            elapsed_ms = (time.perf_counter() - t0) * 1000
+            # every record in the batch waits for the whole batch
+            latencies.extend([elapsed_ms] * len(batch))
+            for record, label in zip(batch, labels):
+                if record.label:
+                    compared += 1
+                    matches += int(record.label == label)
+        total = time.perf_counter() - start
+
+        return BatchBenchmarkResult(
+            batch_size=batch_size,
+            num_records=len(self.records),
+            total_seconds=round(total, 4),
+            throughput=round(len(self.records) / total, 4) if total else 0.0,
+            p50_latency_ms=round(_percentile(latencies, 50), 3),
+            p95_latency_ms=round(_percentile(latencies, 95), 3),
+            peak_rss_mb=round(peak_rss_mb(), 1),
+            label_agreement=round(matches / compared, 4) if compared else 0.0,
+        )
+
+    def run(self, batch_sizes: Sequence[int] = (1,)) -> List[BatchBenchmarkResult]:
+        """Benchmark every size in ``batch_sizes`` in this process.
+
+        ``peak_rss_mb`` of later sizes includes the peaks of earlier ones.
+        """
+        return [self.run_batch_size(size) for size in batch_sizes]
+
+
+def write_report(
+    path: str | Path,
+    results: Sequence[BatchBenchmarkResult],
+    meta: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """Write a diff-friendly JSON report and return it as a dictionary."""
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            **(meta or {}),
+        },
+        "results": [asdict(r) for r in results],
+    }
+    out = Path(path)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+    return report
+
+
+__all__ = [
+    "BatchBenchmarkResult",
+    "ReplayBenchmark",
+    "peak_rss_mb",
+    "write_report",
+]
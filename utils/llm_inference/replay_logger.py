@@ -1,30 +1,261 @@
-"""Log prompts and outputs for later replay and analysis."""
+"""Log prompts and outputs for later replay and analysis.
+
+Records are buffered in memory and written by a background thread so that
+logging stays off the inference hot path. The active log is rotated once it
+grows beyond ``max_bytes`` and rotated segments can optionally be compressed
+with gzip or zstd (``zstandard`` must be installed for the latter).
+"""
 from __future__ import annotations
 
+import atexit
+import gzip
+import io
 import json
+import logging
+import random
+import shutil
+import threading
 from dataclasses import asdict, dataclass
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Iterator, List, Optional
+
+try:  # pragma: no cover - optional dependency
+    import zstandard
+except Exception:  # pragma: no cover - zstandard not installed
+    zstandard = None  # type: ignore
+
+_COMPRESSION_SUFFIXES = {"gzip": ".gz", "zstd": ".zst"}
+
+logger = logging.getLogger(__name__)
 
 
 @dataclass
 class ReplayRecord:
-    """Record stored in the replay log."""
+    """Record stored in the replay log.
+
+    ``context_id``, ``context``, ``strategy`` and ``label`` allow the record
+    to be replayed against another backend; they are empty for logs written
+    before they were introduced.
+    """
 
     prompt: str
     output: str
     metadata: Dict[str, Any]
+    context_id: str = ""
+    context: str = ""
+    strategy: str = ""
+    label: str = ""
 
 
 class PromptReplayLogger:
-    """Append inference records to a JSONL log file."""
+    """Buffered JSONL writer with rotation, compression and sampling.
+
+    Parameters
+    ----------
+    path:
+        Location of the active log file. Rotated segments are written next to
+        it as ``<stem>.<n>.jsonl[.gz|.zst]``.
+    buffer_size:
+        Number of buffered records that triggers an early flush.
+    flush_interval:
+        Seconds between periodic flushes of the background thread.
+    max_bytes:
+        Rotate the active file once it exceeds this size. ``None`` disables
+        rotation.
+    compression:
+        ``None``, ``"gzip"`` or ``"zstd"``; applied to rotated segments.
+    sample_rate:
+        Fraction of records to keep, so logging can remain enabled in
+        production runs.
+    max_segments:
+        Keep at most this many rotated segments, deleting the oldest.
+    """
+
+    def __init__(
+        self,
+        path: str | Path = "replay_log.jsonl",
+        *,
+        buffer_size: int = 256,
+        flush_interval: float = 2.0,
+        max_bytes: Optional[int] = 256 * 1024 * 1024,
+        compression: Optional[str] = None,
+        sample_rate: float = 1.0,
+        max_segments: Optional[int] = None,
+        seed: Optional[int] = None,
+    ) -> None:
+        if compression not in (None, "gzip", "zstd"):
+            raise ValueError(f"Unsupported compression: {compression}")
+        if compression == "zstd" and zstandard is None:
+            raise ImportError("zstd compression requires the 'zstandard' package")
+        if not 0.0 <= sample_rate <= 1.0:
+            raise ValueError("sample_rate must be between 0 and 1")
 
-    def __init__(self, path: str | Path = "replay_log.jsonl"):
         self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
         if not self.path.exists():
             self.path.touch()
+        self.buffer_size = buffer_size
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.compression = compression
+        self.sample_rate = sample_rate
+        self.max_segments = max_segments
+        self._rng = random.Random(seed)
 
+        self._buffer: List[str] = []
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._closed = False
+        self._thread = threading.Thread(
+            target=self._flush_loop, name="replay-log-flusher", daemon=True
+        )
+        self._thread.start()
+        atexit.register(self.close)
+
+    # ------------------------------------------------------------------
     def log(self, record: ReplayRecord) -> None:
-        with self.path.open("a", encoding="utf-8") as f:
-            json.dump(asdict(record), f)
-            f.write("\n")
+        """Buffer ``record`` for writing, subject to ``sample_rate``."""
+        if self._closed:
+            raise RuntimeError("PromptReplayLogger is closed")
+        if self.sample_rate < 1.0 and self._rng.random() >= self.sample_rate:
+            return
+        line = json.dumps(asdict(record), ensure_ascii=False)
+        with self._lock:
+            self._buffer.append(line)
+            full = len(self._buffer) >= self.buffer_size
+        if full:
+            self._wakeup.set()
+
+    def flush(self) -> None:
+        """Write all buffered records to disk.
+
+        The buffer is taken and written under one lock, so concurrent flushes
+        cannot reorder records. Records whose write fails are put back at the
+        front of the buffer before the error is raised.
+        """
+        with self._write_lock:
+            with self._lock:
+                lines, self._buffer = self._buffer, []
+            if not lines:
+                return
+            try:
+                with self.path.open("a", encoding="utf-8") as f:
+                    f.write("\n".join(lines) + "\n")
+            except BaseException:
+                with self._lock:
+                    self._buffer[:0] = lines
+                raise
+            max_bytes = self.max_bytes
+            if max_bytes is not None and self.path.stat().st_size >= max_bytes:
+                self._rotate()
+
+    def close(self) -> None:
+        """Stop the background thread and flush remaining records."""
+        if self._closed:
+            return
+        self._closed = True
+        self._wakeup.set()
+        self._thread.join()
+        self.flush()
+        atexit.unregister(self.close)
+
+    def __enter__(self) -> "PromptReplayLogger":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    # ------------------------------------------------------------------
+    def segments(self) -> List[Path]:
+        """Return rotated segments ordered from oldest to newest."""
+        return sorted(
+            self.path.parent.glob(f"{self.path.stem}.*{self.path.suffix}*"),
+            key=_segment_index,
+        )
+
+    def _flush_loop(self) -> None:
+        while not self._closed:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception:
+                # keep the thread alive; the records are retried on the next
+                # flush and ``close`` raises if they still cannot be written
+                logger.exception("Failed to write replay log %s", self.path)
+
+    def _rotate(self) -> None:
+        existing = self.segments()
+        index = _segment_index(existing[-1]) + 1 if existing else 1
+        target = self.path.with_name(f"{self.path.stem}.{index}{self.path.suffix}")
+        self.path.rename(target)
+        self.path.touch()
+        if self.compression:
+            compressed = target.with_name(
+                target.name + _COMPRESSION_SUFFIXES[self.compression]
+            )
+            with target.open("rb") as src, _open_compressed(
+                compressed, "wb", self.compression
+            ) as dst:
+                shutil.copyfileobj(src, dst)
+            target.unlink()
+        if self.max_segments is not None:
+            segments = self.segments()
+            for old in segments[: max(0, len(segments) - self.max_segments)]:
+                old.unlink()
+
+
+# ---------------------------------------------------------------------------
+# Reading helpers
+
+
+def _segment_index(path: Path) -> int:
+    # ``<stem>.<n>.jsonl[.gz|.zst]`` -> n
+    name = path.name
+    for suffix in _COMPRESSION_SUFFIXES.values():
+        if name.endswith(suffix):
+            name = name[: -len(suffix)]
+    parts = name.split(".")
+    try:
+        return int(parts[-2])
+    except (IndexError, ValueError):
+        return 0
+
+
+def _open_compressed(path: Path, mode: str, compression: Optional[str]):
+    if compression == "gzip":
+        return gzip.open(path, mode)
+    if compression == "zstd":
+        if zstandard is None:
+            raise ImportError("reading zstd logs requires the 'zstandard' package")
+        if "w" in mode:
+            return zstandard.ZstdCompressor().stream_writer(path.open("wb"))
+        return zstandard.ZstdDecompressor().stream_reader(path.open("rb"))
+    return path.open(mode)
+
+
+def _compression_for(path: Path) -> Optional[str]:
+    for name, suffix in _COMPRESSION_SUFFIXES.items():
+        if path.name.endswith(suffix):
+            return name
+    return None
+
+
+def iter_replay_records(path: str | Path) -> Iterator[ReplayRecord]:
+    """Yield records from a replay log, including its rotated segments.
+
+    ``path`` is the active log file; rotated (and possibly compressed)
+    segments are read first, in rotation order.
+    """
+    path = Path(path)
+    files = sorted(
+        path.parent.glob(f"{path.stem}.*{path.suffix}*"), key=_segment_index
+    )
+    if path.exists():
+        files.append(path)
+    for file in files:
+        with _open_compressed(file, "rb", _compression_for(file)) as raw:
+            for line in io.TextIOWrapper(raw, encoding="utf-8"):
+                if line.strip():
+                    yield ReplayRecord(**json.loads(line))
@@ -0,0 +1,140 @@
+"""Per-machine runtime profiles for CPU inference.
+
+A profile records the torch threading settings, batch size and dtype that
+gave the best throughput on a given machine. Profiles are stored
+in a single JSON file keyed by a hardware fingerprint, so one file can serve
+several node types.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import platform
+from dataclasses import asdict, dataclass, field, fields
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import torch
+
+from config.path_config import RUNTIME_PROFILE_PATH
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RuntimeProfile:
+    """Tuned execution parameters for one machine."""
+
+    intra_op_threads: int
+    inter_op_threads: int
+    batch_size: int = 1
+    dtype: str = "float32"
+    tokens_per_sec: float = 0.0
+    peak_rss_mb: float = 0.0
+    hardware: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def torch_dtype(self) -> torch.dtype:
+        return getattr(torch, self.dtype)
+
+
+def _cpu_model() -> str:
+    try:
+        with open("/proc/cpuinfo", "r", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("model name"):
+                    return line.split(":", 1)[1].strip()
+    except OSError:
+        pass
+    return platform.processor()
+
+
+def hardware_info() -> Dict[str, Any]:
+    """Describe the machine a profile was tuned on."""
+    return {
+        "machine": platform.machine(),
+        "cpu": _cpu_model(),
+        "cpu_count": os.cpu_count() or 1,
+        "torch": torch.__version__.split("+")[0],
+    }
+
+
+def hardware_fingerprint(info: Optional[Dict[str, Any]] = None) -> str:
+    """Return a short stable hash of :func:`hardware_info`."""
+    payload = json.dumps(info or hardware_info(), sort_keys=True)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def save_runtime_profile(
+    profile: RuntimeProfile, path: str | Path = RUNTIME_PROFILE_PATH
+) -> Path:
+    """Store ``profile`` under the fingerprint of its hardware."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    profiles: Dict[str, Any] = {}
+    if path.exists():
+        profiles = json.loads(path.read_text(encoding="utf-8"))
+    if not profile.hardware:
+        profile.hardware = hardware_info()
+    profiles[hardware_fingerprint(profile.hardware)] = asdict(profile)
+    path.write_text(json.dumps(profiles, indent=2, sort_keys=True), encoding="utf-8")
+    return path
+
+
+def load_runtime_profile(
+    path: str | Path = RUNTIME_PROFILE_PATH,
+) -> Optional[RuntimeProfile]:
+    """Return the profile tuned on this hardware, if any."""
+    path = Path(path)
+    if not path.exists():
+        return None
+    try:
+        profiles = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        logger.warning("Ignoring unreadable runtime profile %s", path)
+        return None
+    entry = profiles.get(hardware_fingerprint())
+    if not entry:
+        return None
+    # profiles written by older versions may carry fields since removed
+    known = {f.name for f in fields(RuntimeProfile)}
+    return RuntimeProfile(**{k: v for k, v in entry.items() if k in known})
+
+
+def load_cpu_runtime_profile(
+    path: str | Path = RUNTIME_PROFILE_PATH,
+) -> Optional[RuntimeProfile]:
+    """Like :func:`load_runtime_profile`, but ``None`` when a GPU is available.
+
+    Profiles are tuned for CPU inference and do not apply on GPU machines.
+    """
+    if torch.cuda.is_available():
+        return None
+    return load_runtime_profile(path)
+
+
+def apply_runtime_profile(profile: RuntimeProfile) -> None:
+    """Apply the torch threading settings from ``profile``."""
+    torch.set_num_threads(profile.intra_op_threads)
+    if torch.get_num_interop_threads() != profile.inter_op_threads:
+        try:
+            torch.set_num_interop_threads(profile.inter_op_threads)
+        except RuntimeError:
+            # inter-op threads can only be set before parallel work starts
+            logger.warning(
+                "Could not set inter-op threads to %d; already initialised",
+                profile.inter_op_threads,
+            )
+
+
+__all__ = [
+    "RuntimeProfile",
+    "apply_runtime_profile",
+    "hardware_fingerprint",
+    "hardware_info",
+    "load_cpu_runtime_profile",
+    "load_runtime_profile",
+    "save_runtime_profile",
+]
@@ -0,0 +1,169 @@
+"""Deadline-aware scheduling of contexts for inference.
+
+Runs with a hard wall-clock limit should spend their time on the contexts
+most likely to cite a dataset. :func:`context_priority` orders contexts and
+:class:`DeadlineScheduler` picks, batch by batch, the most thorough
+:class:`ScheduleMode` that can still finish the remaining contexts in time,
+based on the per-context latency measured so far in each mode.
+"""
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Callable, Dict, List, Mapping, Sequence
+
+# Dataset citations are mostly found in the body; title and abstract rarely
+# carry identifiers.
+SECTION_PRIORITY: Dict[str, float] = {
+    "body": 0.5,
+    "intro": 0.25,
+    "abstract": 0.25,
+    "title": 0.0,
+}
+MENTION_PRIORITY = 2.0
+# Share of a deadline held back for the re-ask pass when no re-ask budget
+# is given.
+REASK_SHARE = 0.2
+
+
+def context_priority(
+    record: Any, section_priority: Mapping[str, float] = SECTION_PRIORITY
+) -> float:
+    """Score ``record`` from its importance, mentions and section.
+
+    ``record`` is a :class:`~utils.context_builder.records.ContextRecord` or
+    any object with ``importance_score``, ``mentions`` and ``section``.
+    Contexts with identifier mentions always come first.
+    """
+    score = record.importance_score + section_priority.get(record.section, 0.0)
+    if record.mentions:
+        score += MENTION_PRIORITY
+    return score
+
+
+def order_by_priority(records: Sequence[Any]) -> List[Any]:
+    """Return ``records`` by descending :func:`context_priority` (stable)."""
+    return sorted(records, key=context_priority, reverse=True)
+
+
+class ScheduleMode(str, Enum):
+    """Processing modes, from most thorough to cheapest."""
+
+    FULL = "full"
+    NO_REASK = "no_reask"
+    LOGIT_ONLY = "logit_only"
+    FALLBACK = "fallback"
+    SKIP = "skip"
+
+
+_DEGRADATION = [
+    ScheduleMode.FULL,
+    ScheduleMode.NO_REASK,
+    ScheduleMode.LOGIT_ONLY,
+    ScheduleMode.FALLBACK,
+]
+
+
+@dataclass
+class DeadlineScheduler:
+    """Choose a :class:`ScheduleMode` per batch to meet a time budget.
+
+    The thread that consumes finished batches drives the scheduler: call
+    :meth:`begin` when inference starts and, after each finished batch,
+    :meth:`record` followed by :meth:`next_mode`. The time between finished
+    batches is attributed to the batch, which also holds when later batches
+    are prepared ahead on other threads; those only read :attr:`current_mode`.
+
+    A mode is kept while the unfinished contexts, at its measured latency
+    times ``safety``, fit in the time left; otherwise the scheduler degrades
+    to the next mode and never returns. A mode that has not been measured yet
+    is assumed to fit. Once the budget is spent every remaining batch is
+    :attr:`ScheduleMode.SKIP`. ``has_fallback=False`` removes
+    :attr:`ScheduleMode.FALLBACK`.
+
+    Re-asking runs after inference, so it is not part of the measured
+    latencies. Instead, :attr:`ScheduleMode.FULL` must leave
+    ``reask_reserve_s`` of the budget unused for the re-ask pass.
+    :attr:`ScheduleMode.NO_REASK` releases that reserve to inference.
+    """
+
+    budget_s: float
+    safety: float = 1.2
+    has_fallback: bool = True
+    reask_reserve_s: float = 0.0
+    clock: Callable[[], float] = time.monotonic
+    mode: ScheduleMode = ScheduleMode.FULL
+    seconds: Dict[ScheduleMode, float] = field(default_factory=dict)
+    contexts: Dict[ScheduleMode, int] = field(default_factory=dict)
+
+    def __post_init__(self) -> None:
+        self.start = self.clock()
+        self._modes = [
+            m for m in _DEGRADATION if self.has_fallback or m != ScheduleMode.FALLBACK
+        ]
+        self._last = self.start
+
+    @property
+    def elapsed(self) -> float:
+        return self.clock() - self.start
+
+    @property
+    def time_left(self) -> float:
+        return self.budget_s - self.elapsed
+
+    @property
+    def current_mode(self) -> ScheduleMode:
+        """Mode for a batch prepared now; safe to read from any thread."""
+        return ScheduleMode.SKIP if self.time_left <= 0 else self.mode
+
+    def latency(self, mode: ScheduleMode) -> float | None:
+        """Measured seconds per context in ``mode``, if it has been used."""
+        count = self.contexts.get(mode, 0)
+        return self.seconds[mode] / count if count else None
+
+    def begin(self) -> None:
+        """Start timing the first batch."""
+        self._last = self.clock()
+
+    def record(self, mode: ScheduleMode, contexts: int) -> None:
+        """Attribute the time since the previous batch to ``contexts`` in ``mode``."""
+        now = self.clock()
+        if mode != ScheduleMode.SKIP and contexts:
+            self.seconds[mode] = self.seconds.get(mode, 0.0) + now - self._last
+            self.contexts[mode] = self.contexts.get(mode, 0) + contexts
+        self._last = now
+
+    def next_mode(self, remaining: int) -> ScheduleMode:
+        """Update and return the mode, with ``remaining`` contexts unfinished."""
+        if self.mode == ScheduleMode.SKIP:
+            return self.mode
+        time_left = self.time_left
+        if time_left <= 0:
+            self.mode = ScheduleMode.SKIP
+            return self.mode
+        index = self._modes.index(self.mode)
+        while index < len(self._modes) - 1 and not self._fits(
+            self._modes[index], remaining, time_left
+        ):
+            index += 1
+        self.mode = self._modes[index]
+        return self.mode
+
+    def _fits(self, mode: ScheduleMode, remaining: int, time_left: float) -> bool:
+        if mode == ScheduleMode.FULL:
+            time_left -= self.reask_reserve_s
+            if time_left <= 0:
+                return False
+        latency = self.latency(mode)
+        return latency is None or remaining * latency * self.safety <= time_left
+
+
+__all__ = [
+    "DeadlineScheduler",
+    "REASK_SHARE",
+    "ScheduleMode",
+    "SECTION_PRIORITY",
+    "context_priority",
+    "order_by_priority",
+]
@@ -0,0 +1,86 @@
+"""Deterministic stub backend for running the pipeline without model weights."""
+from __future__ import annotations
+
+import hashlib
+import time
+from typing import Any, List, Sequence
+
+from .base_inference import BaseInferenceModel, RawGeneration
+
+
+class _SparseScores(dict):
+    """Vocabulary score vector that is zero everywhere except label tokens."""
+
+    def __missing__(self, key: int) -> float:
+        return 0.0
+
+
+class StubInferenceModel(BaseInferenceModel):
+    """Inference model returning content-hash derived labels and logits.
+
+    The same prompt always yields the same label and logits, so runs are
+    reproducible. Output still flows through :class:`LLMOutputDecoder` and
+    :class:`InferenceValidator`, which makes the stub suitable for profiling
+    the pipeline's non-model overhead. ``latency_ms`` simulates model time per
+    call.
+    """
+
+    def __init__(
+        self,
+        model_path: str = "stub",
+        latency_ms: float = 0.0,
+        seed: int = 0,
+        **kwargs: Any,
+    ) -> None:
+        self.latency_ms = latency_ms
+        self.seed = seed
+        super().__init__(model_path=model_path, **kwargs)
+
+    def load_model(self) -> None:
+        self.tokenizer = None
+        self.engine = None
+
+    def encode(self, prompt: str) -> str:
+        return prompt
+
+    def decode_tokens(self, tokens: str) -> str:
+        return tokens
+
+    def generate_from_inputs(
+        self,
+        prompt: str,
+        temperature: float = 0.0,
+        max_new_tokens: int = 32,
+    ) -> RawGeneration:
+        digest = hashlib.sha256(f"{self.seed}:{prompt}".encode("utf-8")).digest()
+        labels = self.decoder.labels
+        label = labels[digest[0] % len(labels)]
+
+        scores = _SparseScores()
+        token_id = self.decoder.logit_decoder._token_id
+        for i, lbl in enumerate(labels):
+            # map one digest byte to a logit in [-2, 2]
+            logit = digest[i + 1] / 255 * 4 - 2
+            if lbl == label:
+                logit += 4.0
+            scores[token_id(lbl)] = logit
+
+        if self.latency_ms > 0:
+            time.sleep(self.latency_ms / 1000)
+        return RawGeneration(label, [scores])
+
+    def generate_batch_from_inputs(
+        self,
+        inputs: Sequence[str],
+        temperature: float = 0.0,
+        max_new_tokens: int = 32,
+    ) -> List[RawGeneration]:
+        return [
+            self.generate_from_inputs(
+                prompt, temperature=temperature, max_new_tokens=max_new_tokens
+            )
+            for prompt in inputs
+        ]
+
+
+__all__ = ["StubInferenceModel"]
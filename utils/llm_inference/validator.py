@@ -1,7 +1,7 @@
 """Validation utilities for LLaMA3 inference results."""
 from __future__ import annotations
 
-from typing import Dict, Iterable
+from typing import Any, Iterable, Mapping
 
 LABELS = {"primary", "secondary", "none"}
 
@@ -9,8 +9,12 @@ LABELS = {"primary", "secondary", "none"}
 class InferenceValidator:
     """Simple validator ensuring outputs are well-formed."""
 
-    def validate(self, result: Dict[str, object]) -> None:
-        label = result.get("predicted_label")
+    def validate(self, result: Mapping[str, Any] | Any) -> None:
+        """Check a result object, or its ``asdict`` mapping."""
+        if isinstance(result, Mapping):
+            label = result.get("predicted_label")
+        else:
+            label = getattr(result, "predicted_label", None)
         if label not in LABELS:
             raise ValueError(f"Invalid label: {label}")
 
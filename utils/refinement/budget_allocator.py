@@ -0,0 +1,145 @@
+"""Spend a corpus-wide re-ask budget where it is most likely to help."""
+
+from __future__ import annotations
+
+import heapq
+import math
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Literal, Optional, Tuple
+
+from utils.llm_inference import LLMResult
+
+GainCriterion = Literal["margin", "confidence"]
+
+
+def expected_gain(result: LLMResult, criterion: GainCriterion = "margin") -> float:
+    """Score how much re-asking ``result`` is likely to help, in ``[0, 1]``.
+
+    ``"margin"`` uses one minus the gap between the two most probable
+    labels (from ``result.logits``); ``"confidence"`` uses one minus the
+    confidence. Results without logits fall back to the confidence.
+    """
+    if criterion == "margin" and len(result.logits) >= 2:
+        top = max(result.logits.values())
+        weights = sorted(
+            (math.exp(v - top) for v in result.logits.values()), reverse=True
+        )
+        return 1.0 - (weights[0] - weights[1]) / sum(weights)
+    return 1.0 - result.confidence
+
+
+@dataclass(slots=True)
+class SkippedReask:
+    """A context that was not re-asked, and why."""
+
+    context_id: str
+    gain: float
+    estimated_tokens: int
+    reason: str
+
+
+@dataclass
+class ReaskBudgetAllocator:
+    """Hand out contexts for re-asking by expected gain within a budget.
+
+    Contexts are pushed with their first-pass result and popped by
+    :meth:`next_batch` in order of :func:`expected_gain`. A context costs
+    an estimated ``token_count + question_tokens`` tokens per re-ask. Each
+    context in a batch is granted up to ``questions_per_context`` re-asks,
+    fewer if the rest of ``token_budget`` cannot pay for them; callers must
+    ask at most :meth:`reask_cap` questions, so the budget is a hard limit,
+    and report the re-asks actually run with :meth:`record`, which returns
+    unused reservations to the budget.
+
+    A context that does not fit behind the batch's reservations waits for
+    the next batch; it is skipped only when not even one re-ask fits the
+    unreserved budget. Once ``time_budget_s`` has passed since the first
+    batch, everything left is skipped. Skipped contexts are kept in
+    :attr:`skipped`.
+    """
+
+    token_budget: Optional[int] = None
+    time_budget_s: Optional[float] = None
+    criterion: GainCriterion = "margin"
+    questions_per_context: int = 8
+    question_tokens: int = 32
+    clock: Callable[[], float] = time.monotonic
+    spent_tokens: int = 0
+    skipped: List[SkippedReask] = field(default_factory=list)
+
+    def __post_init__(self) -> None:
+        self._heap: List[Tuple[float, int, str]] = []
+        self._reask_tokens: Dict[str, int] = {}
+        self._caps: Dict[str, int] = {}
+        self._deadline: Optional[float] = None
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def push(self, result: LLMResult, token_count: int) -> float:
+        """Queue ``result``'s context (of ``token_count`` tokens); return its gain."""
+        gain = expected_gain(result, self.criterion)
+        self._reask_tokens[result.context_id] = token_count + self.question_tokens
+        order = len(self._reask_tokens)  # ties keep push order
+        heapq.heappush(self._heap, (-gain, order, result.context_id))
+        return gain
+
+    def estimated_tokens(self, context_id: str) -> int:
+        return self._reask_tokens[context_id] * self.questions_per_context
+
+    def reask_cap(self, context_id: str) -> int:
+        """Re-asks granted to ``context_id`` by :meth:`next_batch`."""
+        return self._caps.get(context_id, self.questions_per_context)
+
+    def next_batch(self, size: int) -> List[str]:
+        """Pop up to ``size`` context ids that fit the remaining budget."""
+        now = self.clock()
+        if self._deadline is None and self.time_budget_s is not None:
+            self._deadline = now + self.time_budget_s
+        if self._deadline is not None and now >= self._deadline:
+            self._skip_rest("time budget spent")
+            return []
+
+        batch: List[str] = []
+        reserved = self.spent_tokens
+        while self._heap and len(batch) < size:
+            neg_gain, order, context_id = heapq.heappop(self._heap)
+            per_reask = self._reask_tokens[context_id]
+            cap = self.questions_per_context
+            if self.token_budget is not None:
+                cap = min(cap, (self.token_budget - reserved) // per_reask)
+            if cap < 1:
+                if batch:
+                    # may fit once the batch has reported its real spend
+                    heapq.heappush(self._heap, (neg_gain, order, context_id))
+                    break
+                self.skipped.append(
+                    SkippedReask(
+                        context_id,
+                        -neg_gain,
+                        self.estimated_tokens(context_id),
+                        "token budget",
+                    )
+                )
+                continue
+            self._caps[context_id] = cap
+            reserved += cap * per_reask
+            batch.append(context_id)
+        return batch
+
+    def record(self, context_id: str, reasks: int) -> None:
+        """Charge ``reasks`` re-asks of ``context_id`` against the budget."""
+        self.spent_tokens += reasks * self._reask_tokens[context_id]
+
+    def _skip_rest(self, reason: str) -> None:
+        while self._heap:
+            neg_gain, _, context_id = heapq.heappop(self._heap)
+            self.skipped.append(
+                SkippedReask(
+                    context_id, -neg_gain, self.estimated_tokens(context_id), reason
+                )
+            )
+
+
+__all__ = ["GainCriterion", "ReaskBudgetAllocator", "SkippedReask", "expected_gain"]
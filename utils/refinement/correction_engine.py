@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+from typing import List, Sequence, Tuple
+
 from utils.llm_inference import LLaMA3Inference, LLMResult
 
 
@@ -15,3 +17,14 @@ class CorrectionEngine:
         """Run inference on the constructed prompt."""
 
         return self.inference.infer(context_id=context_id, context=prompt)
+
+    def run_batch(self, items: Sequence[Tuple[str, str]]) -> List[LLMResult]:
+        """Run inference on ``(context_id, prompt)`` pairs.
+
+        Uses the backend's ``predict_batch`` when it has one.
+        """
+
+        predict_batch = getattr(self.inference, "predict_batch", None)
+        if predict_batch is not None:
+            return predict_batch(list(items))
+        return [self.run(context_id, prompt) for context_id, prompt in items]
@@ -0,0 +1,108 @@
+"""Rank self-questions by the gain they are expected to bring."""
+
+from __future__ import annotations
+
+import json
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from .schema import SelfQuestionItem
+
+
+class QuestionRanker:
+    """Order questions by their expected gain.
+
+    Rates are learned from logged :class:`CorrectionProposal` records that
+    carry ``question_type`` in their metadata. :meth:`score` is the rate of
+    a ``(question_type, original_label)`` pair, shrunk towards the rate of
+    its ``question_type`` and that towards the overall rate, each with
+    ``smoothing`` pseudo-observations. :meth:`expected_gain` refines it per
+    question with the focus keyword's own acceptance rate and weight in the
+    context. Without history questions are ordered by focus weight.
+    """
+
+    def __init__(self, smoothing: float = 2.0) -> None:
+        self.smoothing = smoothing
+        self._asked: Dict[Tuple[str, ...], int] = defaultdict(int)
+        self._accepted: Dict[Tuple[str, ...], int] = defaultdict(int)
+        self._focus_asked: Dict[str, int] = defaultdict(int)
+        self._focus_accepted: Dict[str, int] = defaultdict(int)
+
+    def fit(self, proposals: Iterable[Mapping]) -> "QuestionRanker":
+        """Count acceptances from proposal dicts; returns ``self``.
+
+        Proposals logged without ``question_type`` are ignored.
+        """
+        for proposal in proposals:
+            metadata = proposal.get("metadata") or {}
+            qtype = metadata.get("question_type")
+            if not qtype:
+                continue
+            accepted = bool(proposal.get("accepted"))
+            label = proposal.get("original_label", "")
+            for key in ((), (qtype,), (qtype, label)):
+                self._asked[key] += 1
+                self._accepted[key] += accepted
+            focus = metadata.get("focus")
+            if focus:
+                self._focus_asked[focus] += 1
+                self._focus_accepted[focus] += accepted
+        return self
+
+    @classmethod
+    def from_corrections(
+        cls, paths: str | Path | Sequence[str | Path], smoothing: float = 2.0
+    ) -> "QuestionRanker":
+        """Fit a ranker on one or more ``corrections*.jsonl`` logs."""
+        if isinstance(paths, (str, Path)):
+            paths = [paths]
+        ranker = cls(smoothing)
+        for path in paths:
+            with Path(path).open("r", encoding="utf-8") as fh:
+                ranker.fit(json.loads(line) for line in fh if line.strip())
+        return ranker
+
+    def _rate(self, key: Tuple[str, ...], prior: float) -> float:
+        asked = self._asked.get(key, 0)
+        accepted = self._accepted.get(key, 0)
+        return (accepted + self.smoothing * prior) / (asked + self.smoothing)
+
+    def score(self, question_type: str, original_label: str = "") -> float:
+        """Estimated probability that such a question flips the label."""
+        overall = self._rate((), 0.5)
+        by_type = self._rate((question_type,), overall)
+        return self._rate((question_type, original_label), by_type)
+
+    def focus_lift(self, focus: str) -> float:
+        """How much more often than average questions about ``focus`` flip."""
+        overall = self._rate((), 0.5)
+        asked = self._focus_asked.get(focus, 0)
+        if not asked or overall <= 0:
+            return 1.0
+        accepted = self._focus_accepted.get(focus, 0)
+        rate = (accepted + self.smoothing * overall) / (asked + self.smoothing)
+        return rate / overall
+
+    def expected_gain(self, question: SelfQuestionItem) -> float:
+        """Expected confidence gained by asking ``question``.
+
+        The probability that it flips the label (:meth:`score` scaled by
+        :meth:`focus_lift`) times the weight of its focus keyword and the
+        room left above the current confidence.
+        """
+        flip = self.score(
+            question.question_type, question.source.get("original_prediction", "")
+        )
+        flip = min(1.0, flip * self.focus_lift(question.focus))
+        return flip * question.focus_weight * (1.0 - question.confidence_level)
+
+    def rank(
+        self, questions: Sequence[SelfQuestionItem], top_n: Optional[int] = None
+    ) -> List[SelfQuestionItem]:
+        """Return ``questions`` best first (stable), keeping at most ``top_n``."""
+        ranked = sorted(questions, key=lambda q: -self.expected_gain(q))
+        return ranked if top_n is None else ranked[:top_n]
+
+
+__all__ = ["QuestionRanker"]
@@ -1,36 +1,137 @@
 from __future__ import annotations
 
-from typing import Dict, List
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
 
 from utils.llm_inference import LLMResult
 
 from .self_questioner import SelfQuestioner
 from .self_corrector import SelfCorrector
-from .schema import CorrectionProposal
+from .schema import CorrectionProposal, RefinementStats, SelfQuestionItem
 
 
 class RefinementEngine:
-    """Coordinate self-questioning and correction steps."""
+    """Coordinate self-questioning and correction steps.
+
+    With ``stop_on_accept`` no further questions are asked for a context
+    once one of its proposals is accepted; ``max_reasks`` caps the number of
+    questions asked per context. Questions that were not asked are counted
+    in :attr:`stats`.
+    """
 
     def __init__(
         self,
         questioner: SelfQuestioner | None = None,
         corrector: SelfCorrector | None = None,
+        stop_on_accept: bool = False,
+        max_reasks: int | None = None,
     ) -> None:
         self.questioner = questioner or SelfQuestioner()
         self.corrector = corrector or SelfCorrector()
+        self.stop_on_accept = stop_on_accept
+        self.max_reasks = max_reasks
+        self.stats = RefinementStats()
+
+    def _questions(
+        self,
+        context_unit: Dict,
+        original_pred: LLMResult,
+        limit: Optional[int] = None,
+    ) -> List[SelfQuestionItem]:
+        # questions are ranked by the room left above this confidence
+        context_unit = {**context_unit, "confidence": original_pred.confidence}
+        questions = self.questioner.generate(
+            context_unit, original_pred.predicted_label
+        )
+        self.stats.contexts += 1
+        self.stats.questions += len(questions)
+        if self.max_reasks is not None:
+            limit = self.max_reasks if limit is None else min(limit, self.max_reasks)
+        if limit is not None and len(questions) > limit:
+            self.stats.skipped_over_limit += len(questions) - limit
+            questions = questions[:limit]
+        return questions
+
+    def _record(self, proposal: CorrectionProposal) -> None:
+        self.stats.reasks += 1
+        self.stats.accepted += proposal.accepted
+
+    def iter_proposals(
+        self, context_unit: Dict, original_pred: LLMResult
+    ) -> Iterator[CorrectionProposal]:
+        """Yield proposals one re-ask at a time.
+
+        Each question is only re-asked when the next proposal is requested,
+        so a caller can stop as soon as it has what it needs; questions left
+        when the generator is closed are counted as skipped.
+        """
+
+        questions = self._questions(context_unit, original_pred)
+        asked = 0
+        try:
+            for question in questions:
+                proposal = self.corrector.correct(context_unit, question, original_pred)
+                asked += 1
+                self._record(proposal)
+                yield proposal
+                if proposal.accepted and self.stop_on_accept:
+                    break
+        finally:
+            self.stats.skipped_early += len(questions) - asked
 
     def run(
         self, context_unit: Dict, original_pred: LLMResult
     ) -> List[CorrectionProposal]:
         """Generate questions and attempt corrections."""
 
-        proposals: List[CorrectionProposal] = []
-        questions = self.questioner.generate(
-            context_unit, original_pred.predicted_label
+        return list(self.iter_proposals(context_unit, original_pred))
+
+    def run_batch(
+        self,
+        items: Sequence[Tuple[Dict, LLMResult]],
+        batch_size: int = 32,
+        limits: Optional[Sequence[int]] = None,
+    ) -> List[List[CorrectionProposal]]:
+        """Refine many ``(context_unit, original_pred)`` pairs at once.
+
+        Re-ask prompts are run through :meth:`SelfCorrector.correct_batch`.
+        Without ``stop_on_accept`` every question is asked in one pass;
+        with it, contexts advance one question per round and drop out once
+        a proposal is accepted. ``limits`` caps the questions of each item
+        on top of ``max_reasks``. Returns one proposal list per item, in
+        question order as :meth:`run` would.
+        """
+
+        if limits is None:
+            limits = [None] * len(items)
+        questions = [
+            self._questions(ctx, pred, limit)
+            for (ctx, pred), limit in zip(items, limits)
+        ]
+        proposals: List[List[CorrectionProposal]] = [[] for _ in items]
+        asked = [0] * len(items)
+        active = [i for i, qs in enumerate(questions) if qs]
+        while active:
+            requests = []
+            owners: List[int] = []
+            for i in active:
+                take = 1 if self.stop_on_accept else len(questions[i])
+                context_unit, original_pred = items[i]
+                for question in questions[i][asked[i] : asked[i] + take]:
+                    requests.append((context_unit, question, original_pred))
+                    owners.append(i)
+                asked[i] += take
+            for owner, proposal in zip(
+                owners, self.corrector.correct_batch(requests, batch_size)
+            ):
+                self._record(proposal)
+                proposals[owner].append(proposal)
+            active = [
+                i
+                for i in active
+                if asked[i] < len(questions[i])
+                and not (self.stop_on_accept and proposals[i][-1].accepted)
+            ]
+        self.stats.skipped_early += sum(
+            len(qs) - len(ps) for qs, ps in zip(questions, proposals)
         )
-        for question in questions:
-            proposals.append(
-                self.corrector.correct(context_unit, question, original_pred)
-            )
         return proposals
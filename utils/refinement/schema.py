@@ -2,9 +2,13 @@ from dataclasses import dataclass
 from typing import Dict
 
 
-@dataclass
+@dataclass(slots=True)
 class SelfQuestionItem:
-    """Structured representation of a self-generated question."""
+    """Structured representation of a self-generated question.
+
+    ``focus`` is the keyword the question asks about and ``focus_weight``
+    its share of the context's focus keywords.
+    """
 
     context_id: str
     question_id: str
@@ -12,9 +16,11 @@ class SelfQuestionItem:
     question_type: str
     confidence_level: float
     source: Dict[str, str]
+    focus: str = ""
+    focus_weight: float = 1.0
 
 
-@dataclass
+@dataclass(slots=True)
 class CorrectionProposal:
     """Structured output describing a correction attempt."""
 
@@ -30,7 +36,7 @@ class CorrectionProposal:
     metadata: Dict[str, str | float] | None = None
 
 
-@dataclass
+@dataclass(slots=True)
 class CorrectionDelta:
     """Difference metrics between original and corrected prediction."""
 
@@ -42,3 +48,24 @@ class CorrectionDelta:
     @property
     def confidence_delta(self) -> float:  # pragma: no cover - simple property
         return self.corrected_confidence - self.original_confidence
+
+
+@dataclass(slots=True)
+class RefinementStats:
+    """Counters accumulated by :class:`RefinementEngine` across contexts.
+
+    ``skipped_early`` counts questions dropped after an accepted proposal
+    (or because the caller stopped early); ``skipped_over_limit`` those
+    beyond ``max_reasks``.
+    """
+
+    contexts: int = 0
+    questions: int = 0
+    reasks: int = 0
+    accepted: int = 0
+    skipped_early: int = 0
+    skipped_over_limit: int = 0
+
+    @property
+    def skipped(self) -> int:
+        return self.skipped_early + self.skipped_over_limit
@@ -2,7 +2,7 @@
 
 from __future__ import annotations
 
-from typing import Dict
+from typing import Dict, List, Sequence, Tuple
 
 from utils.llm_inference import LLMResult
 
@@ -28,19 +28,23 @@ class SelfCorrector:
         self.detector = detector or ChangeDetector()
         self.logger = logger
 
-    def correct(
+    def build_prompt(self, context_unit: Dict, self_question: SelfQuestionItem) -> str:
+        """Render the re-ask prompt for ``self_question``."""
+
+        return self.prompt_generator.build(
+            context=context_unit.get("text", ""),
+            question=self_question.question_text,
+        )
+
+    def evaluate(
         self,
-        context_unit: Dict,
         self_question: SelfQuestionItem,
         original_pred: LLMResult,
+        result: LLMResult,
+        prompt: str,
     ) -> CorrectionProposal:
-        """Run the correction flow for a single question."""
+        """Turn the re-ask ``result`` into a proposal and log it."""
 
-        context_text = context_unit.get("text", "")
-        prompt = self.prompt_generator.build(
-            context=context_text, question=self_question.question_text
-        )
-        result = self.engine.run(context_id=self_question.context_id, prompt=prompt)
         accepted, reason = self.detector.evaluate(
             original_label=original_pred.predicted_label,
             original_confidence=original_pred.confidence,
@@ -52,6 +56,8 @@ class SelfCorrector:
             "corrected_confidence": result.confidence,
             "reask_prompt": prompt,
             "raw_response": getattr(result, "raw_output", ""),
+            "question_type": self_question.question_type,
+            "focus": self_question.focus,
         }
         proposal = CorrectionProposal(
             context_id=self_question.context_id,
@@ -68,3 +74,41 @@ class SelfCorrector:
         if self.logger:
             self.logger.log(proposal)
         return proposal
+
+    def correct(
+        self,
+        context_unit: Dict,
+        self_question: SelfQuestionItem,
+        original_pred: LLMResult,
+    ) -> CorrectionProposal:
+        """Run the correction flow for a single question."""
+
+        prompt = self.build_prompt(context_unit, self_question)
+        result = self.engine.run(context_id=self_question.context_id, prompt=prompt)
+        return self.evaluate(self_question, original_pred, result, prompt)
+
+    def correct_batch(
+        self,
+        requests: Sequence[Tuple[Dict, SelfQuestionItem, LLMResult]],
+        batch_size: int = 32,
+    ) -> List[CorrectionProposal]:
+        """Run the correction flow for ``(context, question, prediction)`` triples.
+
+        Re-ask prompts are sent to the engine ``batch_size`` at a time and
+        proposals are returned in request order.
+        """
+
+        prompts = [self.build_prompt(ctx, question) for ctx, question, _ in requests]
+        calls = [
+            (question.context_id, prompt)
+            for (_, question, _), prompt in zip(requests, prompts)
+        ]
+        results: List[LLMResult] = []
+        for start in range(0, len(calls), batch_size):
+            results.extend(self.engine.run_batch(calls[start : start + batch_size]))
+        return [
+            self.evaluate(question, original, result, prompt)
+            for (_, question, original), result, prompt in zip(
+                requests, results, prompts
+            )
+        ]
@@ -1,24 +1,58 @@
-import uuid
-from typing import Dict, List
+import hashlib
+import re
+from typing import Dict, List, Optional
 
+from .question_ranker import QuestionRanker
 from .semantic_focus import SemanticFocusAnalyzer
 from .template_bank import QuestionTemplateBank
 from .template_renderer import TemplateRenderer
 from .schema import SelfQuestionItem
 
+_NON_WORD = re.compile(r"\W+")
+
+
+def normalize_question(text: str) -> str:
+    """Lower-case ``text`` and collapse punctuation and whitespace."""
+
+    return _NON_WORD.sub(" ", text.lower()).strip()
+
+
+def make_question_id(context_id: str, question_type: str, question_text: str) -> str:
+    """Return a stable id for a question about ``context_id``.
+
+    The id hashes the normalised text, so re-runs give the same ids and
+    questions that only differ in case or punctuation share one.
+    """
+
+    payload = "\x1f".join(
+        [context_id, question_type, normalize_question(question_text)]
+    )
+    digest = hashlib.blake2b(payload.encode("utf-8"), digest_size=8).hexdigest()
+    return f"qst_{digest}"
+
 
 class SelfQuestioner:
-    """Generate self-questions to trigger the refinement loop."""
+    """Generate self-questions to trigger the refinement loop.
+
+    Rendered questions that normalise to the same text are kept once. With
+    a ``ranker`` the questions are ordered by their expected gain (see
+    :meth:`QuestionRanker.expected_gain`) and ``top_n`` keeps only the best
+    ones.
+    """
 
     def __init__(
         self,
         template_bank: QuestionTemplateBank | None = None,
         focus_analyzer: SemanticFocusAnalyzer | None = None,
         renderer: TemplateRenderer | None = None,
+        ranker: QuestionRanker | None = None,
+        top_n: Optional[int] = None,
     ) -> None:
         self.template_bank = template_bank or QuestionTemplateBank()
         self.focus_analyzer = focus_analyzer or SemanticFocusAnalyzer()
         self.renderer = renderer or TemplateRenderer()
+        self.ranker = ranker
+        self.top_n = top_n
 
     def generate(
         self, context_unit: Dict, prediction: str
@@ -31,21 +65,27 @@ class SelfQuestioner:
         section = context_unit.get("section")
         confidence = float(context_unit.get("confidence", 0.0))
 
-        focus_terms = self.focus_analyzer.extract_focus_terms(text)
+        focus_terms = self.focus_analyzer.focus_weights(text)
         questions: List[SelfQuestionItem] = []
+        seen = set()
 
         for qtype in self.template_bank.templates.keys():
             templates = self.template_bank.get_templates(qtype)
-            for focus in focus_terms:
+            for focus, weight in focus_terms:
                 for tmpl in templates:
                     question_text = self.renderer.render(
                         tmpl, focus=focus, prediction=prediction
                     )
-                    question_id = f"qst_{uuid.uuid4().hex[:8]}"
+                    normalized = normalize_question(question_text)
+                    if normalized in seen:
+                        continue
+                    seen.add(normalized)
                     questions.append(
                         SelfQuestionItem(
                             context_id=context_id,
-                            question_id=question_id,
+                            question_id=make_question_id(
+                                context_id, qtype, question_text
+                            ),
                             question_text=question_text,
                             question_type=qtype,
                             confidence_level=confidence,
@@ -54,6 +94,10 @@ class SelfQuestioner:
                                 "section": section or "",
                                 "original_prediction": prediction,
                             },
+                            focus=focus,
+                            focus_weight=weight,
                         )
                     )
-        return questions
+        if self.ranker is not None:
+            return self.ranker.rank(questions, self.top_n)
+        return questions if self.top_n is None else questions[: self.top_n]
@@ -1,6 +1,6 @@
 import re
 from collections import Counter
-from typing import Iterable, List
+from typing import Iterable, List, Tuple
 
 
 class SemanticFocusAnalyzer:
@@ -11,10 +11,24 @@ class SemanticFocusAnalyzer:
             stop_words or {"the", "and", "for", "with", "that", "this", "from"}
         )
 
-    def extract_focus_terms(self, text: str, top_k: int = 2) -> List[str]:
-        """Return up to ``top_k`` keywords from ``text``."""
+    def focus_weights(self, text: str, top_k: int = 2) -> List[Tuple[str, float]]:
+        """Return up to ``top_k`` keywords with their share of the kept counts.
+
+        A plural is counted as its singular when the singular also occurs,
+        so "dataset" and "datasets" do not become two focus terms.
+        """
 
         tokens = re.findall(r"\w+", text.lower())
         tokens = [t for t in tokens if t not in self.stop_words and len(t) > 3]
-        counts = Counter(tokens)
-        return [t for t, _ in counts.most_common(top_k)]
+        vocab = set(tokens)
+        counts = Counter(
+            t[:-1] if t.endswith("s") and t[:-1] in vocab else t for t in tokens
+        )
+        top = counts.most_common(top_k)
+        total = sum(n for _, n in top)
+        return [(t, n / total) for t, n in top]
+
+    def extract_focus_terms(self, text: str, top_k: int = 2) -> List[str]:
+        """Return up to ``top_k`` keywords from ``text``."""
+
+        return [t for t, _ in self.focus_weights(text, top_k)]